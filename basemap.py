@@ -0,0 +1,458 @@
+import json
+import os
+
+import numpy as np
+
+from core.cache import lru_cached
+from core.geo import degrees_per_pixel, mercator_y, mercator_latitude, douglas_peucker
+
+# Vendored Europe basemap: country polygons pre-simplified into zoom-dependent levels of detail (TopoJSON).
+# Built with: python build_data.py basemap --source <europe.geojson|europe.topojson> ...
+
+BASEMAP_DIR = 'data/basemap'
+BASEMAP_OBJECT = 'europe'
+
+# Largest projection scale each level of detail is drawn at, from coarsest to finest. Every level is simplified
+# so that no vertex moves more than BASEMAP_TOLERANCE_PX pixels at its scale (Mercator, as used by the maps).
+BASEMAP_LEVELS = (500, 1000, 1800, 2500)
+BASEMAP_TOLERANCE_PX = 0.75
+
+# Region kept from the source data (min lon, min lat, max lon, max lat), wide enough for the zoomed-out route maps
+BASEMAP_EXTENT = (-32.0, 27.0, 60.0, 72.0)
+
+# Viewport assumed when clipping the basemap for a map: the charts are 500 px high and at most this wide,
+# plus a margin so that nothing visible is cut off when the real viewport is slightly larger
+MAP_HEIGHT = 500
+MAP_MAX_WIDTH = 1200
+VIEWPORT_MARGIN_PX = 50
+
+
+# Path of the TopoJSON file for a level of detail
+def basemap_path(level, basemap_dir=BASEMAP_DIR):
+    return os.path.join(basemap_dir, f'{BASEMAP_OBJECT}_{BASEMAP_LEVELS[level]}.topojson')
+
+
+# Pick the coarsest level of detail that still looks right at the given projection scale
+def basemap_level_for_scale(scale):
+    for level, max_scale in enumerate(BASEMAP_LEVELS):
+        if scale <= max_scale:
+            return level
+    return len(BASEMAP_LEVELS) - 1
+
+
+# Longitude/latitude box visible in a Vega Mercator map with the given scale, center and rotation (lambda only)
+def viewport_bbox(center, scale, rotate=(0, 0, 0), width=MAP_MAX_WIDTH, height=MAP_HEIGHT,
+                  margin_px=VIEWPORT_MARGIN_PX):
+    half_width = (width / 2 + margin_px) * degrees_per_pixel(scale)
+    half_height = (height / 2 + margin_px) * degrees_per_pixel(scale)
+    # The center is given in rotated coordinates, so undo the rotation to get source longitudes
+    center_lon = center[0] - rotate[0]
+    center_y = float(mercator_y(min(max(center[1], -85.0), 85.0)))
+    return (center_lon - half_width, float(mercator_latitude(center_y - half_height)),
+            center_lon + half_width, float(mercator_latitude(center_y + half_height)))
+
+
+# One Sutherland-Hodgman pass: keep the part of a ring on one side of an axis-aligned line
+def _clip_ring_edge(ring, axis, bound, keep_above):
+    values = ring[:, axis]
+    inside = values >= bound if keep_above else values <= bound
+    following = np.roll(ring, -1, axis=0)
+    crossing = inside != np.roll(inside, -1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = (bound - values) / (following[:, axis] - values)
+        intersections = ring + t[:, None] * (following - ring)
+    intersections[:, axis] = bound
+    points = np.stack([ring, intersections], axis=1).reshape(-1, 2)
+    return points[np.stack([inside, crossing], axis=1).reshape(-1)]
+
+
+# Clip an open ring (no repeated closing point) to a bounding box; returns None if nothing is left
+def clip_ring(ring, bbox):
+    min_lon, min_lat, max_lon, max_lat = bbox
+    ring = np.asarray(ring, dtype=float)
+    if len(ring) < 3:
+        return None
+    # Rings entirely outside or inside the box need no clipping
+    (ring_min_lon, ring_min_lat), (ring_max_lon, ring_max_lat) = ring.min(axis=0), ring.max(axis=0)
+    if ring_max_lon < min_lon or ring_min_lon > max_lon or ring_max_lat < min_lat or ring_min_lat > max_lat:
+        return None
+    if ring_min_lon >= min_lon and ring_max_lon <= max_lon and ring_min_lat >= min_lat and ring_max_lat <= max_lat:
+        return ring
+    for axis, bound, keep_above in ((0, min_lon, True), (0, max_lon, False),
+                                    (1, min_lat, True), (1, max_lat, False)):
+        if len(ring) == 0:
+            return None
+        ring = _clip_ring_edge(ring, axis, bound, keep_above)
+    return ring if len(ring) >= 3 else None
+
+
+# Polygons of a GeoJSON geometry as lists of open rings (exterior first)
+def _geometry_polygons(geometry):
+    polygons = geometry['coordinates'] if geometry['type'] == 'MultiPolygon' else [geometry['coordinates']]
+    return [[np.asarray(ring, dtype=float)[:-1] if ring[0] == ring[-1] else np.asarray(ring, dtype=float)
+             for ring in polygon] for polygon in polygons]
+
+
+# Clip GeoJSON polygon features to a bounding box; rings are returned open, as numpy arrays
+def clip_features(features, bbox):
+    clipped = []
+    for feature in features:
+        polygons = []
+        for polygon in _geometry_polygons(feature['geometry']):
+            exterior = clip_ring(polygon[0], bbox)
+            if exterior is None:
+                continue
+            holes = [hole for hole in (clip_ring(ring, bbox) for ring in polygon[1:]) if hole is not None]
+            polygons.append([exterior] + holes)
+        if polygons:
+            clipped.append({'properties': feature.get('properties', {}), 'polygons': polygons})
+    return clipped
+
+
+# Decode the arcs of a (possibly quantized) TopoJSON topology into absolute coordinates
+def _decode_arcs(topology):
+    transform = topology.get('transform')
+    arcs = []
+    for arc in topology['arcs']:
+        points = np.asarray(arc, dtype=float)
+        if transform:
+            points = np.cumsum(points, axis=0) * transform['scale'] + transform['translate']
+        arcs.append(points)
+    return arcs
+
+
+def _decode_ring(arcs, ring):
+    parts = []
+    for index in ring:
+        points = arcs[index] if index >= 0 else arcs[~index][::-1]
+        parts.append(points if not parts else points[1:])
+    return np.concatenate(parts)
+
+
+# GeoJSON features of a TopoJSON object (Polygon and MultiPolygon geometries)
+def topojson_features(topology, object_name=BASEMAP_OBJECT):
+    arcs = _decode_arcs(topology)
+    features = []
+    for geometry in topology['objects'][object_name]['geometries']:
+        if geometry['type'] == 'Polygon':
+            polygons = [geometry['arcs']]
+        elif geometry['type'] == 'MultiPolygon':
+            polygons = geometry['arcs']
+        else:
+            continue
+        coordinates = [[_decode_ring(arcs, ring).tolist() for ring in polygon] for polygon in polygons]
+        features.append({
+            'type': 'Feature',
+            'properties': geometry.get('properties', {}),
+            'geometry': {'type': 'MultiPolygon', 'coordinates': coordinates},
+        })
+    return features
+
+
+# Split polygon rings into arcs shared between neighbouring countries, so borders are simplified only once
+def _build_topology(features):
+    rings = [ring for feature in features for polygon in feature['polygons'] for ring in polygon]
+    neighbours = {}
+    for ring in rings:
+        points = [tuple(point) for point in ring]
+        for i, point in enumerate(points):
+            pair = frozenset((points[i - 1], points[(i + 1) % len(points)]))
+            neighbours.setdefault(point, set()).add(pair)
+
+    arcs, arc_ids = [], {}
+
+    def add_arc(points):
+        key = tuple(points)
+        if key in arc_ids:
+            return arc_ids[key]
+        reverse_key = key[::-1]
+        if reverse_key in arc_ids:
+            return ~arc_ids[reverse_key]
+        arc_ids[key] = len(arcs)
+        arcs.append(np.asarray(points))
+        return arc_ids[key]
+
+    def ring_arcs(ring):
+        points = [tuple(point) for point in ring]
+        junctions = [i for i, point in enumerate(points) if len(neighbours[point]) > 1]
+        if not junctions:
+            # Closed ring without junctions: start at the smallest vertex, match either orientation
+            start = points.index(min(points))
+            forward = points[start:] + points[:start]
+            backward = forward[:1] + forward[1:][::-1]
+            if tuple(backward + backward[:1]) in arc_ids:
+                return [~arc_ids[tuple(backward + backward[:1])]]
+            return [add_arc(forward + forward[:1])]
+        points = points[junctions[0]:] + points[:junctions[0]]
+        cuts = [i - junctions[0] for i in junctions] + [len(points)]
+        points = points + points[:1]
+        return [add_arc(points[start:end + 1]) for start, end in zip(cuts, cuts[1:])]
+
+    geometries = [
+        {'properties': feature['properties'],
+         'polygons': [[ring_arcs(ring) for ring in polygon] for polygon in feature['polygons']]}
+        for feature in features
+    ]
+    return arcs, geometries
+
+
+# Drop rings that collapsed below a triangle (and polygons whose exterior ring collapsed), then encode the
+# arcs still in use as a quantized, delta-encoded TopoJSON topology
+def _encode_topology(arcs, geometries, quantum, translate=None):
+    def ring_size(ring):
+        return sum(len(arcs[index if index >= 0 else ~index]) - 1 for index in ring)
+
+    kept_geometries = []
+    for geometry in geometries:
+        polygons = [[ring for ring in polygon if ring_size(ring) >= 3]
+                    for polygon in geometry['polygons'] if ring_size(polygon[0]) >= 3]
+        if polygons:
+            kept_geometries.append((geometry['properties'], polygons))
+
+    # Renumber the arcs that are still referenced
+    used = sorted({index if index >= 0 else ~index
+                   for _, polygons in kept_geometries for polygon in polygons for ring in polygon for index in ring})
+    new_ids = {old: new for new, old in enumerate(used)}
+
+    def renumber(index):
+        return new_ids[index] if index >= 0 else ~new_ids[~index]
+
+    if translate is None:
+        translate = np.concatenate([arcs[index] for index in used]).min(axis=0) if used else np.zeros(2)
+    encoded_arcs = []
+    for index in used:
+        quantized = np.round((arcs[index] - translate) / quantum).astype(np.int64)
+        distinct = np.ones(len(quantized), dtype=bool)
+        distinct[1:] = np.any(quantized[1:] != quantized[:-1], axis=1)
+        quantized = quantized[distinct] if distinct.sum() >= 2 else quantized[[0, -1]]
+        deltas = np.vstack([quantized[:1], np.diff(quantized, axis=0)])
+        encoded_arcs.append(deltas.tolist())
+
+    topology_geometries = []
+    for properties, polygons in kept_geometries:
+        arcs_refs = [[[renumber(index) for index in ring] for ring in polygon] for polygon in polygons]
+        if len(arcs_refs) == 1:
+            topology_geometries.append({'type': 'Polygon', 'arcs': arcs_refs[0], 'properties': properties})
+        else:
+            topology_geometries.append({'type': 'MultiPolygon', 'arcs': arcs_refs, 'properties': properties})
+
+    return {
+        'type': 'Topology',
+        'transform': {'scale': [quantum, quantum], 'translate': list(map(float, translate))},
+        'objects': {BASEMAP_OBJECT: {'type': 'GeometryCollection', 'geometries': topology_geometries}},
+        'arcs': encoded_arcs,
+    }
+
+
+# Simplify the shared arcs for one level of detail, quantized to a quarter of the simplification tolerance
+def _encode_level(arcs, geometries, scale):
+    tolerance = BASEMAP_TOLERANCE_PX * degrees_per_pixel(scale)
+    simplified = []
+    for arc in arcs:
+        projected = np.column_stack([arc[:, 0], mercator_y(arc[:, 1])])
+        simplified.append(arc[douglas_peucker(projected, tolerance)])
+    return _encode_topology(simplified, geometries, tolerance / 4)
+
+
+# Country name of a source feature (Natural Earth NAME, or name)
+def feature_name(feature):
+    properties = feature.get('properties') or {}
+    return properties.get('NAME', properties.get('name'))
+
+
+# Features of a GeoJSON FeatureCollection or a TopoJSON file
+def read_features(source_path):
+    with open(source_path, 'r') as f:
+        source = json.load(f)
+    if source['type'] == 'Topology':
+        object_name = BASEMAP_OBJECT if BASEMAP_OBJECT in source['objects'] else next(iter(source['objects']))
+        return topojson_features(source, object_name)
+    return source['features']
+
+
+# Signed area of an open ring in degrees², positive when counterclockwise
+def _ring_area(ring):
+    following = np.roll(ring, -1, axis=0)
+    return float(np.sum(ring[:, 0] * following[:, 1] - following[:, 0] * ring[:, 1]) / 2)
+
+
+# Whether a point lies inside an open ring (even-odd rule)
+def _ring_contains(ring, point):
+    following = np.roll(ring, -1, axis=0)
+    crossing = (ring[:, 1] > point[1]) != (following[:, 1] > point[1])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        crossing_lon = ring[:, 0] + (point[1] - ring[:, 1]) * (following[:, 0] - ring[:, 0]) / (
+            following[:, 1] - ring[:, 1])
+    return np.count_nonzero(crossing & (point[0] < crossing_lon)) % 2 == 1
+
+
+# Point inside an open ring: the middle of the widest stretch of the ring's interior on its middle latitude
+def _inner_point(ring):
+    latitude = (ring[:, 1].min() + ring[:, 1].max()) / 2
+    following = np.roll(ring, -1, axis=0)
+    crossing = (ring[:, 1] > latitude) != (following[:, 1] > latitude)
+    crossing_lon = np.sort(ring[crossing, 0] + (latitude - ring[crossing, 1]) * (
+        following[crossing, 0] - ring[crossing, 0]) / (following[crossing, 1] - ring[crossing, 1])).reshape(-1, 2)
+    widest = crossing_lon[np.argmax(crossing_lon[:, 1] - crossing_lon[:, 0])]
+    return np.array([widest.mean(), latitude])
+
+
+# Polygons of a source feature, with the rings that cross the antimeridian (jumping from 180 to -180) continued
+# past 180 instead, so that clipping them does not draw a band around the world
+def _unwrapped_polygons(geometry):
+    polygons = _geometry_polygons(geometry)
+    for polygon in polygons:
+        for ring in polygon:
+            if np.abs(np.diff(ring[:, 0])).max(initial=0) > 180:
+                ring[ring[:, 0] < 0, 0] += 360
+    return polygons
+
+
+# Join polygons (lists of open rings, exterior first) along the edges they share: an edge that is also used in
+# the opposite direction is an inner border and is dropped, the rest is chained into rings again. The rings
+# winding like the exteriors of the input are exteriors, the others holes of the exterior around them.
+def _merge_polygons(polygons):
+    edges = {}
+    for polygon in polygons:
+        for ring in polygon:
+            points = [tuple(point) for point in ring.tolist()]
+            for edge in zip(points, points[1:] + points[:1]):
+                edges[edge] = edges.get(edge, 0) + 1
+    following = {}
+    for (start, end), count in edges.items():
+        for _ in range(count - edges.get((end, start), 0)):
+            following.setdefault(start, []).append(end)
+
+    rings = []
+    while following:
+        start = point = next(iter(following))
+        ring = []
+        while True:
+            ring.append(point)
+            ends = following[point]
+            end = ends.pop()
+            if not ends:
+                del following[point]
+            if end == start:
+                break
+            point = end
+        if len(ring) >= 3:
+            rings.append(np.array(ring))
+
+    exterior_sign = np.sign(_ring_area(max((polygon[0] for polygon in polygons),
+                                           key=lambda ring: abs(_ring_area(ring)))))
+    exteriors = [ring for ring in rings if np.sign(_ring_area(ring)) == exterior_sign]
+    merged = [[ring] for ring in exteriors]
+    for hole in (ring for ring in rings if np.sign(_ring_area(ring)) != exterior_sign):
+        around = [i for i, ring in enumerate(exteriors) if _ring_contains(ring, hole[0])]
+        if around:
+            merged[min(around, key=lambda i: abs(_ring_area(exteriors[i])))].append(hole)
+    return merged
+
+
+# One feature per country: the features with the same name (e.g. the regions of a map subunits source) are
+# merged, so the borders between them are not drawn. Shared borders must have exactly the same vertices, as
+# decoded from a TopoJSON topology.
+def dissolve_features(features):
+    groups = {}
+    for feature in features:
+        groups.setdefault(feature_name(feature), []).append(feature)
+    dissolved = []
+    for name, group in groups.items():
+        polygons = [polygon for feature in group for polygon in _unwrapped_polygons(feature['geometry'])]
+        if len(group) > 1:
+            polygons = _merge_polygons(polygons)
+        dissolved.append({
+            'type': 'Feature',
+            'properties': {'NAME': name},
+            'geometry': {'type': 'MultiPolygon', 'coordinates': [[np.vstack([ring, ring[:1]]).tolist()
+                                                                  for ring in polygon] for polygon in polygons]},
+        })
+    return dissolved
+
+
+# Features of another source for the countries the features so far do not cover: a country is covered when a
+# point inside its largest polygon lies inside one of the covering polygons
+def _uncovered_features(features, covering):
+    exteriors = [polygon[0] for feature in covering for polygon in _geometry_polygons(feature['geometry'])]
+    uncovered = []
+    for feature in features:
+        largest = max((polygon[0] for polygon in _geometry_polygons(feature['geometry'])),
+                      key=lambda ring: abs(_ring_area(ring)))
+        point = _inner_point(largest)
+        if not any(_ring_contains(ring, point) for ring in exteriors):
+            uncovered.append(feature)
+    return uncovered
+
+
+# Build every level of detail from GeoJSON FeatureCollection or TopoJSON files of European countries. The first
+# source is the main one; every further source only adds the countries the ones before it lack.
+def build_basemap(source_paths, basemap_dir=BASEMAP_DIR, extent=BASEMAP_EXTENT):
+    features = []
+    for source_path in source_paths:
+        source_features = dissolve_features(read_features(source_path))
+        features += _uncovered_features(source_features, features) if features else source_features
+
+    arcs, geometries = _build_topology(clip_features(features, extent))
+    os.makedirs(basemap_dir, exist_ok=True)
+    sizes = []
+    for level, scale in enumerate(BASEMAP_LEVELS):
+        topology = _encode_level(arcs, geometries, scale)
+        with open(basemap_path(level, basemap_dir), 'w') as f:
+            json.dump(topology, f, separators=(',', ':'))
+        sizes.append((basemap_path(level, basemap_dir), os.path.getsize(basemap_path(level, basemap_dir)),
+                      sum(len(arc) for arc in topology['arcs'])))
+    return sizes
+
+
+_basemaps = {}
+_basemap_features = {}
+
+
+# Load a level of detail as a TopoJSON dict; read once per process and shared, so treat it as read-only
+def load_basemap(level):
+    if level not in _basemaps:
+        with open(basemap_path(level), 'r') as f:
+            _basemaps[level] = json.load(f)
+    return _basemaps[level]
+
+
+# Features of a level of detail, decoded once per process
+def load_basemap_features(level):
+    if level not in _basemap_features:
+        _basemap_features[level] = topojson_features(load_basemap(level))
+    return _basemap_features[level]
+
+
+# Snap an open ring to a quantization grid and drop the repeated points this creates
+def _snap_ring(ring, quantum, translate):
+    ring = np.round((ring - translate) / quantum) * quantum + translate
+    distinct = np.any(ring != np.roll(ring, 1, axis=0), axis=1)
+    return ring[distinct]
+
+
+# Basemap of a map viewport as TopoJSON, with every polygon cut to the viewport (plus margin), so only the
+# visible features and vertices are embedded in the chart. Cached per (level, center, scale, rotation) bucket;
+# the buckets are fine enough that the margin covers the rounding.
+@lru_cached(maxsize=256)
+def _clipped_basemap(level, center, scale, rotate):
+    topology = load_basemap(level)
+    quantum = topology['transform']['scale'][0]
+    translate = np.asarray(topology['transform']['translate'])
+    features = clip_features(load_basemap_features(level), viewport_bbox(center, scale, rotate))
+
+    # Cut points are snapped to the level's grid so that neighbouring countries still share their border arcs
+    for feature in features:
+        feature['polygons'] = [[_snap_ring(ring, quantum, translate) for ring in polygon]
+                               for polygon in feature['polygons']]
+        feature['polygons'] = [[ring for ring in polygon if len(ring) >= 3]
+                               for polygon in feature['polygons'] if len(polygon[0]) >= 3]
+    arcs, geometries = _build_topology([feature for feature in features if feature['polygons']])
+    return _encode_topology(arcs, geometries, quantum, translate)
+
+
+# Basemap TopoJSON clipped to the viewport of a Mercator map, cached per viewport bucket
+def clipped_basemap(center, scale, rotate=(0, 0, 0)):
+    center = (round(float(center[0]), 1), round(float(center[1]), 1))
+    scale = round(float(scale), -1)
+    return _clipped_basemap(basemap_level_for_scale(scale), center, scale, tuple(float(r) for r in rotate))
@@ -0,0 +1,58 @@
+# Compare the basemap embedded in route maps: whole level of detail vs. clipped to the map viewport
+# Run from the repository root: python -m benchmarks.bench_basemap
+# Render times are measured with vl-convert (pip install vl-convert-python) when it is installed.
+import json
+import time
+
+import altair as alt
+
+from basemap import load_basemap, basemap_level_for_scale, clipped_basemap, BASEMAP_OBJECT
+from core import coordinates_data, get_projection_params
+
+PAIRS = [('Brussels', 'Amsterdam'), ('Vienna', 'Bratislava'), ('Berlin', 'Dresden'), ('Paris', 'London'),
+         ('Madrid', 'Warsaw'), ('Lisbon', 'Istanbul')]
+
+try:
+    import vl_convert
+except ImportError:
+    vl_convert = None
+
+
+def basemap_spec(topology, projection_params):
+    return alt.Chart(alt.InlineData(
+        values=topology,
+        format=alt.DataFormat(type='topojson', feature=BASEMAP_OBJECT)
+    )).mark_geoshape(fill='lightgray', stroke='white', strokeWidth=0.5).project(
+        'mercator', scale=projection_params['scale'], center=projection_params['center'], rotate=[5, 0, 0]
+    ).properties(width=800, height=500).to_dict()
+
+
+# Best of several renders to SVG, in milliseconds
+def render_ms(spec, repeat=5):
+    if vl_convert is None:
+        return float('nan')
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        vl_convert.vegalite_to_svg(spec)
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1e3
+
+
+def main():
+    city_coordinates = coordinates_data().set_index('city')
+    print(f"{'route':<22}{'scale':>7}{'full KB':>9}{'clipped KB':>12}{'full ms':>9}{'clipped ms':>12}")
+    for from_city, to_city in PAIRS:
+        cities = [{'city': city, 'lon': city_coordinates.loc[city, 'longitude'],
+                   'lat': city_coordinates.loc[city, 'latitude']} for city in (from_city, to_city)]
+        projection_params = get_projection_params(cities)
+        full = load_basemap(basemap_level_for_scale(projection_params['scale']))
+        clipped = clipped_basemap(projection_params['center'], projection_params['scale'], (5, 0, 0))
+        full_spec, clipped_spec = basemap_spec(full, projection_params), basemap_spec(clipped, projection_params)
+        print(f"{from_city + '-' + to_city:<22}{projection_params['scale']:>7.0f}"
+              f"{len(json.dumps(full_spec)) / 1024:>9.1f}{len(json.dumps(clipped_spec)) / 1024:>12.1f}"
+              f"{render_ms(full_spec):>9.1f}{render_ms(clipped_spec):>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
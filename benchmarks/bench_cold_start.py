@@ -0,0 +1,71 @@
+# Benchmark the cold start of the trip and city data: parsing the CSVs vs. loading the compiled snapshot,
+# on synthetic datasets with a growing number of cities
+# Run from the repository root: python -m benchmarks.bench_cold_start [num_cities ...]
+import os
+import sys
+import tempfile
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_data_load import make_synthetic_trip_data
+from core import prepare_trip_data, build_route_index, load_trip_tables, build_trip_snapshot, seed_direct_flights
+
+
+# coordinates.csv-shaped DataFrame for the cities of make_synthetic_trip_data
+def make_synthetic_coordinates(num_cities, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'city': [f'City {i:04d}' for i in range(num_cities)],
+        'latitude': rng.uniform(36, 70, num_cities).round(5),
+        'longitude': rng.uniform(-10, 30, num_cities).round(5),
+    })
+
+
+# Every tenth airport of synthetic trip data as a hub for seed_direct_flights
+def synthetic_hubs(trip_data):
+    return sorted(set(trip_data['AIR_1']) | set(trip_data['AIR_2']))[::10]
+
+
+# Previous startup: parse both CSVs, derive the city list and build the route index
+def csv_start(trips_path, coordinates_path):
+    trip_data = prepare_trip_data(pd.read_csv(trips_path))
+    coordinates = pd.read_csv(coordinates_path)
+    coordinates.columns = coordinates.columns.str.strip()
+    return coordinates['city'].unique().tolist(), build_route_index(trip_data)
+
+
+# Current startup: one read of the snapshot with the city pair index already built
+def snapshot_start(trips_path, coordinates_path, direct_flights_path, snapshot_path):
+    tables = load_trip_tables(trips_path, coordinates_path, direct_flights_path, snapshot_path)
+    return list(dict.fromkeys(tables['coordinates.city.values'].tolist())), tables['route_rows']
+
+
+def best_of(stmt, number=1, repeat=5):
+    return min(timeit.repeat(stmt, number=number, repeat=repeat)) / number
+
+
+def main(*city_counts):
+    print(f"{'cities':>7}{'routes':>9}{'CSV':>12}{'snapshot':>12}{'speedup':>9}{'snapshot size':>16}")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for num_cities in city_counts or (29, 100, 250, 500):
+            trips_path = os.path.join(temp_dir, f'trips_{num_cities}.csv')
+            coordinates_path = os.path.join(temp_dir, f'coordinates_{num_cities}.csv')
+            direct_flights_path = os.path.join(temp_dir, f'direct_flights_{num_cities}.csv')
+            snapshot_path = os.path.join(temp_dir, f'snapshot_{num_cities}.npz')
+            trip_data = make_synthetic_trip_data(num_cities)
+            trip_data.to_csv(trips_path, index=False)
+            make_synthetic_coordinates(num_cities).to_csv(coordinates_path, index=False)
+            seed_direct_flights(trip_data, synthetic_hubs(trip_data)).to_csv(direct_flights_path, index=False)
+            tables = build_trip_snapshot(trips_path, coordinates_path, direct_flights_path, snapshot_path)
+
+            csv_time = best_of(lambda: csv_start(trips_path, coordinates_path))
+            snapshot_time = best_of(lambda: snapshot_start(trips_path, coordinates_path, direct_flights_path,
+                                                          snapshot_path))
+            print(f"{num_cities:>7}{len(tables['trips.ID']):>9}{csv_time * 1e3:>9.1f} ms{snapshot_time * 1e3:>9.1f} ms"
+                  f"{csv_time / snapshot_time:>8.0f}x{os.path.getsize(snapshot_path) / 1024:>13.0f} KB")
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,91 @@
+# Benchmark the trip data load stage and per-search work on a synthetic dataset
+# Run from the repository root: python -m benchmarks.bench_data_load [num_cities]
+import sys
+import timeit
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+from core import prepare_trip_data, build_route_index, normalize_city_pair, minutes_to_str
+
+
+# Build a trips_data.csv-shaped DataFrame with every pair of num_cities cities
+def make_synthetic_trip_data(num_cities, seed=0):
+    rng = np.random.default_rng(seed)
+    names = [f'City {i:04d}' for i in range(num_cities)]
+    pairs = list(combinations(names, 2))
+    # Store half of the pairs in reverse order, like a hand-maintained CSV would
+    flip = rng.random(len(pairs)) < 0.5
+    city_1 = [b if f else a for (a, b), f in zip(pairs, flip)]
+    city_2 = [a if f else b for (a, b), f in zip(pairs, flip)]
+    train = rng.integers(30, 3000, len(pairs))
+    plane = rng.integers(30, 400, len(pairs))
+
+    def to_str(minutes):
+        return [f'{m // 60}:{m % 60:02d}' for m in minutes]
+
+    return pd.DataFrame({
+        'ID': np.arange(1, len(pairs) + 1),
+        'City_1': city_1,
+        'City_2': city_2,
+        # One airport per city
+        'AIR_1': [f'A{name[-4:]}' for name in city_1],
+        'AIR_2': [f'A{name[-4:]}' for name in city_2],
+        'Duration_train': to_str(train),
+        'Train_CO2_kg': rng.uniform(1, 80, len(pairs)).round(2),
+        'Plane_CO2_kg': rng.uniform(20, 300, len(pairs)).round(2),
+        'Duration_plane': to_str(plane),
+        'Duration_plane_total': to_str(plane + 180),
+    })
+
+
+# Previous load stage: row-wise apply, durations left as strings
+def prepare_trip_data_rowwise(trip_data):
+    trip_data.columns = trip_data.columns.str.strip()
+    trip_data['route'] = trip_data.apply(lambda row: normalize_city_pair(row['City_1'], row['City_2']), axis=1)
+    return trip_data
+
+
+# Previous per-search work: mask scan, then re-parse and re-format the duration strings
+def search_rowwise(trip_data, from_city, to_city):
+    travel_info = trip_data[trip_data['route'] == normalize_city_pair(from_city, to_city)].iloc[0]
+    hours, minutes = map(int, travel_info['Duration_train'].split(':'))
+    total_minutes = (hours * 60 + minutes) * 2
+    doubled = f"{total_minutes // 60}:{total_minutes % 60:02d}"
+    hours, minutes = map(int, doubled.split(':'))
+    return f"{hours:02}:{minutes:02}", hours * 60 + minutes
+
+
+# Current per-search work: index lookup and integer arithmetic, formatting at render time
+def search_indexed(route_index, from_city, to_city):
+    travel_info = route_index[normalize_city_pair(from_city, to_city)]
+    train_minutes = travel_info.Duration_train_minutes * 2
+    return minutes_to_str(train_minutes), train_minutes
+
+
+def best_of(stmt, number, repeat=5):
+    return min(timeit.repeat(stmt, number=number, repeat=repeat)) / number
+
+
+def main(num_cities=500):
+    raw = make_synthetic_trip_data(num_cities)
+    print(f'{num_cities} cities, {len(raw)} routes')
+
+    rowwise_load = best_of(lambda: prepare_trip_data_rowwise(raw.copy()), number=1, repeat=3)
+    vectorized_load = best_of(lambda: prepare_trip_data(raw.copy()), number=1, repeat=3)
+    print(f'load stage   row-wise apply: {rowwise_load * 1e3:9.1f} ms')
+    print(f'load stage   vectorized:     {vectorized_load * 1e3:9.1f} ms  ({rowwise_load / vectorized_load:.0f}x)')
+
+    rowwise_data = prepare_trip_data_rowwise(raw.copy())
+    trip_data = prepare_trip_data(raw.copy())
+    route_index = build_route_index(trip_data)
+    from_city, to_city = raw['City_2'].iloc[-1], raw['City_1'].iloc[-1]
+    rowwise_search = best_of(lambda: search_rowwise(rowwise_data, from_city, to_city), number=20)
+    indexed_search = best_of(lambda: search_indexed(route_index, from_city, to_city), number=20000)
+    print(f'per search   mask scan:      {rowwise_search * 1e6:9.1f} us')
+    print(f'per search   route index:    {indexed_search * 1e6:9.1f} us  ({rowwise_search / indexed_search:.0f}x)')
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,62 @@
+# Benchmark recomputing the CO2 of every pair for new emission factors on synthetic datasets: a loop over the
+# routes of the trip data vs. one vectorized pass over the distance matrices (core.co2_for_factors) vs. a repeated
+# factor set from the per-factor cache
+# Run from the repository root: python -m benchmarks.bench_emissions [num_cities ...]
+import sys
+import timeit
+
+import numpy as np
+
+from benchmarks.bench_cold_start import make_synthetic_coordinates
+from benchmarks.bench_data_load import make_synthetic_trip_data
+from core import prepare_trip_data, build_od_matrices, build_emission_distances, co2_for_factors, \
+    EmissionFactors, TRAVELCO2_FACTORS
+from core.cache import lru_cached
+from core.snapshot import snapshot_arrays
+
+# Radiative forcing and business class
+FACTORS = EmissionFactors(35.0, 127.0, 1.9, 2.9)
+
+
+# Previous approach: scale the stored CO2 of every route of the trip data one by one
+def co2_loop(trip_data, factors):
+    train_scale = factors.train_g_per_pkm / TRAVELCO2_FACTORS.train_g_per_pkm
+    plane_scale = (factors.plane_g_per_pkm * factors.radiative_forcing * factors.seat_class
+                   / TRAVELCO2_FACTORS.plane_g_per_pkm)
+    return {
+        (row.City_1, row.City_2): (row.Train_CO2_kg * train_scale, row.Plane_CO2_kg * plane_scale)
+        for row in trip_data.itertuples(index=False)
+    }
+
+
+def best_of(stmt, number, repeat=5):
+    return min(timeit.repeat(stmt, number=number, repeat=repeat)) / number
+
+
+def main(*city_counts):
+    print(f"{'cities':>7}{'routes':>9}{'distances':>12}{'loop':>12}{'vectorized':>13}{'cached':>12}")
+    for num_cities in city_counts or (29, 100, 250, 500):
+        trip_data = prepare_trip_data(make_synthetic_trip_data(num_cities))
+        tables = snapshot_arrays(trip_data, make_synthetic_coordinates(num_cities))
+        matrices = build_od_matrices(tables, {})
+        ids = {city: i for i, city in enumerate(tables['pair_cities'].tolist())}
+
+        distances_time = best_of(lambda: build_emission_distances(matrices), number=1)
+        distances = build_emission_distances(matrices)
+        cached = lru_cached(maxsize=64)(lambda factors: co2_for_factors(distances, factors))
+
+        looped = co2_loop(trip_data, FACTORS)
+        vectorized = co2_for_factors(distances, FACTORS)
+        (city_1, city_2), (train_co2, plane_co2) = next(iter(looped.items()))
+        assert np.isclose(vectorized.train_co2[ids[city_1], ids[city_2]], train_co2)
+        assert np.isclose(vectorized.plane_co2[ids[city_1], ids[city_2]], plane_co2, equal_nan=True)
+
+        loop_time = best_of(lambda: co2_loop(trip_data, FACTORS), number=3)
+        vectorized_time = best_of(lambda: co2_for_factors(distances, FACTORS), number=20)
+        cached_time = best_of(lambda: cached(FACTORS), number=1000)
+        print(f"{num_cities:>7}{len(trip_data):>9}{distances_time * 1e3:>9.2f} ms{loop_time * 1e3:>9.2f} ms"
+              f"{vectorized_time * 1e6:>10.1f} us{cached_time * 1e6:>9.1f} us")
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,56 @@
+# Benchmark the rendering pipeline: per-stage timings for every chart strategy, and how much of a first search
+# on one page is served by the caches another page warmed
+# Run from the repository root: python -m benchmarks.bench_engine
+import time
+
+from engine import search_response, geometry, CHART_STRATEGIES, stage_timings, reset_stage_timings
+
+PAIRS = [('Amsterdam', 'Berlin'), ('Berlin', 'Dresden'), ('Luxembourg City', 'Riga'), ('Vienna', 'Bratislava')]
+SEARCHES = [(from_city, to_city, num_people, round_trip)
+            for from_city, to_city in PAIRS for num_people in (1, 4) for round_trip in (False, True)]
+
+
+def clear_caches():
+    search_response.cache.clear()
+    geometry.cache.clear()
+
+
+# Wall time of running every search once with a strategy, in microseconds per search
+def run_searches(strategy_name):
+    start = time.perf_counter()
+    for search in SEARCHES:
+        search_response(strategy_name, *search)
+    return (time.perf_counter() - start) / len(SEARCHES) * 1e6
+
+
+def print_stage_timings():
+    for stage, timing in stage_timings().items():
+        print(f"  {stage:<10}{timing['calls']:>7} calls{timing['mean_us']:>10.1f} us mean")
+
+
+def main():
+    # Warm the template, basemap and route loader caches shared by everything below
+    for strategy_name in CHART_STRATEGIES:
+        run_searches(strategy_name)
+
+    print('Per-stage timings, empty response and geometry caches')
+    for strategy_name in CHART_STRATEGIES:
+        clear_caches()
+        reset_stage_timings()
+        per_search = run_searches(strategy_name)
+        print(f"{strategy_name}: {per_search:.1f} us per search")
+        print_stage_timings()
+
+    print('\nFirst searches on each page after another page warmed the caches')
+    clear_caches()
+    print(f"{'strategy':<18}{'first':>12}{'repeat':>12}")
+    for strategy_name in CHART_STRATEGIES:
+        first = run_searches(strategy_name)
+        repeat = run_searches(strategy_name)
+        print(f"{strategy_name:<18}{first:>9.1f} us{repeat:>9.1f} us")
+    print(f"geometry cache: {geometry.cache.stats()}")
+    print(f"search cache:   {search_response.cache.stats()}")
+
+
+if __name__ == '__main__':
+    main()
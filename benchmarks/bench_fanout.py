@@ -0,0 +1,70 @@
+# Benchmark the time to render one city's routes to all destinations: one search per destination (a chart set
+# and route map each) vs. the fan-out view (one vectorized comparison table and one layered map)
+# Run from the repository root: python -m benchmarks.bench_fanout [from_city]
+# Render times are measured with vl-convert (pip install vl-convert-python) when it is installed.
+import json
+import sys
+import time
+
+from core import cities, load_geojson_lines, load_geojson_points, origin_geometry
+from engine import search_response, geometry, fanout_response, fanout_geometry
+
+try:
+    import vl_convert
+except ImportError:
+    vl_convert = None
+
+
+def clear_caches():
+    for cached in (search_response, geometry, fanout_response, fanout_geometry, origin_geometry,
+                   load_geojson_lines, load_geojson_points):
+        cached.cache.clear()
+
+
+# Wall time of a call in milliseconds, with its result
+def timed_ms(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return (time.perf_counter() - start) * 1e3, result
+
+
+def render_ms(specs):
+    if vl_convert is None:
+        return float('nan')
+    return timed_ms(lambda: [vl_convert.vegalite_to_svg(spec) for spec in specs])[0]
+
+
+def payload_kb(specs):
+    return sum(len(json.dumps(spec)) for spec in specs) / 1024
+
+
+def main(from_city='Amsterdam'):
+    destinations = [city for city in cities() if city != from_city]
+    # Warm the templates and the basemap files so that both sides start from the same state
+    search_response('horizontal_bars', from_city, destinations[0], 1, False)
+    fanout_response(from_city, 1, False)
+    # vl-convert starts its JavaScript runtime on the first call
+    render_ms([fanout_response(from_city, 1, False).route_map])
+
+    clear_caches()
+    per_pair_ms, responses = timed_ms(lambda: [search_response('horizontal_bars', from_city, to_city, 1, False)
+                                               for to_city in destinations])
+    per_pair_specs = [spec for response in responses
+                      for spec in (response.duration_chart, response.emissions_chart, response.route_map)]
+    per_pair_maps = [response.route_map for response in responses]
+
+    clear_caches()
+    fanout_ms, fanout = timed_ms(fanout_response, from_city, 1, False)
+    cached_ms = timed_ms(fanout_response, from_city, 1, False)[0]
+
+    print(f"{from_city} to {len(destinations)} destinations")
+    print(f"{'':<28}{'build':>11}{'render':>11}{'payload':>12}")
+    print(f"{'one search per destination':<28}{per_pair_ms:>8.1f} ms{render_ms(per_pair_maps):>8.0f} ms"
+          f"{payload_kb(per_pair_specs):>9.0f} KB   ({len(per_pair_maps)} route maps rendered)")
+    print(f"{'fan-out view':<28}{fanout_ms:>8.1f} ms{render_ms([fanout.route_map]):>8.0f} ms"
+          f"{payload_kb([fanout.route_map]):>9.0f} KB   (+ {len(fanout.table)}-row table)")
+    print(f"{'fan-out view, cached':<28}{cached_ms:>8.3f} ms")
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
@@ -0,0 +1,46 @@
+# Benchmark the connecting-flight routing on synthetic datasets (one airport per city, every tenth one a hub):
+# computing the flight arrays at build time vs. looking a connection up per request
+# Run from the repository root: python -m benchmarks.bench_flights [num_cities ...]
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.bench_cold_start import make_synthetic_coordinates, synthetic_hubs
+from benchmarks.bench_data_load import make_synthetic_trip_data
+from core import prepare_trip_data, seed_direct_flights, flight_arrays
+from core.snapshot import snapshot_arrays
+
+# Lookups timed per dataset
+NUM_LOOKUPS = 10000
+
+
+def main(*city_counts):
+    print(f"{'cities':>7}{'direct':>9}{'build':>12}{'lookup':>12}{'connecting':>12}")
+    for num_cities in city_counts or (29, 100, 250, 500):
+        trip_data = prepare_trip_data(make_synthetic_trip_data(num_cities))
+        tables = snapshot_arrays(trip_data, make_synthetic_coordinates(num_cities))
+        direct_flights = seed_direct_flights(trip_data, synthetic_hubs(trip_data))
+        direct_pairs = set(zip(direct_flights['AIR_1'], direct_flights['AIR_2']))
+        direct_pairs |= {(air_2, air_1) for air_1, air_2 in direct_pairs}
+
+        start = time.perf_counter()
+        flights = flight_arrays(tables, direct_pairs)
+        build_time = time.perf_counter() - start
+
+        # The per-request work of connecting_flight: a few (C, C) lookups
+        rng = np.random.default_rng(0)
+        pairs = rng.integers(0, num_cities, (NUM_LOOKUPS, 2)).tolist()
+        start = time.perf_counter()
+        for origin, destination in pairs:
+            if flights['flights.legs'][origin, destination] >= 2:
+                flights['flights.minutes'][origin, destination], flights['flights.co2'][origin, destination]
+        lookup_time = (time.perf_counter() - start) / NUM_LOOKUPS
+
+        connecting = int((flights['flights.legs'] >= 2).sum()) / (num_cities * (num_cities - 1))
+        print(f"{num_cities:>7}{len(direct_flights):>9}{build_time * 1e3:>9.1f} ms{lookup_time * 1e6:>9.2f} us"
+              f"{connecting:>11.0%}")
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
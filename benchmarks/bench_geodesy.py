@@ -0,0 +1,76 @@
+# Benchmark polyline lengths on synthetic route geometry: a Python loop over the vertices of every line (like the
+# point-by-point distances of data_gathering.ipynb) vs. NumPy per line vs. one pass over all packed lines
+# (core.polyline_distances), with haversine and geodesic segment distances
+# Run from the repository root: python -m benchmarks.bench_geodesy [num_routes ...]
+import math
+import sys
+import time
+
+import numpy as np
+
+from core import EARTH_RADIUS_KM, haversine_km, geodesic_km, segment_km, polyline_distances
+
+# Vertices per synthetic route line, like detailed track geometry (the stored lines have about 8)
+VERTICES_PER_ROUTE = 250
+
+
+# Random walks over Europe packed one after another, with their [start, end) row ranges
+def make_synthetic_lines(num_routes, seed=0):
+    rng = np.random.default_rng(seed)
+    starts = np.column_stack([rng.uniform(-10, 30, num_routes), rng.uniform(36, 65, num_routes)])
+    steps = rng.normal(0, 0.05, (num_routes, VERTICES_PER_ROUTE, 2))
+    lines = starts[:, None, :] + np.cumsum(steps, axis=1)
+    bounds = np.arange(num_routes)[:, None] * VERTICES_PER_ROUTE + [0, VERTICES_PER_ROUTE]
+    return lines.reshape(-1, 2), bounds
+
+
+# Previous approach: the haversine distance of every segment in Python
+def lengths_loop(coordinates, bounds):
+    lengths = []
+    for start, end in bounds.tolist():
+        total = 0.0
+        for (lon_1, lat_1), (lon_2, lat_2) in zip(coordinates[start:end - 1].tolist(),
+                                                  coordinates[start + 1:end].tolist()):
+            lat_1, lat_2 = math.radians(lat_1), math.radians(lat_2)
+            a = (math.sin((lat_2 - lat_1) / 2) ** 2
+                 + math.cos(lat_1) * math.cos(lat_2) * math.sin(math.radians(lon_2 - lon_1) / 2) ** 2)
+            total += 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+        lengths.append(total)
+    return np.array(lengths)
+
+
+# NumPy over the segments of one line at a time
+def lengths_per_line(coordinates, bounds):
+    return np.array([segment_km(coordinates[start:end]).sum() for start, end in bounds.tolist()])
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def main(*route_counts):
+    print(f"{'routes':>7}{'vertices':>10}{'loop':>12}{'per line':>12}{'packed':>12}{'geodesic':>12}"
+          f"{'max diff':>10}")
+    for num_routes in route_counts or (406, 4000, 20000):
+        coordinates, bounds = make_synthetic_lines(num_routes)
+        loop_time, looped = timed(lengths_loop, coordinates, bounds)
+        per_line_time, per_line = timed(lengths_per_line, coordinates, bounds)
+        packed_time, (_, packed) = timed(polyline_distances, coordinates, bounds)
+        geodesic_time, (_, geodesic) = timed(polyline_distances, coordinates, bounds, distance=geodesic_km)
+        assert np.allclose(looped, packed) and np.allclose(per_line, packed)
+        # Sphere vs. ellipsoid
+        difference = np.max(np.abs(geodesic - packed) / packed)
+        print(f"{num_routes:>7}{len(coordinates):>10}{loop_time * 1e3:>9.1f} ms{per_line_time * 1e3:>9.1f} ms"
+              f"{packed_time * 1e3:>9.1f} ms{geodesic_time * 1e3:>9.1f} ms{difference:>10.2%}")
+
+    # Great-circle distances of all pairs of 500 cities
+    rng = np.random.default_rng(0)
+    lons, lats = rng.uniform(-10, 30, 500), rng.uniform(36, 70, 500)
+    pairs_time, _ = timed(haversine_km, lons[:, None], lats[:, None], lons[None, :], lats[None, :])
+    print(f"Great-circle distances of all pairs of 500 cities: {pairs_time * 1e3:.1f} ms")
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,55 @@
+# Benchmark itinerary evaluation: summing the legs with one route lookup each vs. one gather from the leg table,
+# and trying every order of the stops in between one by one vs. in one batch. Also checks that reordering a round
+# trip as a closed tour is never worse than reordering the open path and returning from its last stop.
+# Run from the repository root: python -m benchmarks.bench_itinerary
+import itertools
+import timeit
+
+from core import cities, compare_route, plan_itinerary, best_stop_order, leg_table
+from core.itinerary import MAX_REORDER_STOPS
+
+
+# Previous approach: one comparison per leg, totals summed in Python
+def plan_per_leg(stops, num_people=1):
+    trips = [compare_route(from_city, to_city, num_people) for from_city, to_city in zip(stops, stops[1:])]
+    return sum(trip.train_minutes for trip in trips), sum(trip.train_co2 for trip in trips)
+
+
+# Every order of the stops in between evaluated with plan_itinerary, one at a time
+def best_order_one_by_one(stops):
+    orders = ([stops[0], *middle, stops[-1]] for middle in itertools.permutations(stops[1:-1]))
+    return min(orders, key=lambda order: (plan_itinerary(order).mixed_total.co2,
+                                          plan_itinerary(order).mixed_total.minutes))
+
+
+def best_of(stmt, number, repeat=5):
+    return min(timeit.repeat(stmt, number=number, repeat=repeat)) / number
+
+
+def main():
+    leg_table()
+    all_cities = cities()
+    print(f"{'stops':>6}{'per leg':>12}{'leg table':>12}")
+    for num_stops in (4, 10, 29):
+        stops = all_cities[:num_stops]
+        per_leg = best_of(lambda: plan_per_leg(stops), number=200)
+        gathered = best_of(lambda: plan_itinerary(stops), number=2000)
+        print(f"{num_stops:>6}{per_leg * 1e6:>9.1f} us{gathered * 1e6:>9.1f} us")
+
+    stops = all_cities[:MAX_REORDER_STOPS + 2]
+    num_orders = len(list(itertools.permutations(stops[1:-1])))
+    one_by_one = best_of(lambda: best_order_one_by_one(stops), number=1, repeat=1)
+    batched = best_of(lambda: best_stop_order(stops), number=5)
+    print(f"\nbest order of {len(stops)} stops ({num_orders} orders): one by one {one_by_one * 1e3:.0f} ms, "
+          f"batched {batched * 1e3:.1f} ms ({batched / num_orders * 1e6:.2f} us per order)")
+
+    # Round trip: the return leg appended before reordering lets the last stop move too
+    stops = all_cities[:MAX_REORDER_STOPS + 1]
+    closed = plan_itinerary(best_stop_order(stops + stops[:1])).mixed_total
+    open_path = plan_itinerary(best_stop_order(stops) + stops[:1]).mixed_total
+    assert (closed.co2, closed.minutes) <= (open_path.co2, open_path.minutes)
+    print(f"round trip of {len(stops)} stops: closed tour {closed.co2:.1f} kg, open path {open_path.co2:.1f} kg")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+# Benchmark one-to-many and many-to-many comparison queries on a synthetic dataset: row-by-row pandas lookups
+# vs. the route index vs. indexing the dense origin x destination matrices
+# Run from the repository root: python -m benchmarks.bench_matrices [num_cities]
+import sys
+import timeit
+
+import numpy as np
+
+from benchmarks.bench_cold_start import make_synthetic_coordinates
+from benchmarks.bench_data_load import make_synthetic_trip_data
+from core import prepare_trip_data, build_route_index, normalize_city_pair, build_od_matrices
+from core.snapshot import snapshot_arrays
+
+
+# Train minus plane CO2 from each origin to each destination, one DataFrame mask per pair
+def savings_pandas(trip_data, origins, destinations):
+    savings = np.full((len(origins), len(destinations)), np.nan)
+    for i, origin in enumerate(origins):
+        for j, destination in enumerate(destinations):
+            rows = trip_data[trip_data['route'] == normalize_city_pair(origin, destination)]
+            if len(rows):
+                savings[i, j] = rows['Plane_CO2_kg'].iloc[0] - rows['Train_CO2_kg'].iloc[0]
+    return savings
+
+
+# The same through the route index, one dict lookup per pair
+def savings_route_index(route_index, origins, destinations):
+    savings = np.full((len(origins), len(destinations)), np.nan)
+    for i, origin in enumerate(origins):
+        for j, destination in enumerate(destinations):
+            travel_info = route_index.get(normalize_city_pair(origin, destination))
+            if travel_info is not None:
+                savings[i, j] = travel_info.Plane_CO2_kg - travel_info.Train_CO2_kg
+    return savings
+
+
+# The same as one array operation on the matrices
+def savings_matrices(matrices, origin_ids, destination_ids):
+    block = np.ix_(origin_ids, destination_ids)
+    return matrices.plane_co2[block] - matrices.train_co2[block]
+
+
+def best_of(stmt, number=1, repeat=3):
+    return min(timeit.repeat(stmt, number=number, repeat=repeat)) / number
+
+
+def main(num_cities=500):
+    coordinates = make_synthetic_coordinates(num_cities)
+    trip_data = prepare_trip_data(make_synthetic_trip_data(num_cities))
+    route_index = build_route_index(trip_data)
+    tables = snapshot_arrays(trip_data, coordinates)
+    build_time = best_of(lambda: build_od_matrices(tables, {}))
+    matrices = build_od_matrices(tables, {})
+    cities = tables['pair_cities'].tolist()
+    print(f'{num_cities} cities, {len(trip_data)} routes, matrices built in {build_time * 1e3:.1f} ms')
+
+    print(f"{'query':<20}{'pandas':>12}{'route index':>14}{'matrices':>12}")
+    for name, origins in (('one to all', cities[:1]), ('20 to all', cities[:20]), ('all to all', cities)):
+        origin_ids, destination_ids = np.arange(len(origins)), np.arange(len(cities))
+        expected = savings_matrices(matrices, origin_ids, destination_ids)
+        assert np.allclose(savings_route_index(route_index, origins, cities), expected, equal_nan=True)
+        # The mask scan is too slow for the larger queries, time it on the first origin and extrapolate
+        pandas_time = best_of(lambda: savings_pandas(trip_data, origins[:1], cities), repeat=1) * len(origins)
+        index_time = best_of(lambda: savings_route_index(route_index, origins, cities))
+        matrix_time = best_of(lambda: savings_matrices(matrices, origin_ids, destination_ids), number=10)
+        print(f'{name:<20}{pandas_time * 1e3:>9.1f} ms{index_time * 1e3:>11.2f} ms{matrix_time * 1e3:>9.3f} ms')
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,75 @@
+# Benchmark ranking meeting hosts on synthetic datasets: every candidate summed origin by origin from the route
+# index vs. one gather from the leg table and one reduction over the origins (core.host_totals). Also checks that a
+# meeting with a single origin, whose map shows one city, renders with the real data.
+# Run from the repository root: python -m benchmarks.bench_meeting [num_cities num_origins ...]
+import sys
+import timeit
+
+import numpy as np
+
+from benchmarks.bench_cold_start import make_synthetic_coordinates
+from benchmarks.bench_data_load import make_synthetic_trip_data
+from core import prepare_trip_data, build_route_index, normalize_city_pair, build_od_matrices, host_totals
+from core.itinerary import LEG_METRICS
+from core.snapshot import snapshot_arrays
+from engine import meeting_response
+
+
+# Previous approach: one route lookup per origin and candidate, totals summed in Python
+def rank_per_route(route_index, names, origins, round_trip=True):
+    factor = 2 if round_trip else 1
+    totals = {}
+    for host in names:
+        train_co2 = plane_co2 = total_minutes = max_minutes = 0
+        for city, people in origins.items():
+            if city == host:
+                continue
+            route = route_index[normalize_city_pair(city, host)]
+            train_co2 += round(route.Train_CO2_kg, 1) * people * factor
+            plane_co2 += round(route.Plane_CO2_kg, 1) * people * factor
+            total_minutes += route.Duration_train_minutes * people * factor
+            max_minutes = max(max_minutes, route.Duration_train_minutes * factor)
+        totals[host] = (train_co2, plane_co2, total_minutes, max_minutes)
+    return sorted(totals, key=lambda host: totals[host][0])
+
+
+# Current approach on the same data
+def rank_vectorized(legs, names, origin_ids, counts, round_trip=True):
+    origin_legs = legs[origin_ids]
+    origin_legs[np.arange(len(origin_ids)), origin_ids] = 0
+    train_co2, _, _, _ = host_totals(origin_legs, counts, round_trip)
+    return [names[i] for i in np.argsort(train_co2, kind='stable')]
+
+
+def best_of(stmt, number, repeat=5):
+    return min(timeit.repeat(stmt, number=number, repeat=repeat)) / number
+
+
+def main(*sizes):
+    sizes = list(zip(sizes[::2], sizes[1::2])) or [(29, 6), (100, 24), (250, 48), (500, 48)]
+    print(f"{'cities':>7}{'origins':>9}{'per route':>13}{'vectorized':>13}")
+    for num_cities, num_origins in sizes:
+        trip_data = prepare_trip_data(make_synthetic_trip_data(num_cities))
+        tables = snapshot_arrays(trip_data, make_synthetic_coordinates(num_cities))
+        matrices = build_od_matrices(tables, {})
+        legs = np.stack([getattr(matrices, metric) for metric in LEG_METRICS], axis=-1)
+        names = tables['pair_cities'].tolist()
+        route_index = build_route_index(trip_data)
+
+        rng = np.random.default_rng(0)
+        origin_ids = rng.choice(num_cities, num_origins, replace=False)
+        counts = rng.integers(1, 10, num_origins).astype('float64')
+        origins = {names[i]: int(count) for i, count in zip(origin_ids.tolist(), counts.tolist())}
+
+        per_route = best_of(lambda: rank_per_route(route_index, names, origins), number=1, repeat=3)
+        vectorized = best_of(lambda: rank_vectorized(legs, names, origin_ids, counts), number=20)
+        print(f"{num_cities:>7}{num_origins:>9}{per_route * 1e3:>10.1f} ms{vectorized * 1e3:>10.2f} ms")
+
+    # One origin hosts itself: every trip has zero length and the map zooms in on the one city
+    response = meeting_response((('Amsterdam', 1),), True, 'Train_CO2_kg')
+    assert response.ranking.iloc[0]['Host'] == 'Amsterdam' and response.route_map is not None
+    print(f"Single origin: host {response.ranking.iloc[0]['Host']}")
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,53 @@
+# Benchmark the time vs. CO2 Pareto frontiers of all origins on synthetic datasets: comparing every pair of
+# options of an origin vs. the sort-and-sweep over all origins at once (core.pareto_rows)
+# Run from the repository root: python -m benchmarks.bench_pareto [num_cities ...]
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.bench_cold_start import make_synthetic_coordinates
+from benchmarks.bench_data_load import make_synthetic_trip_data
+from core import prepare_trip_data, pareto_arrays, pareto_rows
+from core.snapshot import snapshot_arrays, pair_values
+
+
+# Pairwise dominance checks of every option against every other option of its row, one row at a time
+def pareto_pairwise(minutes, co2):
+    frontier = np.zeros(minutes.shape, dtype=bool)
+    for row in range(len(minutes)):
+        m, c = minutes[row], co2[row]
+        known = ~(np.isnan(m) | np.isnan(c))
+        m, c = m[known], c[known]
+        dominated = ((m[None, :] <= m[:, None]) & (c[None, :] <= c[:, None])
+                     & ((m[None, :] < m[:, None]) | (c[None, :] < c[:, None]))).any(axis=1)
+        frontier[row, np.flatnonzero(known)] = ~dominated
+    return frontier
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main(*city_counts):
+    print(f"{'cities':>7}{'options':>9}{'pairwise':>12}{'sweep':>12}{'on frontier':>13}")
+    for num_cities in city_counts or (29, 100, 250, 500):
+        tables = snapshot_arrays(prepare_trip_data(make_synthetic_trip_data(num_cities)),
+                                 make_synthetic_coordinates(num_cities))
+        minutes = np.concatenate([pair_values(tables, 'Duration_train_minutes'),
+                                  pair_values(tables, 'Duration_plane_total_minutes')], axis=1)
+        co2 = np.concatenate([pair_values(tables, 'Train_CO2_kg'), pair_values(tables, 'Plane_CO2_kg')], axis=1)
+
+        pairwise_time, pairwise = timed(pareto_pairwise, minutes, co2)
+        sweep_time, sweep = timed(pareto_rows, minutes, co2)
+        # The sweep keeps one of exact duplicates, the pairwise check all of them
+        assert not (sweep & ~pairwise).any()
+        frontier = pareto_arrays(tables)['pareto.frontier']
+        print(f"{num_cities:>7}{2 * (num_cities - 1):>9}{pairwise_time * 1e3:>9.1f} ms{sweep_time * 1e3:>9.1f} ms"
+              f"{frontier.sum() / num_cities:>13.1f}")
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
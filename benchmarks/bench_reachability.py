@@ -0,0 +1,60 @@
+# Benchmark train reachability queries on synthetic datasets: scanning the trip data for an origin's routes
+# within a threshold vs. a binary search in the origin's sorted index (core.build_reach_index)
+# Run from the repository root: python -m benchmarks.bench_reachability [num_cities ...]
+import sys
+import time
+import timeit
+
+import numpy as np
+
+from benchmarks.bench_cold_start import make_synthetic_coordinates
+from benchmarks.bench_data_load import make_synthetic_trip_data
+from core import prepare_trip_data, build_od_matrices, build_reach_index
+from core.snapshot import snapshot_arrays
+
+# Travel time budget of the queries
+MAX_MINUTES = 8 * 60
+
+
+# Previous approach: mask scan of every route for the origin and the threshold
+def reachable_scan(trip_data, from_city, max_minutes):
+    routes = trip_data[((trip_data['City_1'] == from_city) | (trip_data['City_2'] == from_city))
+                       & (trip_data['Duration_train_minutes'] <= max_minutes)]
+    other = routes['City_2'].where(routes['City_1'] == from_city, routes['City_1'])
+    return other.iloc[np.argsort(routes['Duration_train_minutes'].to_numpy(), kind='stable')].tolist()
+
+
+# Current approach: the prefix of the origin's sorted row before the threshold
+def reachable_indexed(index, names, origin, max_minutes):
+    values = index.values[origin, :index.counts[origin]]
+    return [names[i] for i in index.order[origin, :np.searchsorted(values, max_minutes, side='right')].tolist()]
+
+
+def best_of(stmt, number, repeat=5):
+    return min(timeit.repeat(stmt, number=number, repeat=repeat)) / number
+
+
+def main(*city_counts):
+    print(f"{'cities':>7}{'index build':>14}{'scan':>12}{'indexed':>12}{'reachable':>11}")
+    for num_cities in city_counts or (29, 100, 250, 500):
+        trip_data = prepare_trip_data(make_synthetic_trip_data(num_cities))
+        tables = snapshot_arrays(trip_data, make_synthetic_coordinates(num_cities))
+        train_minutes = build_od_matrices(tables, {}).train_minutes
+        names = tables['pair_cities'].tolist()
+
+        start = time.perf_counter()
+        index = build_reach_index(train_minutes)
+        build_time = time.perf_counter() - start
+
+        origin = num_cities // 2
+        scanned = reachable_scan(trip_data, names[origin], MAX_MINUTES)
+        indexed = reachable_indexed(index, names, origin, MAX_MINUTES)
+        assert sorted(scanned) == sorted(indexed)
+        scan_time = best_of(lambda: reachable_scan(trip_data, names[origin], MAX_MINUTES), number=20)
+        indexed_time = best_of(lambda: reachable_indexed(index, names, origin, MAX_MINUTES), number=2000)
+        print(f"{num_cities:>7}{build_time * 1e3:>11.1f} ms{scan_time * 1e3:>9.2f} ms{indexed_time * 1e6:>9.1f} us"
+              f"{len(indexed):>11}")
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,80 @@
+# Benchmark the route simplification levels on an overview map with every train route and plane arc of the data:
+# the full geometry vs. the lines of the level for the map scale (core.line_level_for_scale) and plane arcs with
+# the vertices their on-screen length needs (core.adaptive_arc), per level: vertices, spec payload and render time
+# Run from the repository root: python -m benchmarks.bench_simplify
+# Render times are measured with vl-convert (pip install vl-convert-python) when it is installed.
+import json
+import time
+
+import numpy as np
+
+from basemap import clipped_basemap
+from core import city_positions, adaptive_arc, line_level_for_scale, LINE_LEVELS
+from core.geometry_store import simplify_line
+from core.routes import geometry_store, route_artifacts
+from specs import fill_template, fanout_map_template, MAP_ROTATE
+
+try:
+    import vl_convert
+except ImportError:
+    vl_convert = None
+
+# Center of the overview maps
+CENTER = [11, 49]
+
+
+def render_ms(spec):
+    if vl_convert is None:
+        return float('nan')
+    start = time.perf_counter()
+    vl_convert.vegalite_to_svg(spec)
+    return (time.perf_counter() - start) * 1e3
+
+
+def route_features(lines):
+    return [{'type': 'Feature', 'geometry': {'type': 'LineString', 'coordinates': line.tolist()},
+             'properties': {'route_type': route, 'stroke_width': 1.5}} for route, line in lines.items()]
+
+
+# Overview map of all routes at a scale, with full or simplified geometry
+def overview_spec(scale, simplified):
+    store, artifacts = geometry_store(), route_artifacts()
+    level = line_level_for_scale(scale) if simplified else None
+    train_lines = {route: store.line(route, level) for route in store.routes}
+    plane_arcs = {route: adaptive_arc(artifact.arc, scale) if simplified else artifact.arc
+                  for route, artifact in artifacts.items()}
+    from_city = [{'city': city, 'longitude': lon, 'latitude': lat} for city, (lon, lat) in city_positions().items()]
+    spec = fill_template(fanout_map_template(), params={'map_scale': scale, 'map_center': CENTER}, datasets={
+        'basemap': clipped_basemap(CENTER, scale, tuple(MAP_ROTATE)),
+        'plane_routes': route_features(plane_arcs),
+        'train_routes': route_features(train_lines),
+        'destinations': [],
+        'from_city': from_city,
+    })
+    vertices = sum(len(line) for line in train_lines.values()) + sum(len(arc) for arc in plane_arcs.values())
+    return spec, vertices
+
+
+def main():
+    store = geometry_store()
+    # Simplifying every line for all levels, as done by the geometry store build
+    start = time.perf_counter()
+    for entry in store.routes.values():
+        line_start, line_end = entry['line']
+        simplify_line(np.asarray(store.coordinates[line_start:line_end]), line_start)
+    build_ms = (time.perf_counter() - start) * 1e3
+    print(f"Simplifying {len(store)} routes for {len(LINE_LEVELS)} levels: {build_ms:.0f} ms")
+
+    # vl-convert starts its JavaScript runtime on the first call
+    render_ms(overview_spec(LINE_LEVELS[0], True)[0])
+    print(f"{'scale':>7}{'level':>7}{'geometry':>12}{'vertices':>10}{'payload':>12}{'render':>12}")
+    for scale in LINE_LEVELS:
+        for simplified in (False, True):
+            spec, vertices = overview_spec(scale, simplified)
+            payload = len(json.dumps(spec)) / 1024
+            print(f"{scale:>7}{line_level_for_scale(scale):>7}{'simplified' if simplified else 'full':>12}"
+                  f"{vertices:>10}{payload:>9.0f} KB{render_ms(spec):>9.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
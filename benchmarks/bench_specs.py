@@ -0,0 +1,121 @@
+# Benchmark the chart-build share of a search rerun: Altair charts built and validated per request
+# vs. compiled templates filled with the request's data
+# Run from the repository root: python -m benchmarks.bench_specs
+import timeit
+
+import altair as alt
+import pandas as pd
+
+from engine import lookup, scale, geometry, specs, CHART_STRATEGIES
+from specs import DURATION_LABEL_EXPR, COLORS
+from core import coordinates_data, get_route, minutes_to_str, calculate_tick_values, get_projection_params, \
+    load_geojson_lines, load_geojson_points, generate_curved_arc
+from utils import europe_basemap
+
+PAIRS = [('Amsterdam', 'Berlin'), ('Berlin', 'Dresden'), ('Luxembourg City', 'Riga'), ('Vienna', 'Bratislava')]
+
+
+# Values the main page computes before building its charts
+def search_values(from_city, to_city):
+    travel_info = get_route(from_city, to_city)
+    plane_minutes = None if pd.isna(travel_info.Duration_plane_total_minutes) else \
+        travel_info.Duration_plane_total_minutes
+    plane_co2 = 0 if plane_minutes is None else round(travel_info.Plane_CO2_kg, 1)
+    train_minutes, train_co2 = travel_info.Duration_train_minutes, round(travel_info.Train_CO2_kg, 1)
+    return train_minutes, train_co2, plane_minutes, plane_co2
+
+
+# Previous per-request build: the main page's three charts through Altair, validated by to_dict
+def build_altair(from_city, to_city, train_minutes, train_co2, plane_minutes, plane_co2):
+    train_duration = minutes_to_str(train_minutes)
+    plane_duration = minutes_to_str(plane_minutes) if plane_minutes is not None else "N/A"
+    duration_data = pd.DataFrame({'Mode': ['🚂', '✈️'], 'Duration': [train_duration, plane_duration],
+                                  'Duration_minutes': [train_minutes, plane_minutes or 0]})
+    tick_values = calculate_tick_values(0, duration_data['Duration_minutes'].max())
+    duration_chart = alt.Chart(duration_data).mark_bar().encode(
+        y=alt.Y('Mode', title=None, axis=alt.Axis(labelFontSize=13)),
+        x=alt.X('Duration_minutes:Q', title=None, axis=alt.Axis(values=tick_values, labelExpr=DURATION_LABEL_EXPR)),
+        tooltip=[alt.Tooltip('Duration', title='Duration'), alt.Tooltip('Mode', title='Mode')],
+        color=alt.Color('Mode', legend=None).scale(range=COLORS),
+    ).properties(title='Travel Duration')
+    duration_labels = alt.Chart(duration_data).mark_text(align='right', baseline='middle', color='black', dx=-5).encode(
+        y=alt.Y('Mode', title=None), x=alt.X('Duration_minutes:Q'), text=alt.Text('Duration'), tooltip=alt.value(''))
+
+    emissions_data = pd.DataFrame({'Mode': ['🚂', '✈️'], 'CO2_kg': [train_co2, plane_co2]})
+    emissions_chart = alt.Chart(emissions_data).mark_bar().encode(
+        x=alt.X('CO2_kg', title=None), y=alt.Y('Mode', title=None, axis=alt.Axis(labelFontSize=13)),
+        color=alt.Color('Mode', legend=None).scale(range=COLORS)).properties(title='Carbon Emissions')
+    emissions_labels = alt.Chart(emissions_data).mark_text(align='right', baseline='middle', color='black', dx=-5).encode(
+        y=alt.Y('Mode', title=None), x=alt.X('CO2_kg'), tooltip=alt.value('')
+    ).transform_calculate(label="round(datum.CO2_kg) + ' kg'").encode(text=alt.Text('label:N'))
+
+    coordinates = coordinates_data()
+    city_data = coordinates[coordinates['city'].isin([from_city, to_city])]
+    from_city_data = city_data[city_data['city'] == from_city].iloc[0]
+    to_city_data = city_data[city_data['city'] == to_city].iloc[0]
+    projection_params = get_projection_params([
+        {'city': from_city, 'lon': from_city_data['longitude'], 'lat': from_city_data['latitude']},
+        {'city': to_city, 'lon': to_city_data['longitude'], 'lat': to_city_data['latitude']}])
+    projection = dict(scale=projection_params['scale'], center=projection_params['center'], rotate=[5, 0, 0])
+
+    base = alt.Chart(europe_basemap(projection_params['scale'], projection_params['center'], rotate=[5, 0, 0])) \
+        .mark_geoshape(fill='lightgray', stroke='white', strokeWidth=0.5).project('mercator', **projection) \
+        .properties(height=500).encode(tooltip=alt.value(''))
+    points = [
+        alt.Chart(pd.DataFrame([city])).mark_circle(color='#FF6F61', size=300, opacity=0.9)
+        .project('mercator', **projection).transform_calculate(tooltip_text=f'"{label}: " + datum.city')
+        .encode(longitude='longitude:Q', latitude='latitude:Q', tooltip=alt.Tooltip('tooltip_text:N'))
+        for label, city in (('From', from_city_data), ('To', to_city_data))
+    ]
+    train_route = alt.Chart(alt.Data(values=[{
+        'type': 'LineString', 'coordinates': load_geojson_lines(from_city, to_city)['features'][0]['geometry']['coordinates'],
+        'route_type': f"Train from {from_city} to {to_city}", 'Train_CO2_kg': f"{train_co2} kg",
+        'Duration_train': train_duration}])).mark_geoshape(
+        fill=None, stroke='forestgreen', strokeWidth=train_co2 / 15, opacity=0.7).project('mercator', **projection).encode(
+        tooltip=[alt.Tooltip('route_type:N', title='Route'), alt.Tooltip('Train_CO2_kg:N', title='CO2'),
+                 alt.Tooltip('Duration_train:N', title='Duration')])
+    train_stops = alt.Chart(alt.Data(values=load_geojson_points(from_city, to_city)['features'])).mark_circle(
+        color='#728370', size=100, opacity=0.8).project('mercator', **projection).encode(
+        longitude='geometry.coordinates[0]:Q', latitude='geometry.coordinates[1]:Q',
+        tooltip=alt.Tooltip('properties.stop_name:N'))
+    if plane_minutes is None:
+        plane_route = alt.Chart(pd.DataFrame()).mark_geoshape()
+    else:
+        arc = generate_curved_arc([from_city_data['longitude'], from_city_data['latitude']],
+                                  [to_city_data['longitude'], to_city_data['latitude']])
+        plane_route = alt.Chart(alt.Data(values=[{
+            'type': 'LineString', 'coordinates': arc, 'route_type': f"Plane from {from_city} to {to_city}",
+            'Plane_CO2_kg': f"{plane_co2} kg", 'Duration_plane_total': plane_duration}])).mark_geoshape(
+            fill=None, stroke='indianred', strokeWidth=plane_co2 / 15).project('mercator', **projection).encode(
+            tooltip=[alt.Tooltip('route_type:N', title='Route'), alt.Tooltip('Plane_CO2_kg:N', title='CO2'),
+                     alt.Tooltip('Duration_plane_total:N', title='Duration')])
+
+    return [(duration_chart + duration_labels).to_dict(), (emissions_chart + emissions_labels).to_dict(),
+            (base + plane_route + train_route + train_stops + points[0] + points[1]).to_dict()]
+
+
+# Current per-request build: the rendering pipeline filling the compiled templates
+def build_templates(from_city, to_city, num_people=1, round_trip=False):
+    trip = scale(lookup(from_city, to_city), num_people, round_trip)
+    return specs(CHART_STRATEGIES['horizontal_bars'], from_city, to_city, trip, geometry(from_city, to_city))
+
+
+def best_of(stmt, number, repeat=5):
+    return min(timeit.repeat(stmt, number=number, repeat=repeat)) / number
+
+
+def main():
+    print(f"{'route':<26}{'Altair':>12}{'templates':>14}{'speedup':>9}")
+    for from_city, to_city in PAIRS:
+        values = search_values(from_city, to_city)
+        # Warm the geometry, basemap and template caches so only the per-request build is timed
+        build_altair(from_city, to_city, *values)
+        build_templates(from_city, to_city)
+        altair_time = best_of(lambda: build_altair(from_city, to_city, *values), number=5)
+        template_time = best_of(lambda: build_templates(from_city, to_city), number=200)
+        print(f"{from_city + '-' + to_city:<26}{altair_time * 1e3:>9.1f} ms{template_time * 1e6:>11.1f} us"
+              f"{altair_time / template_time:>8.0f}x")
+
+
+if __name__ == '__main__':
+    main()
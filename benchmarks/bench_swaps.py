@@ -0,0 +1,75 @@
+# Benchmark the best train swaps ranking on synthetic datasets: scoring and sorting the whole trip data per query
+# vs. a heap-based top k over the precomputed scores vs. the first k rows of the pre-sorted swap table passing
+# the filters (core.top_swaps)
+# Run from the repository root: python -m benchmarks.bench_swaps [num_cities ...]
+import heapq
+import sys
+import time
+import timeit
+
+import numpy as np
+
+from benchmarks.bench_cold_start import make_synthetic_coordinates
+from benchmarks.bench_data_load import make_synthetic_trip_data
+from core import prepare_trip_data, build_swap_table, top_swaps, MIN_EXTRA_HOURS
+from core.snapshot import snapshot_arrays
+
+# Swaps per query
+TOP_K = 10
+
+
+# Previous approach: score every route of the trip data and sort them all
+def swaps_sorted(trip_data, k, from_city=None, max_train_minutes=None):
+    routes = trip_data
+    if from_city is not None:
+        routes = routes[(routes['City_1'] == from_city) | (routes['City_2'] == from_city)]
+    if max_train_minutes is not None:
+        routes = routes[routes['Duration_train_minutes'] <= max_train_minutes]
+    saved = routes['Plane_CO2_kg'].round(1) - routes['Train_CO2_kg'].round(1)
+    extra_hours = (routes['Duration_train_minutes'] - routes['Duration_plane_total_minutes']) / 60
+    score = (saved / extra_hours.clip(lower=MIN_EXTRA_HOURS))[saved > 0]
+    return score.sort_values(ascending=False).head(k)
+
+
+# Heap-based top k over the scores of the swap table passing the filters
+def swaps_heap(swaps, k, from_city_id=None, max_train_minutes=None):
+    mask = np.ones(len(swaps.score), dtype=bool)
+    if from_city_id is not None:
+        mask &= (swaps.city_1 == from_city_id) | (swaps.city_2 == from_city_id)
+    if max_train_minutes is not None:
+        mask &= swaps.train_minutes <= max_train_minutes
+    candidates = np.flatnonzero(mask)
+    return [index for _, index in heapq.nlargest(k, zip(swaps.score[candidates].tolist(), candidates.tolist()))]
+
+
+def best_of(stmt, number, repeat=5):
+    return min(timeit.repeat(stmt, number=number, repeat=repeat)) / number
+
+
+def main(*city_counts):
+    print(f"{'cities':>7}{'routes':>9}{'table build':>14}{'query':>10}{'sorted':>12}{'heap':>12}{'sorted table':>15}")
+    for num_cities in city_counts or (29, 100, 250, 500):
+        trip_data = prepare_trip_data(make_synthetic_trip_data(num_cities))
+        tables = snapshot_arrays(trip_data, make_synthetic_coordinates(num_cities))
+        start = time.perf_counter()
+        swaps = build_swap_table(tables)
+        build_time = time.perf_counter() - start
+
+        from_city = tables['pair_cities'][num_cities // 2]
+        queries = {
+            'all': ((), (TOP_K,)),
+            'filtered': ((from_city, 8 * 60), (TOP_K, num_cities // 2, 8 * 60)),
+        }
+        for name, (sorted_args, heap_args) in queries.items():
+            sorted_time = best_of(lambda: swaps_sorted(trip_data, TOP_K, *sorted_args), number=5)
+            heap_time = best_of(lambda: swaps_heap(swaps, *heap_args), number=20)
+            table_time = best_of(lambda: top_swaps(swaps, *heap_args), number=20)
+            # Same scores (ties may be ordered differently)
+            assert np.array_equal(swaps.score[swaps_heap(swaps, *heap_args)],
+                                  swaps.score[top_swaps(swaps, *heap_args)])
+            print(f"{num_cities:>7}{len(trip_data):>9}{build_time * 1e3:>11.1f} ms{name:>10}"
+                  f"{sorted_time * 1e3:>9.2f} ms{heap_time * 1e3:>9.2f} ms{table_time * 1e3:>12.3f} ms")
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
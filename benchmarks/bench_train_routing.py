@@ -0,0 +1,64 @@
+# Benchmark the chained-train routing on synthetic datasets: vectorized Floyd-Warshall and best two-leg chains
+# vs. the same Floyd-Warshall in plain Python (timed on a subset and extrapolated, it is O(C^3))
+# Run from the repository root: python -m benchmarks.bench_train_routing [num_cities ...]
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.bench_cold_start import make_synthetic_coordinates
+from benchmarks.bench_data_load import make_synthetic_trip_data
+from core import prepare_trip_data, shortest_train_paths, best_two_leg_chains, TRANSFER_MINUTES
+from core.snapshot import snapshot_arrays, pair_values
+
+# Cities the plain Python version is timed on
+PYTHON_CITIES = 80
+
+
+# Textbook Floyd-Warshall over lists, with the same transfer handling as shortest_train_paths
+def shortest_paths_python(minutes, transfer_minutes=TRANSFER_MINUTES):
+    num_cities = len(minutes)
+    distance = [[0.0 if i == j else (float('inf') if np.isnan(minutes[i][j]) else minutes[i][j] + transfer_minutes)
+                 for j in range(num_cities)] for i in range(num_cities)]
+    for k in range(num_cities):
+        row_k = distance[k]
+        for i in range(num_cities):
+            row_i, d_ik = distance[i], distance[i][k]
+            for j in range(num_cities):
+                if d_ik + row_k[j] < row_i[j]:
+                    row_i[j] = d_ik + row_k[j]
+    return distance
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main(*city_counts):
+    print(f"{'cities':>7}{'all pairs':>12}{'two-leg':>12}{'Python (est.)':>15}{'faster via':>12}")
+    for num_cities in city_counts or (29, 100, 250, 500, 750):
+        tables = snapshot_arrays(prepare_trip_data(make_synthetic_trip_data(num_cities)),
+                                 make_synthetic_coordinates(num_cities))
+        minutes, co2 = pair_values(tables, 'Duration_train_minutes'), pair_values(tables, 'Train_CO2_kg')
+
+        paths_time, (path_minutes, _, _) = timed(shortest_train_paths, minutes, co2)
+        chains_time, (_, via_minutes, _) = timed(best_two_leg_chains, minutes, co2, TRANSFER_MINUTES)
+
+        subset = min(num_cities, PYTHON_CITIES)
+        python_time, python_distance = timed(shortest_paths_python, minutes[:subset, :subset].tolist())
+        python_time *= (num_cities / subset) ** 3
+        if subset == num_cities:
+            expected = np.array(python_distance) - TRANSFER_MINUTES
+            np.fill_diagonal(expected, np.nan)
+            assert np.allclose(expected, path_minutes, equal_nan=True)
+
+        with np.errstate(invalid='ignore'):
+            faster = int((via_minutes < minutes).sum()) // 2
+        print(f"{num_cities:>7}{paths_time * 1e3:>9.1f} ms{chains_time * 1e3:>9.1f} ms{python_time:>13.1f} s"
+              f"{faster / (num_cities * (num_cities - 1) // 2):>11.0%}")
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
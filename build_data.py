@@ -0,0 +1,110 @@
+# Build the derived data files the app loads at runtime
+# Usage, from the repository root: python build_data.py flights | snapshot | geometry | routes | basemap --source <file> ...
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from basemap import build_basemap, BASEMAP_DIR
+from core.geometry_store import build_geometry_store, GeometryStore, GEOMETRY_STORE_PATH, LINE_LEVELS
+from core.route_artifacts import build_route_artifacts, ROUTE_ARTIFACTS_PATH
+from core.snapshot import SNAPSHOT_PATH, pair_values
+from core.flights import DIRECT_FLIGHTS_PATH, HUB_AIRPORTS
+from core.trips import TRIPS_DATA_PATH, COORDINATES_PATH
+
+
+# Seed the direct-connection table with the hub rule; run before the snapshot, which routes over it
+def seed_flights(args):
+    from core import prepare_trip_data, seed_direct_flights
+    trip_data = prepare_trip_data(pd.read_csv(args.trips))
+    direct_flights = seed_direct_flights(trip_data, args.hubs)
+    direct_flights.to_csv(args.output, index=False)
+    print(f"Wrote {len(direct_flights)} of {len(trip_data)} flights as direct to {args.output}")
+
+
+def build_snapshot(args):
+    from core import build_trip_snapshot
+    tables = build_trip_snapshot(args.trips, args.coordinates, args.direct_flights, args.output)
+    print(f"Compiled {len(tables['pair_cities'])} cities and {len(tables['trips.ID'])} routes into {args.output}")
+    # Report what the chained-train routing found
+    with np.errstate(invalid='ignore'):
+        direct = pair_values(tables, 'Duration_train_minutes')
+        faster = int((tables['routing.via_minutes'] < direct).sum()) // 2
+        filled = int((np.isnan(direct) & ~np.isnan(tables['routing.path_minutes'])).sum()) // 2
+    print(f"{faster} pairs have a faster two-leg train chain, {filled} pairs without a direct train value take "
+          f"the shortest chained train")
+    # and the connecting-flight routing
+    legs = tables['flights.legs']
+    print(f"{int((legs >= 2).sum()) // 2} pairs fly with a connection"
+          f"{' (direct flights assumed with the hub rule)' if tables['flights.assumed'] else ''}, "
+          f"{int((legs == 0).sum() - len(legs)) // 2} pairs without a flight")
+    # and the size of the Pareto frontiers
+    print(f"{tables['pareto.frontier'].sum() / len(legs):.1f} trips per city on the time vs. CO2 Pareto frontier")
+
+
+def build_geometry(args):
+    num_routes = build_geometry_store(args.lines_dir, args.points_dir, args.output)
+    store = GeometryStore(args.output)
+    print(f"Packed {num_routes} routes into {args.output}, "
+          f"{sum(store.length_km(route) for route in store.routes):,.0f} km of train lines")
+    # Vertices kept by every simplification level
+    vertices = [sum(len(store.line(route, level)) for route in store.routes) for level in range(len(LINE_LEVELS))]
+    print(f"{sum(len(store.line(route)) for route in store.routes)} line vertices, simplified for map scales "
+          + ', '.join(f"{scale}: {count}" for scale, count in zip(LINE_LEVELS, vertices)))
+
+
+# Run after the geometry store, the route artifacts include the number of train transfers
+def build_routes(args):
+    from core import route_inputs, derive_route_artifact
+    recomputed, num_routes = build_route_artifacts(route_inputs(), derive_route_artifact, args.output)
+    print(f"Recomputed {recomputed} of {num_routes} routes in {args.output}")
+
+
+def build_basemap_levels(args):
+    for path, size, num_points in build_basemap(args.source, args.output_dir):
+        print(f"{path}: {size / 1024:.1f} KB, {num_points} points")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    flights = subparsers.add_parser('flights', help='seed the direct-connection table: flights touching a hub '
+                                                    'airport are direct')
+    flights.add_argument('--trips', default=TRIPS_DATA_PATH)
+    flights.add_argument('--hubs', nargs='+', default=HUB_AIRPORTS)
+    flights.add_argument('--output', default=DIRECT_FLIGHTS_PATH)
+    flights.set_defaults(func=seed_flights)
+
+    snapshot = subparsers.add_parser('snapshot', help='compile the trip and city CSVs into the snapshot loaded '
+                                                      'at startup')
+    snapshot.add_argument('--trips', default=TRIPS_DATA_PATH)
+    snapshot.add_argument('--coordinates', default=COORDINATES_PATH)
+    snapshot.add_argument('--direct-flights', default=DIRECT_FLIGHTS_PATH)
+    snapshot.add_argument('--output', default=SNAPSHOT_PATH)
+    snapshot.set_defaults(func=build_snapshot)
+
+    geometry = subparsers.add_parser('geometry', help='pack route GeoJSON files into the binary geometry store')
+    geometry.add_argument('--lines-dir', default='geojson_files/lines')
+    geometry.add_argument('--points-dir', default='geojson_files/points')
+    geometry.add_argument('--output', default=GEOMETRY_STORE_PATH)
+    geometry.set_defaults(func=build_geometry)
+
+    routes = subparsers.add_parser('routes', help='precompute projections, plane arcs, transfers and axis ticks '
+                                                  'per route (incremental)')
+    routes.add_argument('--output', default=ROUTE_ARTIFACTS_PATH)
+    routes.set_defaults(func=build_routes)
+
+    basemap = subparsers.add_parser('basemap', help='simplify a Europe GeoJSON/TopoJSON into basemap levels of detail')
+    basemap.add_argument('--source', nargs='+', required=True,
+                         help='GeoJSON FeatureCollection or TopoJSON files of European countries; further files only '
+                              'add the countries the first ones lack')
+    basemap.add_argument('--output-dir', default=BASEMAP_DIR)
+    basemap.set_defaults(func=build_basemap_levels)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
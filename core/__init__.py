@@ -0,0 +1,82 @@
+import importlib
+
+# Headless core of the travel planner: route lookup and train vs. plane comparisons, map projections, plane arcs
+# and train transfers, with no Streamlit or Altair dependency. Batch jobs, tests and workers can use it directly;
+# the Streamlit pages are a presentation layer on top of it.
+#
+# Importing core is cheap: submodules (and numpy/pandas with them) are imported when one of their names is
+# first accessed, and the trip data, geometry store and route artifacts are loaded on first use.
+#
+#   core.trips            trip and city data, route index
+#   core.snapshot         compiled trip and city data snapshot
+#   core.geodesy          vectorized haversine and geodesic distances, polyline lengths
+#   core.geo              projection, plane arc, transfers, duration axis ticks, line simplification
+#   core.routes           train route geometry, precomputed route artifacts, route comparisons
+#   core.matrices         dense origin x destination matrices of all comparison metrics, chained-train and
+#                         connecting-flight routing
+#   core.graph            vectorized all-pairs shortest paths and best two-leg paths
+#   core.train_routing    all-pairs shortest train chains and best two-leg chains
+#   core.flights          connecting flights over the airport graph
+#   core.pareto           time vs. CO2 Pareto frontiers of every origin
+#   core.emissions        per-route distances and CO2 of all pairs for other emission factors
+#   core.fanout           one origin to all destinations comparison, Pareto frontier and route geometry
+#   core.itinerary        multi-leg itineraries with a suggested mode per leg
+#   core.meeting          meeting host cities ranked for people from several origins
+#   core.reachability     cities reachable by train within a time or CO2 budget
+#   core.swaps            routes where switching from plane to train saves the most CO2 per added hour
+#   core.geometry_store   binary train route geometry store with simplified line levels
+#   core.route_artifacts  per-route artifacts file
+#   core.cache            process-wide LRU caches
+
+_SUBMODULE_EXPORTS = {
+    'trips': ['TRIPS_DATA_PATH', 'COORDINATES_PATH', 'normalize_city_pair', 'normalize_city_pairs',
+              'prepare_trip_data', 'load_trip_tables', 'build_trip_snapshot', 'trip_tables', 'trip_data',
+              'coordinates_data', 'cities', 'city_positions', 'Route', 'build_route_index', 'route_index',
+              'get_route', 'has_flight'],
+    'geodesy': ['EARTH_RADIUS_KM', 'haversine_km', 'geodesic_km', 'segment_km', 'polyline_distances'],
+    'geo': ['get_projection_params', 'calculate_transfers', 'generate_curved_arc', 'minutes_to_str',
+            'calculate_tick_values', 'degrees_per_pixel', 'mercator_y', 'mercator_latitude', 'douglas_peucker',
+            'ARC_PX_PER_SEGMENT', 'ARC_MIN_POINTS', 'adaptive_arc'],
+    'geometry_store': ['LINE_LEVELS', 'LINE_TOLERANCE_PX', 'line_level_for_scale'],
+    'routes': ['geometry_store', 'geometry_store_version', 'load_geojson_lines',
+               'load_geojson_points', 'route_inputs', 'derive_route_artifact', 'route_artifact', 'Trip',
+               'scale_trip', 'compare_route'],
+    'matrices': ['ODMatrices', 'matrix_cities', 'city_ids', 'great_circle_km', 'build_od_matrices', 'od_matrices',
+                 'od_values', 'TrainRouting', 'ViaSuggestion', 'train_routing_matrices', 'faster_via_pairs',
+                 'via_suggestion', 'train_path', 'FlightRouting', 'ConnectingFlight', 'flight_routing_matrices',
+                 'flight_path', 'connecting_flight'],
+    'graph': ['shortest_paths', 'path_sums', 'best_two_leg_chains'],
+    'train_routing': ['TRANSFER_MINUTES', 'shortest_train_paths', 'routing_arrays'],
+    'flights': ['DIRECT_FLIGHTS_PATH', 'CONNECTION_MINUTES', 'AIRPORT_MINUTES', 'HUB_AIRPORTS', 'seed_direct_flights',
+                'read_direct_flights', 'direct_flights_assumed', 'flight_arrays'],
+    'pareto': ['PARETO_MODES', 'pareto_rows', 'pareto_arrays'],
+    'emissions': ['EmissionFactors', 'TRAVELCO2_FACTORS', 'SEAT_CLASSES', 'EmissionDistances', 'EmissionMatrices',
+                  'EmissionSummary', 'build_emission_distances', 'emission_distances', 'co2_for_factors',
+                  'emission_matrices', 'emission_summary'],
+    'fanout': ['compare_from', 'origin_frontier', 'origin_geometry', 'origin_positions', 'minutes_to_strs',
+               'round_co2'],
+    'itinerary': ['ItineraryPlan', 'ItineraryTotal', 'plan_itinerary', 'best_stop_order', 'leg_table',
+                  'DEFAULT_MAX_EXTRA_MINUTES'],
+    'meeting': ['RANKING_METRICS', 'host_totals', 'rank_hosts'],
+    'reachability': ['REACH_METRICS', 'ReachIndex', 'Reachable', 'build_reach_index', 'reach_indexes',
+                     'reachable_from'],
+    'swaps': ['MIN_EXTRA_HOURS', 'SwapTable', 'build_swap_table', 'swap_table', 'top_swaps', 'best_train_swaps'],
+}
+
+_EXPORTS = {name: submodule for submodule, names in _SUBMODULE_EXPORTS.items() for name in names}
+
+__all__ = sorted(_EXPORTS)
+
+
+# Import the submodule defining a public name on first access (PEP 562)
+def __getattr__(name):
+    submodule = _EXPORTS.get(name)
+    if submodule is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'{__name__}.{submodule}'), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
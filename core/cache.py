@@ -0,0 +1,85 @@
+import functools
+import threading
+from collections import OrderedDict
+
+# Bounded LRU caches shared by all sessions in a server process (Streamlit runs sessions as threads)
+
+_MISSING = object()
+
+
+class LRUCache:
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    # Return the cached value and mark it as most recently used, or default on a miss
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return default
+
+    # Store a value, evicting the least recently used entries beyond maxsize
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    # Drop a single entry, returning whether it was cached
+    def evict(self, key):
+        with self._lock:
+            return self._entries.pop(key, _MISSING) is not _MISSING
+
+    # Drop all entries; the counters are kept so they describe the whole process lifetime
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'size': len(self._entries), 'maxsize': self.maxsize}
+
+
+# Decorator caching a function's results by its positional arguments in an LRUCache.
+# version is called on every lookup; when its return value changes (e.g. a data file's mtime),
+# the cache is cleared before the lookup. key, if given, maps the arguments to the cache key, so that argument
+# tuples with the same result share one entry. Results are cached for the whole process and shared between
+# sessions, so callers of every lru_cached function must treat them as read-only.
+def lru_cached(maxsize=128, version=None, key=None):
+    def decorator(func):
+        cache = LRUCache(maxsize)
+        current_version = [_MISSING]
+
+        @functools.wraps(func)
+        def wrapper(*args):
+            if version is not None:
+                token = version()
+                if token != current_version[0]:
+                    cache.clear()
+                    current_version[0] = token
+            cache_key = args if key is None else key(*args)
+            value = cache.get(cache_key, _MISSING)
+            if value is _MISSING:
+                value = func(*args)
+                cache.put(cache_key, value)
+            return value
+
+        wrapper.cache = cache
+        return wrapper
+    return decorator
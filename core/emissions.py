@@ -0,0 +1,82 @@
+from collections import namedtuple
+
+import numpy as np
+
+from core.cache import lru_cached
+from core.matrices import od_matrices
+from core.routes import geometry_store_version
+
+# Emission factor what-if: per-route distances and CO2 of every city pair recomputed for other emission factors
+# than the TravelCO2 ones of the trips table (radiative forcing, rail grid mixes, seat classes).
+#
+# CO2 is distance x factor. The passenger-km of every pair are the ones the stored TravelCO2 values were computed
+# for (stored CO2 / TRAVELCO2_FACTORS): the plane ones are the great-circle distances within a few percent, while
+# the route polylines are simplified and about 1.45 times shorter than the TravelCO2 rail distances, so they are
+# kept next to them (rail_km) but not used for emissions. All distances are (C, C) matrices indexed like the
+# od_matrices and derived from them once per process; a new factor set only multiplies them.
+
+# Emission factors in g CO2e per passenger-km, and multipliers of the plane factor for non-CO2 effects of
+# flying at altitude (1 = CO2 only) and for the seat class (see SEAT_CLASSES)
+EmissionFactors = namedtuple('EmissionFactors', ['train_g_per_pkm', 'plane_g_per_pkm', 'radiative_forcing',
+                                                 'seat_class'])
+
+# Factors of the TravelCO2 methodology used for the trips table
+TRAVELCO2_FACTORS = EmissionFactors(24.0, 127.0, 1.0, 1.0)
+
+# Typical long-haul multipliers of the economy plane factor by the floor space of the seat
+SEAT_CLASSES = {'Economy': 1.0, 'Premium economy': 1.6, 'Business': 2.9, 'First': 4.0}
+
+# (C, C) passenger-km of the train and plane trips of every pair (NaN without the mode), length of the train
+# route polyline (NaN without geometry) and great-circle distance between the cities
+EmissionDistances = namedtuple('EmissionDistances', ['train_km', 'plane_km', 'rail_km', 'great_circle_km'])
+
+# (C, C) CO2 in kg per person one way of every pair for a factor set, NaN without the mode
+EmissionMatrices = namedtuple('EmissionMatrices', ['train_co2', 'plane_co2'])
+
+
+# Distances of all pairs from core.ODMatrices
+def build_emission_distances(matrices):
+    return EmissionDistances(
+        train_km=matrices.train_co2 * 1000 / TRAVELCO2_FACTORS.train_g_per_pkm,
+        plane_km=matrices.plane_co2 * 1000 / TRAVELCO2_FACTORS.plane_g_per_pkm,
+        rail_km=matrices.train_km,
+        great_circle_km=matrices.distance_km,
+    )
+
+
+# Distances of the current trip data and geometry store, shared by all sessions
+@lru_cached(maxsize=1, version=geometry_store_version)
+def emission_distances():
+    return build_emission_distances(od_matrices())
+
+
+# CO2 of all pairs for a factor set, in one vectorized pass over the distance matrices
+def co2_for_factors(distances, factors):
+    plane_g_per_pkm = factors.plane_g_per_pkm * factors.radiative_forcing * factors.seat_class
+    return EmissionMatrices(distances.train_km * (factors.train_g_per_pkm / 1000),
+                            distances.plane_km * (plane_g_per_pkm / 1000))
+
+
+# CO2 of all pairs for an EmissionFactors, cached per factor set for all sessions.
+# The TravelCO2 factors return the stored values of the trips table.
+@lru_cached(maxsize=64, version=geometry_store_version)
+def emission_matrices(factors):
+    if factors == TRAVELCO2_FACTORS:
+        matrices = od_matrices()
+        return EmissionMatrices(matrices.train_co2, matrices.plane_co2)
+    return co2_for_factors(emission_distances(), factors)
+
+
+# Routes with both a train and a flight, the number of them where the train emits less CO2 and the CO2 per person
+# saved one way by taking the train on all of those
+EmissionSummary = namedtuple('EmissionSummary', ['routes', 'train_cleaner', 'co2_saved_kg'])
+
+
+# Summary of all routes for an EmissionFactors
+def emission_summary(factors):
+    emissions = emission_matrices(factors)
+    # Every route once
+    both = (np.triu(np.ones(emissions.train_co2.shape, dtype=bool), k=1)
+            & ~np.isnan(emissions.train_co2) & ~np.isnan(emissions.plane_co2))
+    saved = (emissions.plane_co2 - emissions.train_co2)[both]
+    return EmissionSummary(int(both.sum()), int((saved > 0).sum()), float(saved[saved > 0].sum()))
@@ -0,0 +1,126 @@
+import numpy as np
+import pandas as pd
+
+from core.cache import lru_cached
+from core.emissions import emission_matrices, emission_distances
+from core.geo import adaptive_arc
+from core.geometry_store import line_level_for_scale
+from core.matrices import od_matrices, matrix_cities, city_ids
+from core.routes import geometry_store, geometry_store_version, route_artifacts, route_artifact
+from core.pareto import PARETO_MODES, pareto_rows
+from core.trips import normalize_city_pair, city_positions, trip_tables
+
+# One origin to all destinations: train vs. plane comparison of every route from a city in one vectorized pass
+# over the origin's row of the od_matrices, and the route geometry of all of them loaded in one go
+
+
+# Zero-padded "HH:MM" strings of an array of minutes (like minutes_to_str), None where the value is NaN
+def minutes_to_strs(minutes):
+    strings = np.full(len(minutes), None, dtype=object)
+    known = ~np.isnan(minutes)
+    if not known.any():
+        return strings
+    hours, rest = np.divmod(minutes[known].astype('int64'), 60)
+    strings[known] = np.char.add(np.char.add(np.char.zfill(hours.astype(str), 2), ':'),
+                                 np.char.zfill(rest.astype(str), 2))
+    return strings
+
+
+# CO2 values rounded to 0.1 kg in one pass like scale_trip, NaN (no trip) stays NaN
+def round_co2(co2):
+    return np.round(np.asarray(co2, dtype='float64'), 1)
+
+
+# Comparison of every destination with travel data from a city, scaled like scale_trip: one row per destination
+# in city order, with durations in minutes and as "HH:MM" strings, CO2 in kg, the CO2 saved by taking the train,
+# train transfers, great-circle distance and rail distance of the train trip in km (core.emission_distances).
+# Plane values are NaN/None without a flight. CO2 is computed with the stored TravelCO2 values, or with
+# core.EmissionFactors if given.
+def compare_from(from_city, num_people=1, round_trip=False, factors=None):
+    matrices = od_matrices()
+    emissions = matrices if factors is None else emission_matrices(factors)
+    origin = city_ids([from_city])[0]
+    destinations = np.flatnonzero(~np.isnan(matrices.train_minutes[origin]))
+    factor = 2 if round_trip else 1
+
+    train_minutes = matrices.train_minutes[origin, destinations] * factor
+    plane_minutes = matrices.plane_minutes[origin, destinations] * factor
+    # CO2 is rounded per person and one way first, like scale_trip
+    train_co2 = round_co2(emissions.train_co2[origin, destinations]) * num_people * factor
+    plane_co2 = round_co2(emissions.plane_co2[origin, destinations]) * num_people * factor
+
+    return pd.DataFrame({
+        'To': np.array(matrix_cities(), dtype=object)[destinations],
+        'Train_minutes': train_minutes,
+        'Train_duration': minutes_to_strs(train_minutes),
+        'Plane_minutes': plane_minutes,
+        'Plane_duration': minutes_to_strs(plane_minutes),
+        'Train_CO2_kg': train_co2,
+        'Plane_CO2_kg': plane_co2,
+        'CO2_saved_kg': plane_co2 - train_co2,
+        'Transfers': pd.array(matrices.transfers[origin, destinations], dtype='Float64').astype('Int64'),
+        'Distance_km': matrices.distance_km[origin, destinations],
+        'Train_km': emission_distances().train_km[origin, destinations],
+    })
+
+
+# Every trip from a city by train and by plane (one row per destination and mode with travel data, fastest
+# first) with its duration and CO2 scaled like compare_from, and whether it is on the city's time vs. CO2 Pareto
+# frontier (core.pareto). With core.EmissionFactors the frontier is recomputed for their CO2.
+def origin_frontier(from_city, num_people=1, round_trip=False, factors=None):
+    comparison = compare_from(from_city, num_people, round_trip, factors)
+    origin, destinations = city_ids([from_city])[0], city_ids(comparison['To'])
+    if factors is None:
+        frontier = trip_tables()['pareto.frontier'][origin][:, destinations]
+    else:
+        matrices, emissions = od_matrices(), emission_matrices(factors)
+        frontier = pareto_rows(
+            np.concatenate([matrices.train_minutes[origin, destinations],
+                            matrices.plane_minutes[origin, destinations]])[None, :],
+            np.concatenate([emissions.train_co2[origin, destinations],
+                            emissions.plane_co2[origin, destinations]])[None, :],
+        ).reshape(len(PARETO_MODES), len(destinations))
+    options = pd.concat([
+        pd.DataFrame({
+            'To': comparison['To'],
+            'Mode': mode,
+            'Minutes': comparison[f'{mode}_minutes'],
+            'Duration': comparison[f'{mode}_duration'],
+            'CO2_kg': comparison[f'{mode}_CO2_kg'],
+            'Pareto': frontier[i],
+        }) for i, mode in enumerate(PARETO_MODES)
+    ], ignore_index=True).dropna(subset=['Minutes', 'CO2_kg'])
+    return options.sort_values(['Minutes', 'CO2_kg'], kind='stable').reset_index(drop=True)
+
+
+# Destinations with travel data from a city, in city order
+def origin_destinations(from_city):
+    row = od_matrices().train_minutes[city_ids([from_city])[0]]
+    cities = matrix_cities()
+    return [cities[destination] for destination in np.flatnonzero(~np.isnan(row)).tolist()]
+
+
+# Route geometry from a city to every destination with travel data: {destination: (train line as a list of
+# (lon, lat) or None without a train route, plane arc as a list of (lon, lat) starting at from_city)}. For a map
+# drawn at a projection scale, train lines are simplified for it (core.line_level_for_scale) and plane arcs get
+# the vertices their on-screen length needs (core.adaptive_arc); without one, the full geometry is returned.
+@lru_cached(maxsize=64, version=geometry_store_version)
+def origin_geometry(from_city, scale=None):
+    store, artifacts = geometry_store(), route_artifacts()
+    level = None if scale is None else line_level_for_scale(scale)
+    geometry = {}
+    for to_city in origin_destinations(from_city):
+        route = normalize_city_pair(from_city, to_city)
+        artifact = artifacts.get(route) or route_artifact(from_city, to_city)
+        # The arc runs from the first city of the route key
+        arc = artifact.arc if from_city <= to_city else artifact.arc[::-1]
+        if scale is not None:
+            arc = adaptive_arc(arc, scale)
+        geometry[to_city] = (store.line(route, level).tolist() if route in store else None, arc.tolist())
+    return geometry
+
+
+# {city: (lon, lat)} of a city and all its destinations, for fitting a map around them
+def origin_positions(from_city):
+    positions = city_positions()
+    return {city: positions[city] for city in [from_city, *origin_destinations(from_city)] if city in positions}
@@ -0,0 +1,123 @@
+import numpy as np
+import pandas as pd
+
+from core.graph import shortest_paths, path_sums
+from core.snapshot import string_column
+
+# Connecting flights over the airport graph. The trips table has one flight per city pair between its AIR_1 and
+# AIR_2 airports, with a straight-line flight time and CO2. The direct-connection table (DIRECT_FLIGHTS_PATH,
+# AIR_1,AIR_2 rows in either order) says which of these flights exist as direct flights; all other city pairs
+# are flown over the direct flights with the fewest total minutes, CONNECTION_MINUTES per change of plane.
+#
+# The results are computed by the data build and stored in the snapshot next to the trips table (see
+# flight_arrays), so the app only indexes them:
+#   flights.airports                      (A,) airport codes of the airport graph
+#   flights.next_hop                      (A, A) next airport on the fastest connection, -1 if unreachable
+#   flights.airport                       (C, C) airport of the row city for a trip to the column city, -1 without
+#                                         flight data
+#   flights.minutes, flights.co2          (C, C) fastest connection between the airports of a city pair including
+#                                         AIRPORT_MINUTES, NaN without flight data or connection
+#   flights.legs                          (C, C) number of flights of that connection, 0 without one
+#   flights.assumed                       whether the direct-connection table has 'assumed' rows, so that the
+#                                         connections are estimates rather than facts
+#
+# The shipped table is not schedule data: it is seeded by python build_data.py flights with the rule that every
+# flight touching one of HUB_AIRPORTS is direct and every other one is not (see seed_direct_flights), marked
+# 'assumed' in its source column. Replace its rows with real direct connections (with another source) and
+# rebuild the snapshot.
+
+DIRECT_FLIGHTS_PATH = 'data/direct_flights.csv'
+
+# Time for changing planes at a hub
+CONNECTION_MINUTES = 90
+
+# Time for getting to/from the airport, security check and boarding, once per trip
+# (the difference between Duration_plane_total and Duration_plane in the trips data)
+AIRPORT_MINUTES = 180
+
+# Airports assumed to have a direct flight to every other airport when seeding the direct-connection table
+HUB_AIRPORTS = ('AMS', 'ARN', 'BRU', 'CDG', 'CPH', 'FCO', 'IST', 'LHR', 'MAD', 'MUC', 'OSL', 'VIE', 'WAW')
+
+
+# Direct-connection table seeded with the hub rule from the flights of the trips data. A flight from an airport
+# with no other flight in the data (e.g. WMI for Lisbon-Warsaw) is kept as direct too, the airport would not be
+# reachable otherwise.
+def seed_direct_flights(trip_data, hubs=HUB_AIRPORTS):
+    flights = trip_data[['AIR_1', 'AIR_2']]
+    flight_counts = pd.concat([flights['AIR_1'], flights['AIR_2']]).value_counts()
+    only_flight = (flights['AIR_1'].map(flight_counts) == 1) | (flights['AIR_2'].map(flight_counts) == 1)
+    direct = flights[flights['AIR_1'].isin(hubs) | flights['AIR_2'].isin(hubs) | only_flight]
+    return direct.assign(source='assumed').sort_values(['AIR_1', 'AIR_2'])
+
+
+# Direct connections as a set of airport pairs in both orders
+def read_direct_flights(path=DIRECT_FLIGHTS_PATH):
+    direct_flights = pd.read_csv(path)
+    direct_flights.columns = direct_flights.columns.str.strip()
+    pairs = list(zip(direct_flights['AIR_1'].str.strip(), direct_flights['AIR_2'].str.strip()))
+    return set(pairs) | {(air_2, air_1) for air_1, air_2 in pairs}
+
+
+# Whether any row of the direct-connection table was seeded with the hub rule instead of coming from schedule
+# data; a table without a source column is taken as schedule data
+def direct_flights_assumed(path=DIRECT_FLIGHTS_PATH):
+    direct_flights = pd.read_csv(path)
+    direct_flights.columns = direct_flights.columns.str.strip()
+    return 'source' in direct_flights and bool((direct_flights['source'].str.strip() == 'assumed').any())
+
+
+# Connecting-flight arrays for the snapshot, computed from the trips table in snapshot arrays and the set of
+# direct airport pairs, with whether that set is assumed
+def flight_arrays(tables, direct_pairs, assumed=True, connection_minutes=CONNECTION_MINUTES):
+    air_1, air_2 = string_column(tables, 'trips', 'AIR_1'), string_column(tables, 'trips', 'AIR_2')
+    airports = sorted(set(air_1.tolist()) | set(air_2.tolist()))
+    airport_ids = {airport: i for i, airport in enumerate(airports)}
+    ids_1 = np.array([airport_ids[airport] for airport in air_1.tolist()], dtype='int64')
+    ids_2 = np.array([airport_ids[airport] for airport in air_2.tolist()], dtype='int64')
+
+    # Like has_flight: a route without either plane value has no flight
+    minutes = tables['trips.Duration_plane_minutes'].astype('float64')
+    co2 = tables['trips.Plane_CO2_kg'].astype('float64')
+    has_flight = ~tables['trips.Duration_plane_minutes.mask'] & ~np.isnan(co2)
+    is_direct = np.array([pair in direct_pairs for pair in zip(air_1.tolist(), air_2.tolist())], dtype=bool)
+
+    edge_minutes = np.full((len(airports), len(airports)), np.nan)
+    edge_co2 = np.full_like(edge_minutes, np.nan)
+    edges = has_flight & is_direct
+    for edge_ids in ((ids_1, ids_2), (ids_2, ids_1)):
+        edge_minutes[edge_ids[0][edges], edge_ids[1][edges]] = minutes[edges]
+        edge_co2[edge_ids[0][edges], edge_ids[1][edges]] = co2[edges]
+
+    path_minutes, path_co2, next_hop = shortest_paths(edge_minutes, edge_co2, connection_minutes)
+    reachable = ~np.isnan(path_minutes)
+    legs = path_sums(next_hop, np.ones_like(edge_minutes), reachable)
+
+    # City pair (C, C) arrays of the trip rows with a flight, in both directions
+    num_cities = len(tables['pair_cities'])
+    airport = np.full((num_cities, num_cities), -1, dtype='int32')
+    pair_minutes = np.full((num_cities, num_cities), np.nan)
+    pair_co2 = np.full_like(pair_minutes, np.nan)
+    pair_legs = np.zeros((num_cities, num_cities), dtype='int32')
+    route_rows = tables['route_rows']
+    city_1, city_2 = np.nonzero(route_rows >= 0)
+    rows = route_rows[city_1, city_2]
+    flown = has_flight[rows]
+    city_1, city_2, rows = city_1[flown], city_2[flown], rows[flown]
+    # The row city of a pair is its City_1 when the pair is stored in the same direction
+    same_direction = string_column(tables, 'trips', 'City_1')[rows] == tables['pair_cities'][city_1]
+    origin = np.where(same_direction, ids_1[rows], ids_2[rows])
+    destination = np.where(same_direction, ids_2[rows], ids_1[rows])
+    airport[city_1, city_2] = origin
+    pair_minutes[city_1, city_2] = path_minutes[origin, destination] + AIRPORT_MINUTES
+    pair_co2[city_1, city_2] = path_co2[origin, destination]
+    pair_legs[city_1, city_2] = legs[origin, destination]
+
+    return {
+        'flights.airports': np.array(airports, dtype=str),
+        'flights.next_hop': next_hop.astype('int32'),
+        'flights.airport': airport,
+        'flights.minutes': pair_minutes,
+        'flights.co2': pair_co2,
+        'flights.legs': pair_legs,
+        'flights.assumed': np.bool_(assumed),
+    }
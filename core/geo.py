@@ -0,0 +1,164 @@
+import math
+
+import numpy as np
+
+# Map and chart geometry of a route: projection, plane arc, train transfers, duration axis ticks, and
+# simplification of lines for the on-screen size they are drawn at
+
+# Plane arcs are drawn with one vertex per ARC_PX_PER_SEGMENT pixels of their on-screen length, at least
+# ARC_MIN_POINTS (see adaptive_arc)
+ARC_PX_PER_SEGMENT = 6
+ARC_MIN_POINTS = 8
+
+# calculate the map center (mean lat/lon) and scale based on point spread
+def get_projection_params(cities):
+    # Get longitude and latitude values
+    lons = [city['lon'] for city in cities]
+    lats = [city['lat'] for city in cities]
+
+    # Calculate the center as the mean of the coordinates
+    center_lon = (sum(lons) / len(lons)) + 2
+    center_lat = sum(lats) / len(lats)
+
+    # Calculate the spread of the points (difference between max and min coordinates)
+    lon_range = max(lons) - min(lons)
+    lat_range = max(lats) - min(lats)
+
+    # print(f"Longitude range: {lon_range}, Latitude range: {lat_range}")
+
+    # Factor in the latitude difference less because distances shrink closer to the poles
+    weighted_lat_range = lat_range * math.cos(math.radians(center_lat))
+
+    # Use the larger of the two ranges to determine the scale, adding a buffer to prevent extremes
+    max_range = max(lon_range, weighted_lat_range)
+
+    # Define a threshold for large latitude differences (when cities are far apart north-south)
+    lat_threshold = 7  # cities > 7 degrees apart in latitude
+    lon_threshold = 10 # cities < 10 degrees apart in longitude
+
+    if lat_range > lat_threshold and lon_range < lon_threshold:
+        # Case for cities aligned mostly by longitude (far north-south)
+        default_scale = 700
+        default_center = [11, 49]
+        return {
+            'center': default_center,
+            'scale': default_scale
+        }
+
+    # Set bounds for the scale to prevent extreme zoom-in/zoom-out
+    min_scale = 400  # Minimum zoom level (for large ranges)
+    max_scale = 2500  # Maximum zoom level (for small ranges)
+
+    # A single point (e.g. a meeting with one origin) has no spread: center on it, zoomed in as far as allowed
+    if max_range == 0:
+        return {
+            'center': [center_lon, center_lat],
+            'scale': max_scale
+        }
+
+    # Adjust the scale based on the range; larger range -> smaller scale (zoom out)
+    scale_factor = 300 / (max_range ** 0.7)
+
+    final_scale = min(max(scale_factor * 25, min_scale), max_scale)
+
+    # Debugging: print calculated values
+    # print(f"Center: {[center_lon, center_lat]}, Scale: {final_scale}")
+
+    return {
+        'center': [center_lon, center_lat],
+        'scale': final_scale
+    }
+
+def calculate_transfers(geojson_data_points):
+    num_points = len(geojson_data_points['features'])
+    transfers = max(0, num_points - 2)  # Subtract 2 for start and end points, ensure it's not negative
+    return transfers
+
+# Generate points for a curved arc
+def generate_curved_arc(from_coords, to_coords, num_points=100, curvature=0.02):
+    # Unpack coordinates
+    lon1, lat1 = np.radians(from_coords)
+    lon2, lat2 = np.radians(to_coords)
+
+    # Create a sequence of t values from 0 to 1
+    t_vals = np.linspace(0, 1, num_points)
+
+    # Calculate intermediate points along the great circle route
+    latitudes = lat1 + (lat2 - lat1) * t_vals + curvature * np.sin(np.pi * t_vals) # Add curvature
+    longitudes = lon1 + (lon2 - lon1) * t_vals
+
+    # Convert back to degrees
+    latitudes_deg = np.degrees(latitudes)
+    longitudes_deg = np.degrees(longitudes)
+
+    # Combine into a list of coordinates
+    arc_points = [[lon, lat] for lon, lat in zip(longitudes_deg, latitudes_deg)]
+    return arc_points
+
+# Degrees covered by one pixel of a Mercator projection with the given Vega scale (1 radian = scale pixels)
+def degrees_per_pixel(scale):
+    return 180 / (math.pi * scale)
+
+# Mercator y in degrees, so that simplification tolerances are uniform on screen
+def mercator_y(latitudes):
+    return np.degrees(np.log(np.tan(np.pi / 4 + np.radians(latitudes) / 2)))
+
+# Inverse of mercator_y
+def mercator_latitude(y):
+    return np.degrees(2 * np.arctan(np.exp(np.radians(y))) - np.pi / 2)
+
+# Douglas-Peucker simplification; returns the indices of the points to keep (always both ends)
+def douglas_peucker(points, tolerance):
+    points = np.asarray(points, dtype=float)
+    if len(points) < 3:
+        return np.arange(len(points))
+
+    keep = np.zeros(len(points), dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        segment = points[end] - points[start]
+        offsets = points[start + 1:end] - points[start]
+        length = math.hypot(*segment)
+        if length == 0:
+            distances = np.hypot(offsets[:, 0], offsets[:, 1])
+        else:
+            distances = np.abs(segment[0] * offsets[:, 1] - segment[1] * offsets[:, 0]) / length
+        farthest = int(np.argmax(distances))
+        if distances[farthest] > tolerance:
+            split = start + 1 + farthest
+            keep[split] = True
+            stack.append((start, split))
+            stack.append((split, end))
+    return np.flatnonzero(keep)
+
+# Plane arc (an (N, 2) array of (lon, lat)) resampled to the number of vertices its length at a Mercator projection
+# scale needs on screen, evenly along the arc and keeping both ends; never more than the arc has
+def adaptive_arc(arc, scale):
+    projected = np.column_stack([arc[:, 0], mercator_y(arc[:, 1])])
+    length_px = np.hypot(*np.diff(projected, axis=0).T).sum() / degrees_per_pixel(scale)
+    num_points = min(len(arc), max(ARC_MIN_POINTS, math.ceil(length_px / ARC_PX_PER_SEGMENT) + 1))
+    return arc[np.round(np.linspace(0, len(arc) - 1, num_points)).astype('int64')]
+
+#convert minutes to "hours:minutes" string, used only when rendering
+def minutes_to_str(total_minutes):
+    hours, minutes = divmod(int(total_minutes), 60)
+    return f"{hours:02}:{minutes:02}"
+
+# Custom tick intervals for duration bar charts based on travel time
+def calculate_tick_values(min_value, max_value):
+    range_span = max_value - min_value
+    if range_span <= 180:
+        step = 30  # 30-minute intervals for <3h journeys
+    elif range_span <= 360:
+          step = 60  # 1-hour intervals for 3-6h journeys
+    elif range_span <= 720:
+          step = 120  # 2-hour intervals for 6-12h journeys
+    elif range_span <= 1440:
+        step = 240  # 4-hour intervals for 12-24h journeys
+    else:
+        step = 480  # 8-hour intervals for >24h journeys
+    return [0] + np.arange(step, max_value + step, step).tolist()  # Include 0 as the starting point
@@ -0,0 +1,75 @@
+import numpy as np
+
+# Distances on the earth as whole-array operations: haversine (sphere) and Vincenty geodesic (WGS84 ellipsoid)
+# distances between arrays of (lon, lat) positions in degrees, and segment, cumulative and total lengths of many
+# polylines packed into one coordinate array (like the geometry store) in one pass.
+
+EARTH_RADIUS_KM = 6371.0
+
+# WGS84 semi-major axis in km and flattening
+WGS84_A_KM = 6378.137
+WGS84_F = 1 / 298.257223563
+
+
+# Great-circle distances in km on a sphere between positions in degrees; the arrays broadcast against each other
+def haversine_km(lons_1, lats_1, lons_2, lats_2):
+    lons_1, lats_1, lons_2, lats_2 = (np.radians(values) for values in (lons_1, lats_1, lons_2, lats_2))
+    a = np.sin((lats_2 - lats_1) / 2) ** 2 + np.cos(lats_1) * np.cos(lats_2) * np.sin((lons_2 - lons_1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+# Geodesic distances in km on the WGS84 ellipsoid (Vincenty's inverse formula) between positions in degrees, like
+# geopy's geodesic to well under a meter. All pairs iterate together until the longest converges; nearly antipodal
+# points, which Vincenty does not converge for, keep the value of the last iteration.
+def geodesic_km(lons_1, lats_1, lons_2, lats_2, max_iterations=200):
+    lons_1, lats_1, lons_2, lats_2 = np.broadcast_arrays(*(np.radians(values) for values in
+                                                           (lons_1, lats_1, lons_2, lats_2)))
+    b = WGS84_A_KM * (1 - WGS84_F)
+    # Reduced latitudes
+    u_1, u_2 = np.arctan((1 - WGS84_F) * np.tan(lats_1)), np.arctan((1 - WGS84_F) * np.tan(lats_2))
+    sin_u_1, cos_u_1, sin_u_2, cos_u_2 = np.sin(u_1), np.cos(u_1), np.sin(u_2), np.cos(u_2)
+
+    lon_difference = lons_2 - lons_1
+    lam = lon_difference
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for _ in range(max_iterations):
+            sin_lam, cos_lam = np.sin(lam), np.cos(lam)
+            sin_sigma = np.hypot(cos_u_2 * sin_lam, cos_u_1 * sin_u_2 - sin_u_1 * cos_u_2 * cos_lam)
+            cos_sigma = sin_u_1 * sin_u_2 + cos_u_1 * cos_u_2 * cos_lam
+            sigma = np.arctan2(sin_sigma, cos_sigma)
+            # Coincident points have sin_sigma 0, points on the equator cos2_alpha 0
+            sin_alpha = np.where(sin_sigma == 0, 0, cos_u_1 * cos_u_2 * sin_lam / sin_sigma)
+            cos2_alpha = 1 - sin_alpha ** 2
+            cos_2_sigma_m = np.where(cos2_alpha == 0, 0, cos_sigma - 2 * sin_u_1 * sin_u_2 / cos2_alpha)
+            c = WGS84_F / 16 * cos2_alpha * (4 + WGS84_F * (4 - 3 * cos2_alpha))
+            previous, lam = lam, lon_difference + (1 - c) * WGS84_F * sin_alpha * (
+                sigma + c * sin_sigma * (cos_2_sigma_m + c * cos_sigma * (2 * cos_2_sigma_m ** 2 - 1)))
+            if not (np.abs(lam - previous) > 1e-12).any():
+                break
+
+    u2 = cos2_alpha * (WGS84_A_KM ** 2 - b ** 2) / b ** 2
+    big_a = 1 + u2 / 16384 * (4096 + u2 * (-768 + u2 * (320 - 175 * u2)))
+    big_b = u2 / 1024 * (256 + u2 * (-128 + u2 * (74 - 47 * u2)))
+    delta_sigma = big_b * sin_sigma * (cos_2_sigma_m + big_b / 4 * (
+        cos_sigma * (2 * cos_2_sigma_m ** 2 - 1)
+        - big_b / 6 * cos_2_sigma_m * (4 * sin_sigma ** 2 - 3) * (4 * cos_2_sigma_m ** 2 - 3)))
+    return b * big_a * (sigma - delta_sigma)
+
+
+# Lengths in km of the segments between consecutive rows of an (N, 2) array of (lon, lat) positions
+def segment_km(coordinates, distance=haversine_km):
+    return distance(coordinates[:-1, 0], coordinates[:-1, 1], coordinates[1:, 0], coordinates[1:, 1])
+
+
+# Cumulative and total lengths in km of polylines packed one after another into an (N, 2) coordinate array, with
+# (P, 2) [start, end) row ranges covering the array in order: (N,) distance of every vertex along its polyline
+# from its first vertex, and (P,) length of every polyline. All segments are measured in one pass; the ones
+# joining the last vertex of a polyline to the first of the next are dropped.
+def polyline_distances(coordinates, bounds, distance=haversine_km):
+    bounds = np.asarray(bounds, dtype='int64').reshape(-1, 2)
+    starts, ends = bounds[:, 0], bounds[:, 1]
+    running = np.concatenate([[0.0], np.cumsum(segment_km(coordinates, distance))])
+    # Distance along the whole array at the first vertex of each polyline, subtracted from all its vertices
+    cumulative = running - np.repeat(running[starts], ends - starts)
+    lengths = np.where(ends > starts, running[np.maximum(ends - 1, starts)] - running[starts], 0.0)
+    return cumulative, lengths
@@ -0,0 +1,189 @@
+import json
+import os
+
+import numpy as np
+
+from core.geo import douglas_peucker, mercator_y, degrees_per_pixel
+from core.geodesy import polyline_distances, geodesic_km
+
+# Packed train route geometry: every route polyline and stop list from geojson_files in one binary file.
+#
+# Layout (little endian):
+#   8 bytes   magic b'RGEOSTOR'
+#   8 bytes   uint64 length of the JSON header
+#   header    JSON index: route key -> start/end city names, [start, end) row ranges of its line and stops in
+#             the coordinate array, the haversine and geodesic line lengths in km and the [start, end) ranges
+#             of its line in the level rows for every LINE_LEVELS level, plus one stop name per stop row
+#   padding   up to a 16 byte boundary
+#   data      float64 (lon, lat) coordinate array, all route lines followed by all stops
+#   distances float64 haversine km of every line row along its line from the first vertex (see core.geodesy)
+#   levels    int32 coordinate rows of the simplified lines, every level of a route after another
+
+GEOMETRY_STORE_PATH = 'data/route_geometry.bin'
+GEOMETRY_STORE_VERSION = 3
+
+# Largest projection scale each simplification level of the lines is drawn at, from coarsest to finest, like the
+# basemap levels. Every level keeps the Douglas-Peucker vertices of a line at a tolerance of LINE_TOLERANCE_PX
+# pixels at its scale (Mercator, as used by the maps); beyond the last scale lines are drawn in full.
+LINE_LEVELS = (500, 1000, 1800, 2500)
+LINE_TOLERANCE_PX = 0.5
+
+_MAGIC = b'RGEOSTOR'
+_ALIGNMENT = 16
+
+
+# Pick the coarsest line level that still looks like the full line at the given projection scale, None to draw
+# the full lines
+def line_level_for_scale(scale):
+    for level, max_scale in enumerate(LINE_LEVELS):
+        if scale <= max_scale:
+            return level
+    return None
+
+
+# Coordinate rows of a line (rows start to start + len(coordinates)) kept at every LINE_LEVELS level
+def simplify_line(coordinates, start):
+    projected = np.column_stack([coordinates[:, 0], mercator_y(coordinates[:, 1])])
+    return [start + douglas_peucker(projected, LINE_TOLERANCE_PX * degrees_per_pixel(scale))
+            for scale in LINE_LEVELS]
+
+
+# Pack the per-pair GeoJSON files into a single geometry store, keyed by the normalized city pair
+def build_geometry_store(lines_dir='geojson_files/lines', points_dir='geojson_files/points',
+                         path=GEOMETRY_STORE_PATH):
+    line_coords, stop_coords = [], []
+    routes, stop_names = {}, []
+    num_line_rows = 0
+    for file_name in sorted(os.listdir(lines_dir)):
+        with open(os.path.join(lines_dir, file_name), 'r') as f:
+            line_feature = json.load(f)['features'][0]
+        with open(os.path.join(points_dir, file_name), 'r') as f:
+            stop_features = json.load(f)['features']
+
+        start, end = line_feature['properties']['Start'], line_feature['properties']['End']
+        coordinates = np.asarray(line_feature['geometry']['coordinates'], dtype='<f8').reshape(-1, 2)
+        stops = np.asarray([feature['geometry']['coordinates'] for feature in stop_features],
+                           dtype='<f8').reshape(-1, 2)
+
+        # Same key as utils.normalize_city_pair
+        routes['-'.join(sorted([start, end]))] = {
+            'start': start,
+            'end': end,
+            'line': [num_line_rows, num_line_rows + len(coordinates)],
+            'stops': [len(stop_names), len(stop_names) + len(stops)],
+        }
+        line_coords.append(coordinates)
+        stop_coords.append(stops)
+        stop_names.extend(feature['properties']['stop_name'] for feature in stop_features)
+        num_line_rows += len(coordinates)
+
+    # Stop rows come after all line rows in the coordinate array
+    for entry in routes.values():
+        entry['stops'] = [row + num_line_rows for row in entry['stops']]
+
+    # Distances along all lines in one pass over their rows
+    lines = np.concatenate(line_coords)
+    bounds = [entry['line'] for entry in routes.values()]
+    cumulative_km, length_km = polyline_distances(lines, bounds)
+    _, line_geodesic_km = polyline_distances(lines, bounds, distance=geodesic_km)
+    for entry, length, geodesic in zip(routes.values(), length_km.tolist(), line_geodesic_km.tolist()):
+        entry['length_km'] = length
+        entry['geodesic_km'] = geodesic
+
+    # Simplified lines of every route and level
+    level_rows = []
+    for entry, coordinates in zip(routes.values(), line_coords):
+        entry['levels'] = []
+        for rows in simplify_line(coordinates, entry['line'][0]):
+            num_level_rows = sum(len(level) for level in level_rows)
+            entry['levels'].append([num_level_rows, num_level_rows + len(rows)])
+            level_rows.append(rows)
+    level_rows = np.concatenate(level_rows).astype('<i4')
+
+    data = np.concatenate(line_coords + stop_coords)
+    header = json.dumps({
+        'version': GEOMETRY_STORE_VERSION,
+        'rows': len(data),
+        'first_stop_row': num_line_rows,
+        'level_rows': len(level_rows),
+        'routes': routes,
+        'stop_names': stop_names,
+    }, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    data_offset = -(-(len(_MAGIC) + 8 + len(header)) // _ALIGNMENT) * _ALIGNMENT
+
+    # Write to a temporary file and swap it in, so processes still mapping the old store keep valid data
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(_MAGIC)
+        f.write(np.uint64(len(header)).tobytes())
+        f.write(header)
+        f.write(b'\0' * (data_offset - len(_MAGIC) - 8 - len(header)))
+        f.write(data.tobytes())
+        f.write(cumulative_km.astype('<f8').tobytes())
+        f.write(level_rows.tobytes())
+    os.replace(temp_path, path)
+    return len(routes)
+
+
+# Read-only view of a geometry store; the coordinates are memory-mapped, so lookups return zero-copy views
+class GeometryStore:
+    def __init__(self, path=GEOMETRY_STORE_PATH):
+        with open(path, 'rb') as f:
+            self.mtime = os.fstat(f.fileno()).st_mtime_ns
+            if f.read(len(_MAGIC)) != _MAGIC:
+                raise ValueError(f"{path} is not a route geometry store")
+            header_length = int(np.frombuffer(f.read(8), dtype='<u8')[0])
+            header = json.loads(f.read(header_length).decode('utf-8'))
+        if header['version'] != GEOMETRY_STORE_VERSION:
+            raise ValueError(f"{path} has version {header['version']}, expected {GEOMETRY_STORE_VERSION}, "
+                             f"rebuild it with: python build_data.py geometry")
+
+        data_offset = -(-(len(_MAGIC) + 8 + header_length) // _ALIGNMENT) * _ALIGNMENT
+        self.path = path
+        self.routes = header['routes']
+        self.stop_names = header['stop_names']
+        self.first_stop_row = header['first_stop_row']
+        self.coordinates = np.memmap(path, dtype='<f8', mode='r', offset=data_offset, shape=(header['rows'], 2))
+        self.line_km = np.memmap(path, dtype='<f8', mode='r', offset=data_offset + header['rows'] * 16,
+                                 shape=(self.first_stop_row,))
+        self.level_rows = np.memmap(path, dtype='<i4', mode='r',
+                                    offset=data_offset + header['rows'] * 16 + self.first_stop_row * 8,
+                                    shape=(header['level_rows'],))
+
+    def __contains__(self, route):
+        return route in self.routes
+
+    def __len__(self):
+        return len(self.routes)
+
+    # (lon, lat) vertices of the train route polyline, simplified for a LINE_LEVELS level (a copy) or in full (a
+    # zero-copy view) when level is None
+    def line(self, route, level=None):
+        if level is not None:
+            start, end = self.routes[route]['levels'][level]
+            return self.coordinates[self.level_rows[start:end]]
+        start, end = self.routes[route]['line']
+        return self.coordinates[start:end]
+
+    # Haversine km of every vertex of line() along the line from its first vertex
+    def cumulative_km(self, route):
+        start, end = self.routes[route]['line']
+        return self.line_km[start:end]
+
+    # Haversine length of the train route polyline in km
+    def length_km(self, route):
+        return self.routes[route]['length_km']
+
+    # Geodesic (WGS84) length of the train route polyline in km
+    def geodesic_km(self, route):
+        return self.routes[route]['geodesic_km']
+
+    # (lon, lat) positions of the train route stops, including both ends
+    def stops(self, route):
+        start, end = self.routes[route]['stops']
+        return self.coordinates[start:end]
+
+    # Stop names matching the rows returned by stops()
+    def stop_names_for(self, route):
+        start, end = self.routes[route]['stops']
+        return self.stop_names[start - self.first_stop_row:end - self.first_stop_row]
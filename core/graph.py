@@ -0,0 +1,75 @@
+import numpy as np
+
+# Vectorized shortest paths over dense (N, N) edge matrices (NaN without an edge), shared by the chained-train
+# routing over cities (core.train_routing) and the connecting-flight routing over airports (core.flights).
+# Every change between two edges of a path costs transfer_minutes.
+
+
+# All-pairs shortest paths over (N, N) edge minutes, adding transfer_minutes per change with a vectorized
+# Floyd-Warshall. co2 is summed along the chosen paths. Returns the path minutes, path CO2 and next hop matrices
+# (NaN and -1 for unreachable pairs and the diagonal).
+def shortest_paths(minutes, co2, transfer_minutes):
+    num_nodes = len(minutes)
+    # Every edge carries one transfer, removed again at the end, so that a path of n legs has n - 1 transfers
+    distance = np.where(np.isnan(minutes), np.inf, minutes + transfer_minutes)
+    next_hop = np.where(np.isinf(distance), -1, np.arange(num_nodes)[None, :])
+    np.fill_diagonal(distance, 0)
+    np.fill_diagonal(next_hop, np.arange(num_nodes))
+
+    # Relax all pairs through k in place, reusing the same buffers in every step
+    through_k = np.empty_like(distance)
+    shorter = np.empty(distance.shape, dtype=bool)
+    for k in range(num_nodes):
+        np.add(distance[:, k, None], distance[None, k, :], out=through_k)
+        np.less(through_k, distance, out=shorter)
+        np.copyto(distance, through_k, where=shorter)
+        np.copyto(next_hop, next_hop[:, k, None], where=shorter)
+
+    reachable = ~np.isinf(distance)
+    np.fill_diagonal(reachable, False)
+    path_minutes = np.where(reachable, distance - transfer_minutes, np.nan)
+    path_co2 = np.where(reachable, path_sums(next_hop, co2, reachable), np.nan)
+    np.fill_diagonal(next_hop, -1)
+    return path_minutes, path_co2, next_hop
+
+
+# Edge weights summed along the next hops of every reachable pair, one hop of all paths at a time
+# (e.g. CO2, or ones for the number of legs)
+def path_sums(next_hop, weights, reachable):
+    destinations = np.broadcast_to(np.arange(len(next_hop))[None, :], next_hop.shape)
+    current = np.broadcast_to(np.arange(len(next_hop))[:, None], next_hop.shape).copy()
+    total = np.zeros(next_hop.shape)
+    walking = reachable.copy()
+    while walking.any():
+        hop = np.where(walking, next_hop[current, destinations], current)
+        total += np.where(walking, weights[current, hop], 0)
+        current = hop
+        walking &= current != destinations
+    return total
+
+
+# Best two-leg path i -> k -> j of every pair over (N, N) edge minutes, with one transfer_minutes change.
+# Returns the via node, minutes and CO2 matrices (-1 and NaN without a two-leg path).
+def best_two_leg_chains(minutes, co2, transfer_minutes):
+    num_nodes = len(minutes)
+    edges = np.where(np.isnan(minutes), np.inf, minutes)
+    best = np.full((num_nodes, num_nodes), np.inf)
+    via = np.full((num_nodes, num_nodes), -1, dtype='int32')
+    through_k = np.empty_like(best)
+    shorter = np.empty(best.shape, dtype=bool)
+    for k in range(num_nodes):
+        np.add(edges[:, k, None], edges[None, k, :], out=through_k)
+        through_k += transfer_minutes
+        # A chain must pass through a third node
+        through_k[k, :] = through_k[:, k] = np.inf
+        np.less(through_k, best, out=shorter)
+        np.copyto(best, through_k, where=shorter)
+        np.copyto(via, k, where=shorter)
+
+    np.fill_diagonal(best, np.inf)
+    np.fill_diagonal(via, -1)
+    found = ~np.isinf(best)
+    # CO2 of both legs of the chosen chains
+    rows, columns = np.indices(via.shape)
+    best_co2 = co2[rows, via] + co2[via, columns]
+    return via, np.where(found, best, np.nan), np.where(found, best_co2, np.nan)
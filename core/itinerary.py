@@ -0,0 +1,110 @@
+import itertools
+from collections import namedtuple
+
+import numpy as np
+
+from core.cache import lru_cached
+from core.fanout import round_co2
+from core.matrices import od_matrices, city_ids
+from core.routes import geometry_store_version
+
+# Multi-leg itineraries: an ordered list of stops evaluated leg by leg from a precomputed leg table, the
+# od_matrices stacked into one (C, C, 4) array, so a whole itinerary (or a batch of reorderings) is one gather.
+#
+# Every leg gets a suggested mode: the train, unless it takes more than max_extra_minutes longer than the plane.
+
+# Metrics along the last axis of the leg table
+LEG_METRICS = ('train_minutes', 'plane_minutes', 'train_co2', 'plane_co2')
+
+# Extra travel time per leg accepted for taking the train instead of the plane
+DEFAULT_MAX_EXTRA_MINUTES = 120
+
+# Largest number of stops between the first and last one that best_stop_order tries all orders of
+MAX_REORDER_STOPS = 7
+
+# Per-leg values of an itinerary (arrays with one entry per leg; plane values are NaN without a flight),
+# the suggested mode of every leg (use_plane) and the totals of taking the train, the plane where it flies, or
+# the suggested mix for every leg. CO2 is scaled for the number of people.
+ItineraryPlan = namedtuple('ItineraryPlan', [
+    'stops', 'train_minutes', 'plane_minutes', 'train_co2', 'plane_co2', 'use_plane',
+    'train_total', 'plane_total', 'mixed_total'])
+
+# Total minutes and CO2 of an itinerary with a choice of modes
+ItineraryTotal = namedtuple('ItineraryTotal', ['minutes', 'co2'])
+
+
+# od_matrices stacked along LEG_METRICS, with the CO2 rounded per person like scale_trip
+@lru_cached(maxsize=1, version=geometry_store_version)
+def leg_table():
+    matrices = od_matrices()
+    rounded = {
+        metric: round_co2(getattr(matrices, metric).ravel()).reshape(matrices.train_co2.shape)
+        for metric in ('train_co2', 'plane_co2')
+    }
+    return np.stack([rounded.get(metric, getattr(matrices, metric)) for metric in LEG_METRICS], axis=-1)
+
+
+# Whether each leg is better taken by plane: it has a flight and the train takes more than max_extra_minutes longer
+def suggest_planes(train_minutes, plane_minutes, max_extra_minutes=DEFAULT_MAX_EXTRA_MINUTES):
+    return ~np.isnan(plane_minutes) & (train_minutes > plane_minutes + max_extra_minutes)
+
+
+# Per-leg values of itineraries given as city IDs, (..., L) -> (..., L - 1, 4)
+def leg_values(stop_ids):
+    stop_ids = np.asarray(stop_ids)
+    return leg_table()[stop_ids[..., :-1], stop_ids[..., 1:]]
+
+
+# Totals of every leg by train, by plane (train where there is no flight) and with the suggested modes,
+# along the leg axis of (..., L - 1, 4) leg values; NaN if a leg has no travel data
+def itinerary_totals(legs, num_people=1, max_extra_minutes=DEFAULT_MAX_EXTRA_MINUTES):
+    train_minutes, plane_minutes, train_co2, plane_co2 = np.moveaxis(legs, -1, 0)
+    has_flight = ~np.isnan(plane_minutes)
+    use_plane = suggest_planes(train_minutes, plane_minutes, max_extra_minutes)
+
+    def total(planes):
+        return ItineraryTotal(
+            minutes=np.where(planes, plane_minutes, train_minutes).sum(axis=-1),
+            co2=np.where(planes, plane_co2, train_co2).sum(axis=-1) * num_people,
+        )
+
+    return total(np.zeros_like(has_flight)), total(has_flight), total(use_plane)
+
+
+# Evaluate an itinerary through a list of city names (at least two, consecutive stops must differ)
+def plan_itinerary(stops, num_people=1, max_extra_minutes=DEFAULT_MAX_EXTRA_MINUTES):
+    legs = leg_values(city_ids(stops))
+    train_minutes, plane_minutes, train_co2, plane_co2 = legs.T
+    train_total, plane_total, mixed_total = itinerary_totals(legs, num_people, max_extra_minutes)
+    return ItineraryPlan(
+        stops=list(stops),
+        train_minutes=train_minutes,
+        plane_minutes=plane_minutes,
+        train_co2=train_co2 * num_people,
+        plane_co2=plane_co2 * num_people,
+        use_plane=suggest_planes(train_minutes, plane_minutes, max_extra_minutes),
+        train_total=train_total,
+        plane_total=plane_total,
+        mixed_total=mixed_total,
+    )
+
+
+# Order of the stops between the first and the last one with the least CO2 for the suggested modes (ties broken
+# by travel time). All orders are evaluated in one batch; stops beyond MAX_REORDER_STOPS in between are kept
+# in place. A round trip ends with its first stop again, so that all the stops in between are reordered.
+def best_stop_order(stops, num_people=1, max_extra_minutes=DEFAULT_MAX_EXTRA_MINUTES):
+    if len(stops) < 4:
+        return list(stops)
+    ids = city_ids(stops)
+    middle = ids[1:-1][:MAX_REORDER_STOPS]
+    orders = np.array(list(itertools.permutations(middle)))
+    candidates = np.concatenate([
+        np.broadcast_to(ids[:1], (len(orders), 1)), orders,
+        np.broadcast_to(ids[1 + len(middle):], (len(orders), len(ids) - 1 - len(middle))),
+    ], axis=1)
+
+    _, _, mixed_total = itinerary_totals(leg_values(candidates), num_people, max_extra_minutes)
+    # Orders with a leg without travel data (e.g. a stop repeated back to back) have NaN totals and sort last
+    best = np.lexsort((np.nan_to_num(mixed_total.minutes, nan=np.inf), np.nan_to_num(mixed_total.co2, nan=np.inf)))[0]
+    cities = {city_id: city for city_id, city in zip(ids.tolist(), stops)}
+    return [cities[city_id] for city_id in candidates[best].tolist()]
@@ -0,0 +1,192 @@
+from collections import namedtuple
+
+import numpy as np
+
+from core.cache import lru_cached
+from core.geodesy import haversine_km
+from core.routes import geometry_store, geometry_store_version
+from core.snapshot import pair_values
+from core.trips import trip_tables, pair_city_ids
+
+# Dense origin x destination matrices of every comparison metric, indexed by integer city IDs (the order of the
+# snapshot's pair_cities, see matrix_cities). All matrices are symmetric float64 (C, C) arrays with NaN where a
+# value is unavailable: pairs without a route (including the diagonal), plane values of routes without a flight
+# and transfers and train km of routes without train geometry. Train minutes and CO2 of pairs without a stored
+# train value are the shortest chained train trip instead (see core.train_routing), NaN only if there is none.
+# Comparison queries index them instead of looking routes up one by one, e.g.
+# od_matrices().train_co2[city_ids(['Amsterdam']), :] for one origin to all destinations.
+
+# Chained-train routing results (see core.train_routing), indexed like the matrices
+TrainRouting = namedtuple('TrainRouting', ['path_minutes', 'path_co2', 'next_hop', 'via', 'via_minutes', 'via_co2'])
+
+# Two-leg train chain through another city that is faster than the stored direct train of a pair
+ViaSuggestion = namedtuple('ViaSuggestion', ['via', 'minutes', 'co2', 'direct_minutes'])
+
+# Connecting-flight routing results (see core.flights): airport codes and the airport next hops, and the
+# city pair arrays indexed like the matrices, and whether the direct flights they route over are assumed
+FlightRouting = namedtuple('FlightRouting', ['airports', 'next_hop', 'airport', 'minutes', 'co2', 'legs', 'assumed'])
+
+# Connection over hub airports of a pair without a direct flight, next to the straight-line flight values. With
+# assumed set, the pair is only assumed to have no direct flight (see core.flights) and the connection is an
+# estimate.
+ConnectingFlight = namedtuple('ConnectingFlight', ['airports', 'minutes', 'co2', 'direct_minutes', 'direct_co2',
+                                                   'assumed'])
+
+# distance_km is the great-circle distance between the cities, train_km the length of the train route polyline
+ODMatrices = namedtuple('ODMatrices', ['train_minutes', 'plane_minutes', 'train_co2', 'plane_co2', 'transfers',
+                                       'distance_km', 'train_km'])
+
+
+# Cities by integer ID, the row and column order of the matrices
+def matrix_cities():
+    return trip_tables()['pair_cities'].tolist()
+
+
+# Integer IDs of city names; raises KeyError for a city that is not in the data
+def city_ids(names):
+    ids = pair_city_ids()
+    return np.array([ids[name] for name in names], dtype='int64')
+
+
+# Great-circle distances in km between all pairs of (lon, lat) positions in degrees
+def great_circle_km(lons, lats):
+    return haversine_km(lons[:, None], lats[:, None], lons[None, :], lats[None, :])
+
+
+# Symmetric (C, C) matrix of {(city, city): value} for the cities of ids, NaN for other pairs
+def pair_matrix(values_by_pair, ids):
+    matrix = np.full((len(ids), len(ids)), np.nan)
+    for (city_1, city_2), value in values_by_pair.items():
+        if city_1 in ids and city_2 in ids:
+            matrix[ids[city_1], ids[city_2]] = matrix[ids[city_2], ids[city_1]] = value
+    return matrix
+
+
+# Build the matrices from the snapshot arrays (see core.snapshot), {(city, city): train transfers} and
+# {(city, city): train route km}. With the chained-train routing arrays in the snapshot, pairs without a stored
+# train value take the shortest chained train trip.
+def build_od_matrices(tables, transfers_by_pair, train_km_by_pair=None):
+    train_minutes = pair_values(tables, 'Duration_train_minutes')
+    train_co2 = pair_values(tables, 'Train_CO2_kg')
+    if 'routing.path_minutes' in tables:
+        missing_train = np.isnan(train_minutes) | np.isnan(train_co2)
+        train_minutes[missing_train] = tables['routing.path_minutes'][missing_train]
+        train_co2[missing_train] = tables['routing.path_co2'][missing_train]
+    plane_minutes = pair_values(tables, 'Duration_plane_total_minutes')
+    plane_co2 = pair_values(tables, 'Plane_CO2_kg')
+
+    # Like has_flight: without either plane value the route has no flight
+    no_flight = np.isnan(plane_minutes) | np.isnan(plane_co2)
+    plane_minutes[no_flight] = np.nan
+    plane_co2[no_flight] = np.nan
+
+    cities = tables['pair_cities'].tolist()
+    ids = {city: i for i, city in enumerate(cities)}
+    transfers = pair_matrix(transfers_by_pair, ids)
+    train_km = pair_matrix(train_km_by_pair or {}, ids)
+
+    # Cities without coordinates get NaN distances
+    lons, lats = np.full(len(cities), np.nan), np.full(len(cities), np.nan)
+    coordinate_ids = [ids[city] for city in
+                      tables['coordinates.city.values'][tables['coordinates.city.codes']].tolist()]
+    lons[coordinate_ids] = tables['coordinates.longitude']
+    lats[coordinate_ids] = tables['coordinates.latitude']
+
+    return ODMatrices(train_minutes, plane_minutes, train_co2, plane_co2, transfers, great_circle_km(lons, lats),
+                      train_km)
+
+
+# {(start city, end city): train transfers} of every route in the geometry store, stops minus start and end
+# like calculate_transfers
+def store_transfers(store):
+    return {
+        (entry['start'], entry['end']): max(0, entry['stops'][1] - entry['stops'][0] - 2)
+        for entry in store.routes.values()
+    }
+
+
+# {(start city, end city): haversine length in km} of every route line in the geometry store
+def store_lengths(store):
+    return {(entry['start'], entry['end']): entry['length_km'] for entry in store.routes.values()}
+
+
+# Matrices of the current trip data and geometry store, shared by all sessions
+@lru_cached(maxsize=1, version=geometry_store_version)
+def od_matrices():
+    store = geometry_store()
+    return build_od_matrices(trip_tables(), store_transfers(store), store_lengths(store))
+
+
+# Values of one metric matrix for pairs of city names (arrays of the same shape), e.g.
+# od_values('plane_co2', ['Amsterdam', 'Berlin'], ['Paris', 'Rome'])
+def od_values(metric, from_cities, to_cities):
+    return getattr(od_matrices(), metric)[city_ids(from_cities), city_ids(to_cities)]
+
+
+# Routing arrays of the current trip data
+def train_routing_matrices():
+    tables = trip_tables()
+    return TrainRouting(*(tables[f'routing.{field}'] for field in TrainRouting._fields))
+
+
+# (C, C) whether the best two-leg chain of a pair is faster than its stored direct train
+def faster_via_pairs():
+    routing = train_routing_matrices()
+    with np.errstate(invalid='ignore'):
+        return routing.via_minutes < od_matrices().train_minutes
+
+
+# Two-leg chain that beats the stored direct train between two cities, None if the direct train is the fastest
+def via_suggestion(from_city, to_city):
+    origin, destination = city_ids([from_city, to_city])
+    routing = train_routing_matrices()
+    via_minutes = routing.via_minutes[origin, destination]
+    direct_minutes = od_matrices().train_minutes[origin, destination]
+    if not via_minutes < direct_minutes:
+        return None
+    return ViaSuggestion(matrix_cities()[routing.via[origin, destination]], float(via_minutes),
+                         float(routing.via_co2[origin, destination]), float(direct_minutes))
+
+
+# Cities along the shortest chained train trip from one city to another, [] if there is none
+def train_path(from_city, to_city):
+    origin, destination = city_ids([from_city, to_city]).tolist()
+    next_hop, cities = train_routing_matrices().next_hop, matrix_cities()
+    if next_hop[origin, destination] < 0:
+        return []
+    path = [origin]
+    while path[-1] != destination:
+        path.append(int(next_hop[path[-1], destination]))
+    return [cities[city_id] for city_id in path]
+
+
+# Connecting-flight arrays of the current trip data
+def flight_routing_matrices():
+    tables = trip_tables()
+    return FlightRouting(*(tables[f'flights.{field}'] for field in FlightRouting._fields))
+
+
+# Airport codes of the fastest flight connection from one city to another, [] if there is none
+def flight_path(from_city, to_city):
+    origin, destination = city_ids([from_city, to_city]).tolist()
+    flights = flight_routing_matrices()
+    start, end = flights.airport[origin, destination].item(), flights.airport[destination, origin].item()
+    if start < 0 or flights.next_hop[start, end] < 0:
+        return []
+    path = [start]
+    while path[-1] != end:
+        path.append(int(flights.next_hop[path[-1], end]))
+    return [flights.airports[airport].item() for airport in path]
+
+
+# Connection over hubs between two cities without a direct flight, None if the flight is direct or there is none
+def connecting_flight(from_city, to_city):
+    origin, destination = city_ids([from_city, to_city])
+    flights = flight_routing_matrices()
+    if flights.legs[origin, destination] < 2:
+        return None
+    matrices = od_matrices()
+    return ConnectingFlight(flight_path(from_city, to_city), float(flights.minutes[origin, destination]),
+                            float(flights.co2[origin, destination]),
+                            float(matrices.plane_minutes[origin, destination]),
+                            float(matrices.plane_co2[origin, destination]), bool(flights.assumed))
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+from core.fanout import minutes_to_strs
+from core.itinerary import leg_table
+from core.matrices import matrix_cities, city_ids
+
+# Meeting locations: every city ranked as the host of a meeting of people travelling from several origin cities.
+# The legs of all origins to all candidate hosts are one gather from the leg table, (O, C, 4), and the totals
+# of all candidates are one reduction over the origin axis weighted by the number of people per origin.
+# People from the host city do not travel.
+
+# Columns of rank_hosts that a ranking can be sorted by, smaller is better except for the CO2 saved
+RANKING_METRICS = ('Train_CO2_kg', 'Total_train_minutes', 'Max_train_minutes', 'CO2_saved_kg')
+
+
+# Totals of (O, C, 4) leg values from O origins to C candidate hosts, for counts people per origin: train CO2,
+# plane CO2 (by train where there is no flight), travel time by train summed over all people and the longest
+# train trip of anyone. Returns (C,) arrays, NaN for candidates that some origin has no travel data to.
+def host_totals(legs, counts, round_trip=True):
+    train_minutes, plane_minutes, train_co2, plane_co2 = np.moveaxis(legs, -1, 0)
+    plane_co2 = np.where(np.isnan(plane_minutes), train_co2, plane_co2)
+    factor = 2 if round_trip else 1
+    co2 = np.einsum('o,moc->mc', counts, np.stack([train_co2, plane_co2])) * factor
+    total_minutes = counts @ train_minutes * factor
+    max_minutes = train_minutes.max(axis=0) * factor
+    return co2[0], co2[1], total_minutes, max_minutes
+
+
+# Every city ranked as the meeting host for {origin city: number of people}, by one of RANKING_METRICS (ties
+# broken by the longest trip). CO2 is scaled for the number of people and round trip like scale_trip; hosts
+# that some origin has no travel data to sort last.
+def rank_hosts(origins, round_trip=True, sort_by='Train_CO2_kg'):
+    origin_ids = city_ids(list(origins))
+    counts = np.array(list(origins.values()), dtype='float64')
+    legs = leg_table()[origin_ids]
+    # Staying at home costs nothing
+    legs[np.arange(len(origin_ids)), origin_ids] = 0
+
+    train_co2, plane_co2, total_minutes, max_minutes = host_totals(legs, counts, round_trip)
+    ranking = pd.DataFrame({
+        'Host': matrix_cities(),
+        'Train_CO2_kg': train_co2,
+        'Plane_CO2_kg': plane_co2,
+        'CO2_saved_kg': plane_co2 - train_co2,
+        'Total_train_minutes': total_minutes,
+        'Max_train_minutes': max_minutes,
+        'Max_train_duration': minutes_to_strs(max_minutes),
+    })
+    key = -ranking[sort_by] if sort_by == 'CO2_saved_kg' else ranking[sort_by]
+    order = np.lexsort((ranking['Max_train_minutes'].fillna(np.inf), key.fillna(np.inf)))
+    return ranking.iloc[order].reset_index(drop=True)
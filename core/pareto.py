@@ -0,0 +1,49 @@
+import numpy as np
+
+from core.snapshot import pair_values
+
+# Pareto frontiers of travel time vs. CO2: for every origin, the destinations and modes (train or plane) that no
+# other option from the same origin beats on both duration and CO2. Computed for all origins at once with a
+# sort-and-sweep over the rows of the comparison matrices: sort each origin's options by duration (then CO2) and
+# keep those with less CO2 than every faster option.
+#
+# The frontiers are computed by the data build and stored in the snapshot next to the trips table (see
+# pareto_arrays), so the app only indexes them:
+#   pareto.frontier    (C, 2, C) whether the trip from the origin (first axis) by PARETO_MODES (second axis) to
+#                      the destination (third axis) is on the origin's frontier
+#
+# Scaling for people or a round trip multiplies all options of an origin alike and keeps the frontier.
+
+# Modes along the second axis of the frontier array
+PARETO_MODES = ('Train', 'Plane')
+
+
+# Whether each option of every row is Pareto-optimal, for (R, N) minutes and CO2 with NaN for missing options.
+# An option is dominated if another one of the row takes no longer and emits no more, and less of one of them.
+def pareto_rows(minutes, co2):
+    minutes = np.where(np.isnan(minutes) | np.isnan(co2), np.inf, minutes)
+    co2 = np.where(np.isinf(minutes), np.inf, co2)
+    order = np.lexsort((co2, minutes), axis=-1)
+    sorted_minutes = np.take_along_axis(minutes, order, axis=-1)
+    sorted_co2 = np.take_along_axis(co2, order, axis=-1)
+
+    # Least CO2 of all options before each one in the sweep
+    best_before = np.minimum.accumulate(sorted_co2, axis=-1)
+    best_before = np.concatenate([np.full((len(co2), 1), np.inf), best_before[:, :-1]], axis=-1)
+    on_frontier = (sorted_co2 < best_before) & ~np.isinf(sorted_minutes)
+
+    frontier = np.zeros(minutes.shape, dtype=bool)
+    np.put_along_axis(frontier, order, on_frontier, axis=-1)
+    return frontier
+
+
+# Frontier arrays for the snapshot, computed from the trips table in snapshot arrays
+def pareto_arrays(tables):
+    train_minutes = pair_values(tables, 'Duration_train_minutes')
+    plane_minutes = pair_values(tables, 'Duration_plane_total_minutes')
+    train_co2, plane_co2 = pair_values(tables, 'Train_CO2_kg'), pair_values(tables, 'Plane_CO2_kg')
+    num_cities = len(train_minutes)
+    # (C, 2C) options of every origin: all train trips, then all plane trips
+    frontier = pareto_rows(np.concatenate([train_minutes, plane_minutes], axis=1),
+                           np.concatenate([train_co2, plane_co2], axis=1))
+    return {'pareto.frontier': frontier.reshape(num_cities, 2, num_cities)}
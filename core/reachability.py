@@ -0,0 +1,64 @@
+from collections import namedtuple
+
+import numpy as np
+
+from core.cache import lru_cached
+from core.matrices import od_matrices, matrix_cities, city_ids
+from core.routes import geometry_store_version
+
+# Train reachability: which cities can be reached by train from an origin within a travel time and/or CO2
+# budget (one way, per person). Every origin's destinations are sorted once by train minutes and by train CO2,
+# so a threshold query is a binary search in the origin's row and the answer is the prefix before it.
+
+# Metrics the destinations are sorted by, od_matrices fields
+REACH_METRICS = ('train_minutes', 'train_co2')
+
+# Per metric: (C, C) destination IDs of every origin in ascending order of the metric, destinations without a
+# value last; (C, C) the metric values in that order (NaN last); (C,) number of destinations with a value
+ReachIndex = namedtuple('ReachIndex', ['order', 'values', 'counts'])
+
+# A destination within the budget
+Reachable = namedtuple('Reachable', ['city', 'minutes', 'co2'])
+
+
+# Sorted destination index of every origin by one metric of the od_matrices
+def build_reach_index(matrix):
+    # argsort puts NaN last
+    order = np.argsort(matrix, axis=1, kind='stable').astype('int32')
+    return ReachIndex(order, np.take_along_axis(matrix, order, axis=1), (~np.isnan(matrix)).sum(axis=1))
+
+
+# {metric: ReachIndex} for REACH_METRICS, built once per process; warm it at startup to keep queries fast
+@lru_cached(maxsize=1, version=geometry_store_version)
+def reach_indexes():
+    matrices = od_matrices()
+    return {metric: build_reach_index(getattr(matrices, metric)) for metric in REACH_METRICS}
+
+
+# Destination IDs of an origin ID within a threshold of one metric, in ascending order of it
+def within(metric, origin, threshold):
+    index = reach_indexes()[metric]
+    values = index.values[origin, :index.counts[origin]]
+    return index.order[origin, :np.searchsorted(values, threshold, side='right')]
+
+
+# Cities reachable by train from a city within max_minutes and/or max_co2 kg (one way, per person), fastest first.
+# Without a threshold, every destination with a train value.
+def reachable_from(from_city, max_minutes=None, max_co2=None):
+    origin = city_ids([from_city])[0]
+    matrices = od_matrices()
+    max_minutes = np.inf if max_minutes is None else max_minutes
+    destinations = within('train_minutes', origin, max_minutes)
+    if max_co2 is not None:
+        by_co2 = within('train_co2', origin, max_co2)
+        if len(by_co2) < len(destinations):
+            # Start from the shorter prefix, in the order of the train minutes index (ties by city ID)
+            minutes = matrices.train_minutes[origin, by_co2]
+            destinations = by_co2[np.lexsort((by_co2, minutes))]
+            destinations = destinations[matrices.train_minutes[origin, destinations] <= max_minutes]
+        else:
+            destinations = destinations[matrices.train_co2[origin, destinations] <= max_co2]
+    cities = matrix_cities()
+    return [Reachable(cities[destination], float(minutes), float(co2)) for destination, minutes, co2 in
+            zip(destinations.tolist(), matrices.train_minutes[origin, destinations].tolist(),
+                matrices.train_co2[origin, destinations].tolist())]
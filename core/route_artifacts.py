@@ -0,0 +1,99 @@
+import hashlib
+import os
+from collections import namedtuple
+
+import numpy as np
+
+# Precomputed per-route values that depend only on the city pair: route map projection, plane arc,
+# train transfers and the duration axis ticks. They are derived offline for every route in the trips data
+# (python build_data.py routes) and stored in one .npz file, keyed by the normalized city pair.
+#
+# Arrays in the file:
+#   version        int, ROUTE_ARTIFACTS_VERSION
+#   routes         (N,) route keys
+#   input_hashes   (N,) hash of the inputs each route was derived from, used by incremental builds
+#   centers        (N, 2) projection center (lon, lat)
+#   scales         (N,) projection scale
+#   arcs           (N, ARC_POINTS, 2) plane arc (lon, lat) from the first to the second city of the route key
+#   transfers      (N,) train transfers, -1 without a train route
+#   tick_values    (N, 2, K) duration axis ticks for one way and round trip, padded with -1
+
+ROUTE_ARTIFACTS_PATH = 'data/route_artifacts.npz'
+ROUTE_ARTIFACTS_VERSION = 1
+ARC_POINTS = 100
+
+RouteArtifact = namedtuple('RouteArtifact', ['center', 'scale', 'arc', 'transfers',
+                                             'tick_values_one_way', 'tick_values_round_trip'])
+
+
+# Stable hash of the inputs a route's artifact is derived from
+def input_hash(inputs):
+    return hashlib.sha1(repr((ROUTE_ARTIFACTS_VERSION, ARC_POINTS) + tuple(inputs)).encode('utf-8')).hexdigest()
+
+
+# Read an artifacts file into {route: (input_hash, RouteArtifact)}. A missing file or one written by another
+# version yields no routes; everything in it can be derived again.
+def load_route_artifacts(path=ROUTE_ARTIFACTS_PATH):
+    if not os.path.exists(path):
+        return {}
+    with np.load(path, allow_pickle=False) as data:
+        if int(data['version']) != ROUTE_ARTIFACTS_VERSION:
+            return {}
+        transfers = data['transfers'].tolist()
+        return {
+            route: (hash_, RouteArtifact(
+                center=center,
+                scale=scale,
+                arc=arc,
+                transfers=None if transfers[i] < 0 else transfers[i],
+                tick_values_one_way=[tick for tick in ticks[0] if tick >= 0],
+                tick_values_round_trip=[tick for tick in ticks[1] if tick >= 0],
+            ))
+            for i, (route, hash_, center, scale, arc, ticks) in enumerate(zip(
+                data['routes'].tolist(), data['input_hashes'].tolist(), data['centers'].tolist(),
+                data['scales'].tolist(), data['arcs'], data['tick_values'].tolist()))
+        }
+
+
+# Write {route: (input_hash, RouteArtifact)} to an artifacts file
+def write_route_artifacts(entries, path=ROUTE_ARTIFACTS_PATH):
+    routes = sorted(entries)
+    artifacts = [entries[route][1] for route in routes]
+    num_ticks = max((max(len(a.tick_values_one_way), len(a.tick_values_round_trip)) for a in artifacts), default=1)
+    tick_values = np.full((len(routes), 2, num_ticks), -1, dtype='<i8')
+    for i, artifact in enumerate(artifacts):
+        tick_values[i, 0, :len(artifact.tick_values_one_way)] = artifact.tick_values_one_way
+        tick_values[i, 1, :len(artifact.tick_values_round_trip)] = artifact.tick_values_round_trip
+
+    # Write to a temporary file and swap it in, like the geometry store
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        np.savez_compressed(
+            f,
+            version=np.int64(ROUTE_ARTIFACTS_VERSION),
+            routes=np.array(routes, dtype=str),
+            input_hashes=np.array([entries[route][0] for route in routes], dtype=str),
+            centers=np.array([a.center for a in artifacts], dtype='<f8').reshape(-1, 2),
+            scales=np.array([a.scale for a in artifacts], dtype='<f8'),
+            arcs=np.array([a.arc for a in artifacts], dtype='<f8').reshape(-1, ARC_POINTS, 2),
+            transfers=np.array([-1 if a.transfers is None else a.transfers for a in artifacts], dtype='<i8'),
+            tick_values=tick_values,
+        )
+    os.replace(temp_path, path)
+
+
+# Derive the artifacts of every route in route_inputs ({route: inputs tuple}) with derive(inputs) and write them.
+# Routes whose inputs hash the same as in the existing file are reused, so only changed pairs are recomputed.
+# Returns the number of recomputed routes and the total number of routes.
+def build_route_artifacts(route_inputs, derive, path=ROUTE_ARTIFACTS_PATH):
+    existing = load_route_artifacts(path)
+    entries, recomputed = {}, 0
+    for route, inputs in route_inputs.items():
+        hash_ = input_hash(inputs)
+        if route in existing and existing[route][0] == hash_:
+            entries[route] = existing[route]
+        else:
+            entries[route] = (hash_, derive(inputs))
+            recomputed += 1
+    write_route_artifacts(entries, path)
+    return recomputed, len(entries)
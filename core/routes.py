@@ -0,0 +1,185 @@
+import os
+from collections import namedtuple
+
+import numpy as np
+
+from core.cache import lru_cached
+from core.geo import get_projection_params, generate_curved_arc, calculate_tick_values, minutes_to_str
+from core.geometry_store import GeometryStore, GEOMETRY_STORE_PATH
+from core.route_artifacts import RouteArtifact, load_route_artifacts, input_hash, ARC_POINTS, ROUTE_ARTIFACTS_PATH
+from core.trips import normalize_city_pair, trip_data, route_index, city_positions, get_route, has_flight
+
+# Train route geometry, precomputed route artifacts and route comparisons
+
+_geometry_store = None
+
+# Memory-mapped store with all train route lines and stops (built with: python build_data.py geometry),
+# opened on first use
+def geometry_store():
+    global _geometry_store
+    if _geometry_store is None:
+        _geometry_store = GeometryStore(GEOMETRY_STORE_PATH)
+    return _geometry_store
+
+# Reopen the geometry store after it is rebuilt; its mtime versions the route geometry caches
+def geometry_store_version():
+    global _geometry_store
+    mtime = os.stat(GEOMETRY_STORE_PATH).st_mtime_ns
+    if _geometry_store is None or mtime != _geometry_store.mtime:
+        _geometry_store = GeometryStore(GEOMETRY_STORE_PATH)
+    return mtime
+
+# Cache key of a route loader: both directions of a city pair map to the same store entry, so they share one
+def _route_cache_key(from_city, to_city, *args):
+    pair = normalize_city_pair(from_city, to_city) if from_city and to_city else (from_city, to_city)
+    return (pair,) + args
+
+# Load GeoJSON route (lines) between cities for train, None if there is no route. The line is simplified for a
+# geometry store level (see core.line_level_for_scale), or in full when level is None.
+@lru_cached(maxsize=512, version=geometry_store_version, key=_route_cache_key)
+def load_geojson_lines(from_city, to_city, level=None):
+    store = geometry_store()
+    route = normalize_city_pair(from_city, to_city)
+    if route not in store:
+        return None
+
+    entry = store.routes[route]
+    return {
+        'type': 'FeatureCollection',
+        'features': [{
+            'type': 'Feature',
+            'geometry': {'type': 'LineString', 'coordinates': store.line(route, level).tolist()},
+            'properties': {'Start': entry['start'], 'End': entry['end']}
+        }]
+    }
+
+# Load GeoJSON route (points) between cities for train, None if there is no route.
+@lru_cached(maxsize=512, version=geometry_store_version, key=_route_cache_key)
+def load_geojson_points(from_city, to_city):
+    if not from_city or not to_city:
+        return None
+
+    store = geometry_store()
+    route = normalize_city_pair(from_city, to_city)
+    if route not in store:
+        return None
+
+    entry = store.routes[route]
+    return {
+        'type': 'FeatureCollection',
+        'features': [
+            {
+                'type': 'Feature',
+                'geometry': {'type': 'Point', 'coordinates': [lon, lat]},
+                'properties': {'Start': entry['start'], 'End': entry['end'], 'stop_name': stop_name,
+                               'latitude': lat, 'longitude': lon}
+            }
+            for (lon, lat), stop_name in zip(store.stops(route).tolist(), store.stop_names_for(route))
+        ]
+    }
+
+# Inputs of the precomputed route artifacts for every route in the trip data, in route key order:
+# route -> (lon_1, lat_1, lon_2, lat_2, train minutes, plane minutes or None, number of train stops or None)
+def build_route_inputs(trip_data):
+    store, index, positions = geometry_store(), route_index(), city_positions()
+    route_inputs = {}
+    for route, city_1, city_2 in zip(trip_data['route'], trip_data['City_1'], trip_data['City_2']):
+        first, second = sorted([city_1, city_2])
+        travel_info = index[route]
+        stops = store.routes[route]['stops'] if route in store else None
+        route_inputs[route] = (
+            *positions[first], *positions[second],
+            int(travel_info.Duration_train_minutes),
+            int(travel_info.Duration_plane_total_minutes) if has_flight(travel_info) else None,
+            stops[1] - stops[0] if stops is not None else None,
+        )
+    return route_inputs
+
+# Derive a route's artifact from its inputs (see build_route_inputs)
+def derive_route_artifact(inputs):
+    lon_1, lat_1, lon_2, lat_2, train_minutes, plane_minutes, num_stops = inputs
+    projection_params = get_projection_params([{'lon': lon_1, 'lat': lat_1}, {'lon': lon_2, 'lat': lat_2}])
+    max_duration = max(train_minutes, plane_minutes or 0)
+    return RouteArtifact(
+        center=projection_params['center'],
+        scale=projection_params['scale'],
+        arc=np.array(generate_curved_arc([lon_1, lat_1], [lon_2, lat_2], num_points=ARC_POINTS)),
+        # Same as calculate_transfers: stops minus start and end
+        transfers=max(0, num_stops - 2) if num_stops is not None else None,
+        tick_values_one_way=calculate_tick_values(0, max_duration),
+        tick_values_round_trip=calculate_tick_values(0, 2 * max_duration),
+    )
+
+# Route artifact inputs of the current trip data and geometry store
+@lru_cached(maxsize=1, version=geometry_store_version)
+def route_inputs():
+    return build_route_inputs(trip_data())
+
+# Route artifacts built with: python build_data.py routes. Routes whose inputs changed since the build
+# (or are missing from it) are derived on first use instead.
+@lru_cached(maxsize=1, version=geometry_store_version)
+def route_artifacts():
+    inputs = route_inputs()
+    return {
+        route: artifact
+        for route, (hash_, artifact) in load_route_artifacts(ROUTE_ARTIFACTS_PATH).items()
+        if route in inputs and hash_ == input_hash(inputs[route])
+    }
+
+# Precomputed artifact of a route in the trip data
+def route_artifact(from_city, to_city):
+    route = normalize_city_pair(from_city, to_city)
+    artifacts = route_artifacts()
+    artifact = artifacts.get(route)
+    if artifact is None:
+        artifact = artifacts[route] = derive_route_artifact(route_inputs()[route])
+    return artifact
+
+# Durations (minutes and formatted), emissions and duration axis ticks of a trip; the plane values are None
+# and plane CO2 is 0 without a flight
+Trip = namedtuple('Trip', ['train_minutes', 'train_duration', 'train_co2',
+                           'plane_minutes', 'plane_duration', 'plane_co2', 'tick_values'])
+
+# Scale a route's travel record for the number of people and round trip
+def scale_trip(travel_info, artifact, num_people=1, round_trip=False):
+    # Check if plane duration is available, plane CO2 is 0 in the charts without a flight
+    if has_flight(travel_info):
+        plane_minutes = travel_info.Duration_plane_total_minutes
+        plane_co2 = float(np.round(travel_info.Plane_CO2_kg, 1))
+    else:
+        plane_minutes = None
+        plane_co2 = 0
+
+    train_minutes = travel_info.Duration_train_minutes
+    # Rounded like core.round_co2, so that the comparison tables match a search
+    train_co2 = float(np.round(travel_info.Train_CO2_kg, 1))
+
+    # Adjust CO2 emissions based on the number of people
+    train_co2 *= num_people
+    plane_co2 *= num_people
+
+    # Double the values if round trip is selected
+    if round_trip:
+        train_minutes *= 2
+        train_co2 *= 2
+        if plane_minutes is not None:
+            plane_minutes *= 2
+        plane_co2 *= 2
+
+    # Format the durations for chart labels and tooltips
+    return Trip(
+        train_minutes=train_minutes,
+        train_duration=minutes_to_str(train_minutes),
+        train_co2=train_co2,
+        plane_minutes=plane_minutes,
+        plane_duration=minutes_to_str(plane_minutes) if plane_minutes is not None else None,
+        plane_co2=plane_co2,
+        tick_values=artifact.tick_values_round_trip if round_trip else artifact.tick_values_one_way,
+    )
+
+# Train vs. plane comparison of a trip between two cities, None if the route is unknown
+def compare_route(from_city, to_city, num_people=1, round_trip=False):
+    travel_info = get_route(from_city, to_city)
+    if travel_info is None:
+        return None
+    return scale_trip(travel_info, route_artifact(from_city, to_city), num_people, round_trip)
@@ -0,0 +1,147 @@
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+# Compiled snapshot of the trip and city data: the prepared trips table, the coordinates table and a city pair
+# index in one uncompressed .npz file (python build_data.py snapshot), loaded at startup in one read instead of
+# parsing the CSVs. Tables are stored column by column:
+#
+#   <table>.columns              column names, in order
+#   <table>.<column>             numeric column values; nullable integers also have <table>.<column>.mask
+#   <table>.<column>.codes       string columns: int32 codes into <table>.<column>.values
+#
+# The trips table is stored without its route keys.
+#
+# plus
+#   version                      SNAPSHOT_VERSION
+#   source_paths, source_sizes, source_mtimes, source_hashes
+#                                the CSV files the snapshot was built from (trips, coordinates and direct
+#                                flights), to detect a stale snapshot
+#   pair_cities                  (C,) cities of the pair index: coordinate cities, then any other trip cities
+#   route_rows                   (C, C) trips table row of each city pair in either direction, -1 without a route
+#   routing.*                    chained-train routing over the pair index, see core.train_routing
+#   flights.*                    connecting-flight routing over the airports, see core.flights
+#   pareto.*                     time vs. CO2 Pareto frontiers of every origin, see core.pareto
+
+SNAPSHOT_PATH = 'data/trips_snapshot.npz'
+SNAPSHOT_VERSION = 5
+
+
+# Content hash of a source file, compared when its size matches but the mtime does not (e.g. after a checkout)
+def file_hash(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+# Columnar arrays of a DataFrame under a table name
+def encode_table(table, name):
+    arrays = {f'{name}.columns': np.array(table.columns, dtype=str)}
+    for column in table.columns:
+        values = table[column]
+        key = f'{name}.{column}'
+        if values.dtype == 'Int64':
+            arrays[key] = values.to_numpy('int64', na_value=0)
+            arrays[f'{key}.mask'] = values.isna().to_numpy()
+        elif pd.api.types.is_numeric_dtype(values):
+            arrays[key] = values.to_numpy()
+        else:
+            codes, uniques = pd.factorize(values)
+            arrays[f'{key}.codes'] = codes.astype('int32')
+            arrays[f'{key}.values'] = np.array(uniques, dtype=str)
+    return arrays
+
+
+# DataFrame of a table stored with encode_table
+def decode_table(arrays, name):
+    columns = {}
+    for column in arrays[f'{name}.columns'].tolist():
+        key = f'{name}.{column}'
+        if f'{key}.codes' in arrays:
+            columns[column] = pd.Series(arrays[f'{key}.values'][arrays[f'{key}.codes']], dtype='str')
+        elif f'{key}.mask' in arrays:
+            columns[column] = pd.arrays.IntegerArray(arrays[key], arrays[f'{key}.mask'])
+        else:
+            columns[column] = arrays[key]
+    return pd.DataFrame(columns)
+
+
+# Decoded string column of a table, as an array of names
+def string_column(arrays, name, column):
+    return arrays[f'{name}.{column}.values'][arrays[f'{name}.{column}.codes']]
+
+
+# Snapshot arrays of the prepared trip data and the coordinates, with the city pair index. The route keys are
+# left out, one string per route would outweigh the rest of the table; they are derived again from the cities.
+def snapshot_arrays(trip_data, coordinates):
+    arrays = {**encode_table(trip_data.drop(columns=['route']), 'trips'), **encode_table(coordinates, 'coordinates')}
+
+    city_1, city_2 = string_column(arrays, 'trips', 'City_1'), string_column(arrays, 'trips', 'City_2')
+    pair_cities = list(dict.fromkeys(coordinates['city']))
+    pair_cities += sorted(set(city_1.tolist() + city_2.tolist()) - set(pair_cities))
+    city_ids = {city: i for i, city in enumerate(pair_cities)}
+    ids_1 = np.array([city_ids[city] for city in city_1.tolist()], dtype='int64')
+    ids_2 = np.array([city_ids[city] for city in city_2.tolist()], dtype='int64')
+
+    route_rows = np.full((len(pair_cities), len(pair_cities)), -1, dtype='int32')
+    rows = np.arange(len(trip_data), dtype='int32')
+    route_rows[ids_1, ids_2] = rows
+    route_rows[ids_2, ids_1] = rows
+    arrays['pair_cities'] = np.array(pair_cities, dtype=str)
+    arrays['route_rows'] = route_rows
+    return arrays
+
+
+# Values of a trips table column as float64, NaN where the value is missing
+def column_values(tables, column):
+    values = tables[f'trips.{column}'].astype('float64')
+    if f'trips.{column}.mask' in tables:
+        values[tables[f'trips.{column}.mask']] = np.nan
+    return values
+
+
+# (C, C) values of a trips table column for every city pair of the pair index, NaN without a route or where the
+# value is missing
+def pair_values(tables, column):
+    # Row -1 (no route) picks the appended NaN
+    return np.append(column_values(tables, column), np.nan)[tables['route_rows']]
+
+
+# Write snapshot arrays built from the source files
+def write_snapshot(arrays, source_paths, path=SNAPSHOT_PATH):
+    stats = [os.stat(source) for source in source_paths]
+    # Write to a temporary file and swap it in, like the geometry store
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        np.savez(
+            f,
+            version=np.int64(SNAPSHOT_VERSION),
+            source_paths=np.array(source_paths, dtype=str),
+            source_sizes=np.array([stat.st_size for stat in stats], dtype='int64'),
+            source_mtimes=np.array([stat.st_mtime_ns for stat in stats], dtype='int64'),
+            source_hashes=np.array([file_hash(source) for source in source_paths], dtype=str),
+            **arrays,
+        )
+    os.replace(temp_path, path)
+
+
+# Whether a loaded snapshot was built from the current source files
+def is_fresh(snapshot, source_paths):
+    if int(snapshot['version']) != SNAPSHOT_VERSION or snapshot['source_paths'].tolist() != list(source_paths):
+        return False
+    for source, size, mtime, hash_ in zip(source_paths, snapshot['source_sizes'].tolist(),
+                                          snapshot['source_mtimes'].tolist(), snapshot['source_hashes'].tolist()):
+        stat = os.stat(source)
+        if stat.st_size != size or (stat.st_mtime_ns != mtime and file_hash(source) != hash_):
+            return False
+    return True
+
+
+# Read all snapshot arrays, None if the file is missing or stale
+def load_snapshot(source_paths, path=SNAPSHOT_PATH):
+    if not os.path.exists(path):
+        return None
+    with np.load(path, allow_pickle=False) as data:
+        snapshot = {key: data[key] for key in data.files}
+    return snapshot if is_fresh(snapshot, source_paths) else None
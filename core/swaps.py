@@ -0,0 +1,93 @@
+import functools
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from core.fanout import round_co2, minutes_to_strs
+from core.snapshot import string_column, column_values
+from core.trips import trip_tables, pair_city_ids
+
+# Best train swaps: the routes where taking the train instead of the plane saves the most CO2 for the least
+# extra travel time, over every route of the trips table. The per-route scores are computed and sorted once for
+# the whole table (swap_table), so a query masks them with its filters and keeps the first k that pass.
+#
+# The score is kg CO2 saved per person per added hour by train. Routes where the train takes less than
+# MIN_EXTRA_HOURS longer (or is faster) are scored as if it took MIN_EXTRA_HOURS longer, so that they rank
+# first by their savings instead of dividing by zero.
+
+MIN_EXTRA_HOURS = 0.5
+
+# Per-route arrays of the trips table with a flight and a train saving CO2, one entry per swap in descending
+# order of the score: city IDs of both ends, train and plane minutes, CO2 saved per person (rounded like
+# scale_trip) and the score
+SwapTable = namedtuple('SwapTable', ['city_1', 'city_2', 'train_minutes', 'plane_minutes', 'co2_saved', 'score'])
+
+
+# Swap arrays of snapshot arrays (see core.snapshot), computed row by row of the trips table
+def build_swap_table(tables):
+    ids = {city: i for i, city in enumerate(tables['pair_cities'].tolist())}
+    city_1 = np.array([ids[city] for city in string_column(tables, 'trips', 'City_1').tolist()], dtype='int32')
+    city_2 = np.array([ids[city] for city in string_column(tables, 'trips', 'City_2').tolist()], dtype='int32')
+    train_minutes = column_values(tables, 'Duration_train_minutes')
+    plane_minutes = column_values(tables, 'Duration_plane_total_minutes')
+    train_co2, plane_co2 = column_values(tables, 'Train_CO2_kg'), column_values(tables, 'Plane_CO2_kg')
+
+    # Like has_flight: a route without either plane value has no flight
+    usable = ~(np.isnan(train_minutes) | np.isnan(plane_minutes) | np.isnan(train_co2) | np.isnan(plane_co2))
+    co2_saved = round_co2(plane_co2[usable]) - round_co2(train_co2[usable])
+    saves = co2_saved > 0
+    usable[usable] = saves
+    co2_saved = co2_saved[saves]
+    extra_hours = (train_minutes[usable] - plane_minutes[usable]) / 60
+    score = co2_saved / np.maximum(extra_hours, MIN_EXTRA_HOURS)
+
+    order = np.argsort(-score, kind='stable')
+    rows = np.flatnonzero(usable)[order]
+    return SwapTable(city_1[rows], city_2[rows], train_minutes[rows], plane_minutes[rows], co2_saved[order],
+                     score[order])
+
+
+# Swap arrays of the current trip data, computed on first use
+@functools.lru_cache(maxsize=None)
+def swap_table():
+    return build_swap_table(trip_tables())
+
+
+# Indices into a SwapTable of the k best swaps passing the filters, best first: routes from from_city (either end
+# of the route) and at most max_train_minutes by train
+def top_swaps(swaps, k, from_city_id=None, max_train_minutes=None):
+    if from_city_id is None and max_train_minutes is None:
+        return np.arange(min(k, len(swaps.score)))
+    mask = np.ones(len(swaps.score), dtype=bool)
+    if from_city_id is not None:
+        mask &= (swaps.city_1 == from_city_id) | (swaps.city_2 == from_city_id)
+    if max_train_minutes is not None:
+        mask &= swaps.train_minutes <= max_train_minutes
+    # The table is sorted by score
+    return np.flatnonzero(mask)[:k]
+
+
+# The k routes where switching from plane to train saves the most CO2 per added hour, best first, optionally only
+# from one city and up to a train duration. CO2 is scaled for num_people like scale_trip (one way).
+def best_train_swaps(k=10, from_city=None, max_train_minutes=None, num_people=1):
+    swaps = swap_table()
+    from_city_id = None if from_city is None else pair_city_ids()[from_city]
+    best = top_swaps(swaps, k, from_city_id, max_train_minutes)
+
+    cities = np.array(trip_tables()['pair_cities'], dtype=object)
+    city_1, city_2 = swaps.city_1[best], swaps.city_2[best]
+    # Routes from from_city start there
+    flip = np.zeros(len(best), dtype=bool) if from_city_id is None else city_2 == from_city_id
+    train_minutes, plane_minutes = swaps.train_minutes[best], swaps.plane_minutes[best]
+    return pd.DataFrame({
+        'From': cities[np.where(flip, city_2, city_1)],
+        'To': cities[np.where(flip, city_1, city_2)],
+        'Train_minutes': train_minutes,
+        'Train_duration': minutes_to_strs(train_minutes),
+        'Plane_minutes': plane_minutes,
+        'Plane_duration': minutes_to_strs(plane_minutes),
+        'Extra_minutes': train_minutes - plane_minutes,
+        'CO2_saved_kg': swaps.co2_saved[best] * num_people,
+        'Saved_per_hour_kg': swaps.score[best] * num_people,
+    })
@@ -0,0 +1,40 @@
+from core.graph import shortest_paths, best_two_leg_chains
+from core.snapshot import pair_values
+
+# Chained-train routing over the city graph: the stored train durations as edge weights (every pair with travel
+# data is an edge), all-pairs shortest paths with a vectorized Floyd-Warshall, and the best two-leg chain of every
+# pair (see core.graph). Pairs where a chain through another city beats the stored direct train are flagged, and
+# pairs without a stored train value get the shortest chain instead in the OD matrices (see
+# core.matrices.build_od_matrices).
+#
+# The results are computed by the data build and stored in the snapshot next to the trips table (see
+# routing_arrays), so the app only indexes them:
+#   routing.path_minutes, routing.path_co2    (C, C) shortest chained train trip, NaN if unreachable
+#   routing.next_hop                          (C, C) next city on the shortest chain, -1 if unreachable
+#   routing.via                               (C, C) middle city of the best two-leg chain, -1 without one
+#   routing.via_minutes, routing.via_co2      (C, C) best two-leg chain
+#
+# Chain durations include TRANSFER_MINUTES for every change of train in a city between two stored routes.
+
+TRANSFER_MINUTES = 30
+
+
+# Shortest chained train trips over (C, C) train minutes and CO2, see core.graph.shortest_paths
+def shortest_train_paths(minutes, co2, transfer_minutes=TRANSFER_MINUTES):
+    return shortest_paths(minutes, co2, transfer_minutes)
+
+
+# Routing arrays for the snapshot, computed from the trips table in snapshot arrays
+def routing_arrays(tables, transfer_minutes=TRANSFER_MINUTES):
+    minutes = pair_values(tables, 'Duration_train_minutes')
+    co2 = pair_values(tables, 'Train_CO2_kg')
+    path_minutes, path_co2, next_hop = shortest_train_paths(minutes, co2, transfer_minutes)
+    via, via_minutes, via_co2 = best_two_leg_chains(minutes, co2, transfer_minutes)
+    return {
+        'routing.path_minutes': path_minutes,
+        'routing.path_co2': path_co2,
+        'routing.next_hop': next_hop.astype('int32'),
+        'routing.via': via,
+        'routing.via_minutes': via_minutes,
+        'routing.via_co2': via_co2,
+    }
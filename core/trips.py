@@ -0,0 +1,145 @@
+import functools
+from collections import namedtuple
+
+import pandas as pd
+
+from core.snapshot import SNAPSHOT_PATH, snapshot_arrays, write_snapshot, load_snapshot, decode_table
+from core.train_routing import routing_arrays
+from core.flights import DIRECT_FLIGHTS_PATH, read_direct_flights, direct_flights_assumed, flight_arrays
+from core.pareto import pareto_arrays
+
+# Trip and city data: loaded on first use and kept for the whole process, from the compiled snapshot
+# (python build_data.py snapshot) or from the CSVs when the snapshot is missing or stale
+
+TRIPS_DATA_PATH = 'data/trips_data.csv'
+COORDINATES_PATH = 'data/coordinates.csv'
+
+# Duration columns stored as "H:MM" strings in the trips CSV
+DURATION_COLUMNS = ['Duration_train', 'Duration_plane', 'Duration_plane_total']
+
+# Normalize city pairs in trip data
+def normalize_city_pair(city1, city2):
+    return '-'.join(sorted([city1, city2]))
+
+# Vectorized normalize_city_pair over two columns of city names
+def normalize_city_pairs(cities_1, cities_2):
+    in_order = cities_1 <= cities_2
+    first = cities_1.where(in_order, cities_2)
+    second = cities_2.where(in_order, cities_1)
+    return first + '-' + second
+
+# Parse a column of "H:MM" strings into integer minutes (missing values stay missing)
+def durations_to_minutes(durations):
+    durations = durations.str.strip()
+    hours = durations.str[:-3].astype('Int64')
+    minutes = durations.str[-2:].astype('Int64')
+    return hours * 60 + minutes
+
+# Add route keys and integer-minute duration columns to the raw trip data
+def prepare_trip_data(trip_data):
+    trip_data.columns = trip_data.columns.str.strip()
+    trip_data['route'] = normalize_city_pairs(trip_data['City_1'], trip_data['City_2'])
+    for column in DURATION_COLUMNS:
+        trip_data[f'{column}_minutes'] = durations_to_minutes(trip_data[column])
+    return trip_data.drop(columns=DURATION_COLUMNS)
+
+# City coordinates with cleaned up column names
+def prepare_coordinates(coordinates):
+    coordinates.columns = coordinates.columns.str.strip()
+    return coordinates
+
+# Snapshot arrays parsed from the CSVs, with the chained-train and connecting-flight routing and the Pareto
+# frontiers computed from them
+def read_trip_tables(trips_path=TRIPS_DATA_PATH, coordinates_path=COORDINATES_PATH,
+                     direct_flights_path=DIRECT_FLIGHTS_PATH):
+    tables = snapshot_arrays(prepare_trip_data(pd.read_csv(trips_path)),
+                             prepare_coordinates(pd.read_csv(coordinates_path)))
+    tables.update(routing_arrays(tables))
+    tables.update(flight_arrays(tables, read_direct_flights(direct_flights_path),
+                                direct_flights_assumed(direct_flights_path)))
+    tables.update(pareto_arrays(tables))
+    return tables
+
+# Snapshot arrays of the trip and city data: the compiled snapshot if it is up to date with the CSVs,
+# otherwise parsed from the CSVs
+def load_trip_tables(trips_path=TRIPS_DATA_PATH, coordinates_path=COORDINATES_PATH,
+                     direct_flights_path=DIRECT_FLIGHTS_PATH, snapshot_path=SNAPSHOT_PATH):
+    tables = load_snapshot([trips_path, coordinates_path, direct_flights_path], snapshot_path)
+    return tables if tables is not None else read_trip_tables(trips_path, coordinates_path, direct_flights_path)
+
+# Compile the CSVs into the snapshot loaded at startup
+def build_trip_snapshot(trips_path=TRIPS_DATA_PATH, coordinates_path=COORDINATES_PATH,
+                        direct_flights_path=DIRECT_FLIGHTS_PATH, snapshot_path=SNAPSHOT_PATH):
+    tables = read_trip_tables(trips_path, coordinates_path, direct_flights_path)
+    write_snapshot(tables, [trips_path, coordinates_path, direct_flights_path], snapshot_path)
+    return tables
+
+@functools.lru_cache(maxsize=None)
+def trip_tables():
+    return load_trip_tables()
+
+# Trip data with route keys and integer-minute durations
+@functools.lru_cache(maxsize=None)
+def trip_data():
+    trip_data = decode_table(trip_tables(), 'trips')
+    trip_data['route'] = normalize_city_pairs(trip_data['City_1'], trip_data['City_2'])
+    return trip_data
+
+# City coordinates with cleaned up column names
+@functools.lru_cache(maxsize=None)
+def coordinates_data():
+    return decode_table(trip_tables(), 'coordinates')
+
+# Unique city names, in file order
+@functools.lru_cache(maxsize=None)
+def cities():
+    return list(dict.fromkeys(trip_tables()['coordinates.city.values'].tolist()))
+
+# city -> (longitude, latitude)
+@functools.lru_cache(maxsize=None)
+def city_positions():
+    tables = trip_tables()
+    names = tables['coordinates.city.values'][tables['coordinates.city.codes']]
+    return dict(zip(names.tolist(), zip(tables['coordinates.longitude'].tolist(),
+                                        tables['coordinates.latitude'].tolist())))
+
+# Compact per-route record with the values a search needs
+Route = namedtuple('Route', ['Duration_train_minutes', 'Train_CO2_kg', 'Duration_plane_total_minutes', 'Plane_CO2_kg'])
+
+# Build the route index (normalized city pair -> Route) from the trip data
+def build_route_index(trip_data):
+    return {
+        route: Route(*values)
+        for route, *values in zip(trip_data['route'], trip_data['Duration_train_minutes'], trip_data['Train_CO2_kg'],
+                                  trip_data['Duration_plane_total_minutes'], trip_data['Plane_CO2_kg'])
+    }
+
+@functools.lru_cache(maxsize=None)
+def route_index():
+    return build_route_index(trip_data())
+
+# city -> row and column of the city pair index
+@functools.lru_cache(maxsize=None)
+def pair_city_ids():
+    return {city: i for i, city in enumerate(trip_tables()['pair_cities'].tolist())}
+
+# Nullable integer column value of a trips table row, None when missing
+def _nullable(tables, column, row):
+    return None if tables[f'trips.{column}.mask'][row] else tables[f'trips.{column}'][row].item()
+
+# Look up the travel data for a city pair in either direction, None if the route is unknown.
+# Reads the row straight from the snapshot arrays, so searches do not wait for the route index.
+def get_route(from_city, to_city):
+    ids = pair_city_ids()
+    if from_city not in ids or to_city not in ids:
+        return None
+    tables = trip_tables()
+    row = tables['route_rows'][ids[from_city], ids[to_city]].item()
+    if row < 0:
+        return None
+    return Route(_nullable(tables, 'Duration_train_minutes', row), tables['trips.Train_CO2_kg'][row].item(),
+                 _nullable(tables, 'Duration_plane_total_minutes', row), tables['trips.Plane_CO2_kg'][row].item())
+
+# Whether a route has flight data; without it the plane duration and CO2 are left out of comparisons
+def has_flight(travel_info):
+    return not (pd.isna(travel_info.Duration_plane_total_minutes) or pd.isna(travel_info.Plane_CO2_kg))
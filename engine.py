@@ -0,0 +1,512 @@
+import functools
+import math
+import threading
+import time
+from collections import namedtuple
+
+from basemap import clipped_basemap
+from core import get_route, route_artifact, scale_trip, city_positions, load_geojson_lines, load_geojson_points, \
+    calculate_transfers, geometry_store_version, get_projection_params, compare_from, origin_geometry, origin_positions, \
+    plan_itinerary, minutes_to_strs, via_suggestion, connecting_flight, rank_hosts, od_values, \
+    best_train_swaps, origin_frontier, adaptive_arc, line_level_for_scale, round_co2
+from core.cache import lru_cached
+from specs import fill_template, route_map_template, MAP_ROTATE, duration_bars_template, emission_bars_template, \
+    duration_columns_template, emission_columns_template, duration_bullet_template, emission_circles_template, \
+    fanout_map_template, itinerary_map_template, frontier_scatter_template
+
+# Rendering pipeline shared by the main app and the user-testing pages:
+#
+#   lookup    city pair -> travel record and precomputed route artifact
+#   scale     lookup, people, round trip -> durations, emissions and axis ticks of the trip (core.Trip)
+#   geometry  city pair -> basemap, train route, stops, plane arc and city points for the route map, with the
+#             train route and plane arc simplified for the map's projection scale
+#   specs     chart strategy, trip, geometry -> duration chart, emission chart and route map specs
+#
+# Pages differ only in their chart strategy. Geometry is cached per city pair and finished responses per
+# (strategy, search), both for the whole process, so work done for one page serves every page that needs it.
+# Every stage call is timed, see stage_timings().
+#
+# The fan-out view (one city to all destinations) has its own stages: fanout_geometry (cached per origin) and
+# fanout_response, which fills the comparison table and the fan-out map from core.compare_from. Itineraries are
+# drawn by itinerary_response from core.plan_itinerary, meeting host rankings by meeting_response from
+# core.rank_hosts and the best plane-to-train swaps by swaps_response from core.best_train_swaps.
+
+# How a page draws a search: templates of the duration and emission charts, the Mode labels in the duration
+# data, and whether the route map shows the train stops and how opaque they are
+ChartStrategy = namedtuple('ChartStrategy', ['duration_chart', 'emissions_chart', 'duration_modes',
+                                             'show_stops', 'stops_opacity'])
+
+# Chart strategies by name; a new page variant registers its strategy here
+CHART_STRATEGIES = {
+    # Horizontal bars with labels (main app and ver1)
+    'horizontal_bars': ChartStrategy(duration_bars_template, emission_bars_template, ('🚂', '✈️'),
+                                     show_stops=True, stops_opacity=0.8),
+    # Vertical bars side by side, route map without stops (ver2)
+    'vertical_bars': ChartStrategy(duration_columns_template, emission_columns_template, ('🚂', '✈️'),
+                                   show_stops=False, stops_opacity=0.8),
+    # Duration bullet chart and emission circles (ver3)
+    'bullet_circles': ChartStrategy(duration_bullet_template, emission_circles_template, ('Train', 'Plane'),
+                                    show_stops=True, stops_opacity=0.7),
+}
+
+# Total time and number of calls per stage since the process started (or reset_stage_timings)
+_stage_timings = {}
+_stage_timings_lock = threading.Lock()
+
+
+# Decorator recording the wall time of every call in the stage timings
+def timed_stage(stage):
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                with _stage_timings_lock:
+                    calls, total = _stage_timings.get(stage, (0, 0.0))
+                    _stage_timings[stage] = (calls + 1, total + elapsed)
+        return wrapper
+    return decorator
+
+
+# {stage: {'calls', 'total_ms', 'mean_us'}} for every stage called so far
+def stage_timings():
+    with _stage_timings_lock:
+        return {
+            stage: {'calls': calls, 'total_ms': total * 1e3, 'mean_us': total / calls * 1e6}
+            for stage, (calls, total) in _stage_timings.items()
+        }
+
+
+def reset_stage_timings():
+    with _stage_timings_lock:
+        _stage_timings.clear()
+
+
+# Travel record and precomputed artifact of a city pair, None if the route is unknown
+RouteLookup = namedtuple('RouteLookup', ['travel_info', 'artifact'])
+
+# Route map datasets of a city pair, without the trip values shown in the tooltips
+RouteGeometry = namedtuple('RouteGeometry', ['basemap', 'center', 'scale', 'train_line', 'plane_arc',
+                                             'train_stops', 'from_city', 'to_city'])
+
+# Everything a search renders. transfers is None without a train route in the geometry store; the charts and
+# route map are None when there is no travel data for the pair. via is a core.ViaSuggestion scaled like the trip
+# when a two-leg train chain beats the direct train, otherwise None. connecting_flight is a core.ConnectingFlight
+# scaled like the trip when the pair has no direct flight, otherwise None; also None while the direct flights are
+# assumed (see core.flights), since the connection would then be made up.
+SearchResponse = namedtuple('SearchResponse', ['transfers', 'has_flight', 'duration_chart', 'emissions_chart',
+                                               'route_map', 'via', 'connecting_flight'])
+
+
+@timed_stage('lookup')
+def lookup(from_city, to_city):
+    travel_info = get_route(from_city, to_city)
+    if travel_info is None:
+        return None
+    # Transfers, projection, plane arc and axis ticks are precomputed per route
+    return RouteLookup(travel_info, route_artifact(from_city, to_city))
+
+
+@timed_stage('scale')
+def scale(route, num_people, round_trip):
+    return scale_trip(route.travel_info, route.artifact, num_people, round_trip)
+
+
+# Route map geometry of a city pair, shared by all chart strategies, searches and sessions
+@timed_stage('geometry')
+@lru_cached(maxsize=512, version=geometry_store_version)
+def geometry(from_city, to_city):
+    from_lon, from_lat = city_positions()[from_city]
+    to_lon, to_lat = city_positions()[to_city]
+
+    # Precomputed projection and plane arc of the pair; the arc runs from the first city of the route key.
+    # Both lines get the vertices the projection scale needs.
+    artifact = route_artifact(from_city, to_city)
+    arc = adaptive_arc(artifact.arc if from_city <= to_city else artifact.arc[::-1], artifact.scale)
+
+    geojson_lines_data = load_geojson_lines(from_city, to_city, line_level_for_scale(artifact.scale))
+    geojson_points_data = load_geojson_points(from_city, to_city)
+    return RouteGeometry(
+        basemap=clipped_basemap(artifact.center, artifact.scale, tuple(MAP_ROTATE)),
+        center=artifact.center,
+        scale=artifact.scale,
+        train_line=None if geojson_lines_data is None else geojson_lines_data['features'][0]['geometry'],
+        plane_arc={'type': 'LineString', 'coordinates': arc.tolist()},
+        train_stops=[] if geojson_points_data is None else geojson_points_data['features'],
+        from_city=[{'city': from_city, 'longitude': from_lon, 'latitude': from_lat}],
+        to_city=[{'city': to_city, 'longitude': to_lon, 'latitude': to_lat}],
+    )
+
+
+# Route map of a trip, filled into the cached route_map_template.
+# Without a flight the plane layer gets no features.
+def route_map_spec(strategy, from_city, to_city, trip, route_geometry):
+    # Train route with tooltip information in the feature properties
+    train_route = [] if route_geometry.train_line is None else [{
+        'type': 'Feature',
+        'geometry': route_geometry.train_line,
+        'properties': {
+            'route_type': f"Train from {from_city} to {to_city}",
+            'Train_CO2_kg': f"{trip.train_co2} kg",
+            'Duration_train': trip.train_duration
+        }
+    }]
+
+    # Arc line for the plane route if plane data are available
+    plane_route = [] if trip.plane_minutes is None else [{
+        'type': 'Feature',
+        'geometry': route_geometry.plane_arc,
+        'properties': {
+            'route_type': f"Plane from {from_city} to {to_city}",
+            'Plane_CO2_kg': f"{trip.plane_co2} kg",
+            'Duration_plane_total': trip.plane_duration
+        }
+    }]
+
+    datasets = {
+        'basemap': route_geometry.basemap,
+        'plane_route': plane_route,
+        'train_route': train_route,
+        'from_city': route_geometry.from_city,
+        'to_city': route_geometry.to_city,
+    }
+    if strategy.show_stops:
+        datasets['train_stops'] = route_geometry.train_stops
+
+    return fill_template(route_map_template(strategy.show_stops, strategy.stops_opacity), params={
+        'map_scale': route_geometry.scale,
+        'map_center': route_geometry.center,
+        'train_stroke_width': float(trip.train_co2) / 15,
+        'plane_stroke_width': float(trip.plane_co2) / 15,
+    }, datasets=datasets)
+
+
+# Duration chart, emission chart and route map of a trip drawn with a chart strategy
+@timed_stage('specs')
+def specs(strategy, from_city, to_city, trip, route_geometry):
+    train_mode, plane_mode = strategy.duration_modes
+    duration_data = [
+        {'Mode': train_mode, 'Duration': trip.train_duration, 'Duration_minutes': trip.train_minutes},
+        {'Mode': plane_mode, 'Duration': trip.plane_duration or "N/A",
+         'Duration_minutes': trip.plane_minutes if trip.plane_minutes is not None else 0},
+    ]
+    emissions_data = [{'Mode': '🚂', 'CO2_kg': trip.train_co2}, {'Mode': '✈️', 'CO2_kg': trip.plane_co2}]
+    return (
+        fill_template(strategy.duration_chart(), params={'tick_values': trip.tick_values},
+                      datasets={'duration': duration_data}),
+        fill_template(strategy.emissions_chart(), datasets={'emissions': emissions_data}),
+        route_map_spec(strategy, from_city, to_city, trip, route_geometry),
+    )
+
+
+# Number of finished search responses kept for all sessions (406 pairs x 10 people x 2 trip types per strategy)
+SEARCH_CACHE_SIZE = 2048
+
+
+# Finished charts, route map and metrics for a search drawn with one of the CHART_STRATEGIES.
+# Responses are shared between sessions and pages with the same strategy, so a repeated search skips all
+# stages. Rebuilding the geometry store clears the cache.
+@timed_stage('search')
+@lru_cached(maxsize=SEARCH_CACHE_SIZE, version=geometry_store_version)
+def search_response(strategy_name, from_city, to_city, num_people, round_trip):
+    strategy = CHART_STRATEGIES[strategy_name]
+
+    route = lookup(from_city, to_city)
+    if route is None:
+        # Calculate the number of transfers based on points in GeoJSON data
+        geojson_data_points = load_geojson_points(from_city, to_city)
+        transfers = None if geojson_data_points is None else calculate_transfers(geojson_data_points)
+        return SearchResponse(transfers, False, None, None, None, None, None)
+
+    trip = scale(route, num_people, round_trip)
+    duration_chart, emissions_chart, route_map = specs(strategy, from_city, to_city, trip,
+                                                       geometry(from_city, to_city))
+    return SearchResponse(
+        transfers=route.artifact.transfers,
+        has_flight=trip.plane_minutes is not None,
+        duration_chart=duration_chart,
+        emissions_chart=emissions_chart,
+        route_map=route_map,
+        via=scaled_via(from_city, to_city, num_people, round_trip),
+        connecting_flight=scaled_connecting_flight(from_city, to_city, num_people, round_trip),
+    )
+
+
+# Faster two-leg train chain of a pair, scaled for the number of people and round trip like scale_trip
+def scaled_via(from_city, to_city, num_people, round_trip):
+    via = via_suggestion(from_city, to_city)
+    if via is None:
+        return None
+    factor = 2 if round_trip else 1
+    return via._replace(minutes=via.minutes * factor, co2=float(round_co2(via.co2)) * num_people * factor,
+                        direct_minutes=via.direct_minutes * factor)
+
+
+# Connection over hubs of a pair without a direct flight, scaled for the number of people and round trip like
+# scale_trip. None while the direct-connection table is seeded with the hub rule instead of schedule data
+def scaled_connecting_flight(from_city, to_city, num_people, round_trip):
+    flight = connecting_flight(from_city, to_city)
+    if flight is None or flight.assumed:
+        return None
+    factor = 2 if round_trip else 1
+    co2, direct_co2 = round_co2([flight.co2, flight.direct_co2]) * num_people * factor
+    return flight._replace(minutes=flight.minutes * factor, co2=float(co2),
+                           direct_minutes=flight.direct_minutes * factor, direct_co2=float(direct_co2))
+
+
+# Fan-out map geometry of an origin: basemap, projection, train lines and plane arcs of all destinations and the
+# city points, shared by all searches and sessions.
+FanoutGeometry = namedtuple('FanoutGeometry', ['basemap', 'center', 'scale', 'routes', 'from_city', 'destinations'])
+
+# Comparison table (one row per destination, see core.compare_from), fan-out map of a city and the time vs. CO2
+# scatter of all its trips with their Pareto frontier (see core.origin_frontier)
+FanoutResponse = namedtuple('FanoutResponse', ['table', 'route_map', 'frontier_chart'])
+
+# Number of finished fan-out responses kept for all sessions (29 origins x 10 people x 2 trip types)
+FANOUT_CACHE_SIZE = 1024
+
+# Fan-out route strokes are as wide as the CO2 per km travelled (per person one way), since the length of a line
+# already shows the distance: FANOUT_STROKE_G_PER_KM g per km per pixel on top of a 0.5 px hairline, up to
+# FANOUT_MAX_STROKE. About 1 px for trains and 3 px for planes with the stored emissions.
+FANOUT_STROKE_G_PER_KM = 50
+FANOUT_MAX_STROKE = 8
+
+
+# Stroke width of a fan-out route emitting co2_kg over km for a number of person trips
+def fanout_stroke_width(co2_kg, km, person_trips):
+    return round(min(0.5 + co2_kg * 1000 / (km * person_trips) / FANOUT_STROKE_G_PER_KM, FANOUT_MAX_STROKE), 2)
+
+
+@timed_stage('fanout_geometry')
+@lru_cached(maxsize=64, version=geometry_store_version)
+def fanout_geometry(from_city):
+    positions = origin_positions(from_city)
+    projection_params = get_projection_params([{'lon': lon, 'lat': lat} for lon, lat in positions.values()])
+    from_lon, from_lat = positions[from_city]
+    return FanoutGeometry(
+        basemap=clipped_basemap(projection_params['center'], projection_params['scale'], tuple(MAP_ROTATE)),
+        center=projection_params['center'],
+        scale=projection_params['scale'],
+        routes=origin_geometry(from_city, projection_params['scale']),
+        from_city=[{'city': from_city, 'longitude': from_lon, 'latitude': from_lat}],
+        destinations={city: position for city, position in positions.items() if city != from_city},
+    )
+
+
+# Train vs. plane comparison of every destination from a city as a table, and all routes on one map, with the
+# stored TravelCO2 emissions or those of core.EmissionFactors.
+@timed_stage('fanout')
+@lru_cached(maxsize=FANOUT_CACHE_SIZE, version=geometry_store_version)
+def fanout_response(from_city, num_people, round_trip, factors=None):
+    comparison = compare_from(from_city, num_people, round_trip, factors)
+    fanout = fanout_geometry(from_city)
+
+    person_trips = num_people * (2 if round_trip else 1)
+
+    train_routes, plane_routes, destinations = [], [], []
+    for row in comparison.itertuples(index=False):
+        train_line, plane_arc = fanout.routes[row.To]
+        has_flight = not math.isnan(row.Plane_minutes)
+        if train_line is not None:
+            train_routes.append({
+                'type': 'Feature',
+                'geometry': {'type': 'LineString', 'coordinates': train_line},
+                'properties': {'route_type': f"Train from {from_city} to {row.To}",
+                               'CO2_kg': f"{row.Train_CO2_kg:.1f} kg", 'Duration': row.Train_duration,
+                               'Distance': f"{row.Train_km:,.0f} km",
+                               'stroke_width': fanout_stroke_width(row.Train_CO2_kg, row.Train_km, person_trips)},
+            })
+        if has_flight:
+            plane_routes.append({
+                'type': 'Feature',
+                'geometry': {'type': 'LineString', 'coordinates': plane_arc},
+                'properties': {'route_type': f"Plane from {from_city} to {row.To}",
+                               'CO2_kg': f"{row.Plane_CO2_kg:.1f} kg", 'Duration': row.Plane_duration,
+                               'Distance': f"{row.Distance_km:,.0f} km",
+                               'stroke_width': fanout_stroke_width(row.Plane_CO2_kg, row.Distance_km, person_trips)},
+            })
+        if row.To in fanout.destinations:
+            lon, lat = fanout.destinations[row.To]
+            destinations.append({
+                'city': row.To, 'longitude': lon, 'latitude': lat,
+                'Train': row.Train_duration, 'Plane': row.Plane_duration if has_flight else 'N/A',
+                'Train_CO2_kg': row.Train_CO2_kg, 'Plane_CO2_kg': row.Plane_CO2_kg if has_flight else None,
+            })
+
+    route_map = fill_template(fanout_map_template(), params={
+        'map_scale': fanout.scale,
+        'map_center': fanout.center,
+    }, datasets={
+        'basemap': fanout.basemap,
+        'plane_routes': plane_routes,
+        'train_routes': train_routes,
+        'destinations': destinations,
+        'from_city': fanout.from_city,
+    })
+
+    # Durations in hours so that the table sorts by them; plane columns are empty without a flight
+    table = comparison[['To']].assign(**{
+        'Train (h)': comparison['Train_minutes'] / 60,
+        'Plane (h)': comparison['Plane_minutes'] / 60,
+        'Train CO2 (kg)': comparison['Train_CO2_kg'],
+        'Plane CO2 (kg)': comparison['Plane_CO2_kg'],
+        'CO2 saved (kg)': comparison['CO2_saved_kg'],
+        'Transfers': comparison['Transfers'],
+        'Train (km)': comparison['Train_km'],
+    })
+
+    options = origin_frontier(from_city, num_people, round_trip, factors)
+    frontier_chart = fill_template(frontier_scatter_template(), datasets={'options': [
+        {'To': row.To, 'Mode': row.Mode, 'Hours': row.Minutes / 60, 'Duration': row.Duration, 'CO2_kg': row.CO2_kg,
+         'Pareto': bool(row.Pareto)} for row in options.itertuples(index=False)
+    ]})
+    return FanoutResponse(table, route_map, frontier_chart)
+
+
+# Evaluated itinerary (core.ItineraryPlan), its legs as a table and the itinerary map
+ItineraryResponse = namedtuple('ItineraryResponse', ['plan', 'table', 'route_map'])
+
+ITINERARY_CACHE_SIZE = 256
+
+
+# Itinerary through stops (a tuple of city names) with the suggested mode per leg, drawn on one map.
+@timed_stage('itinerary')
+@lru_cached(maxsize=ITINERARY_CACHE_SIZE, version=geometry_store_version)
+def itinerary_response(stops, num_people, max_extra_minutes):
+    plan = plan_itinerary(stops, num_people, max_extra_minutes)
+    positions = city_positions()
+    train_durations, plane_durations = minutes_to_strs(plan.train_minutes), minutes_to_strs(plan.plane_minutes)
+
+    # A stop visited twice (e.g. the start of a round trip) gets all its numbers
+    labels = {}
+    for number, city in enumerate(stops, start=1):
+        labels.setdefault(city, []).append(str(number))
+    stop_rows = [{'city': city, 'longitude': positions[city][0], 'latitude': positions[city][1],
+                  'label': ', '.join(numbers)} for city, numbers in labels.items()]
+    projection_params = get_projection_params([{'lon': row['longitude'], 'lat': row['latitude']}
+                                               for row in stop_rows])
+
+    legs = []
+    for i, (from_city, to_city) in enumerate(zip(stops, stops[1:])):
+        train_line, plane_arc = origin_geometry(from_city, projection_params['scale'])[to_city]
+        # Legs without a train route are drawn as a straight line
+        if plan.use_plane[i] or train_line is None:
+            coordinates = plane_arc if plan.use_plane[i] else [positions[from_city], positions[to_city]]
+        else:
+            coordinates = train_line
+        mode = 'Plane' if plan.use_plane[i] else 'Train'
+        legs.append({
+            'type': 'Feature',
+            'geometry': {'type': 'LineString', 'coordinates': coordinates},
+            'properties': {
+                'mode': mode,
+                'route_type': f"{mode} from {from_city} to {to_city}",
+                'CO2_kg': f"{(plan.plane_co2 if plan.use_plane[i] else plan.train_co2)[i]:.1f} kg",
+                'Duration': (plane_durations if plan.use_plane[i] else train_durations)[i],
+            },
+        })
+
+    route_map = fill_template(itinerary_map_template(), params={
+        'map_scale': projection_params['scale'],
+        'map_center': projection_params['center'],
+    }, datasets={
+        'basemap': clipped_basemap(projection_params['center'], projection_params['scale'], tuple(MAP_ROTATE)),
+        'legs': legs,
+        'stops': stop_rows,
+    })
+
+    table = [{
+        'Leg': f"{from_city} → {to_city}",
+        'Train': train_durations[i],
+        'Plane': plane_durations[i] or 'N/A',
+        'Train CO2 (kg)': round(float(plan.train_co2[i]), 1),
+        'Plane CO2 (kg)': None if math.isnan(plan.plane_co2[i]) else round(float(plan.plane_co2[i]), 1),
+        'Suggested': '✈️' if plan.use_plane[i] else '🚂',
+    } for i, (from_city, to_city) in enumerate(zip(stops, stops[1:]))]
+    return ItineraryResponse(plan, table, route_map)
+
+
+# Ranking of all host cities (core.rank_hosts) as a table, and the trips to the best host on one map
+MeetingResponse = namedtuple('MeetingResponse', ['ranking', 'table', 'route_map'])
+
+MEETING_CACHE_SIZE = 256
+
+
+# Meeting hosts ranked for origins (a tuple of (city, people) pairs) by one of core.RANKING_METRICS, with the
+# train trips of every origin to the best host drawn on one map.
+@timed_stage('meeting')
+@lru_cached(maxsize=MEETING_CACHE_SIZE, version=geometry_store_version)
+def meeting_response(origins, round_trip, sort_by):
+    ranking = rank_hosts(dict(origins), round_trip, sort_by)
+    host = ranking['Host'].iloc[0]
+    positions = city_positions()
+    factor = 2 if round_trip else 1
+    # Trips of everyone who travels, scaled like scale_trip
+    travelling = [(city, people) for city, people in origins if city != host]
+    cities = [city for city, _ in travelling]
+    train_durations = minutes_to_strs(od_values('train_minutes', cities, [host] * len(cities)) * factor)
+    train_co2 = round_co2(od_values('train_co2', cities, [host] * len(cities)))
+
+    # Origins are labeled with their number of people, the host with a star
+    group = dict(origins)
+    stop_rows = [{'city': city, 'longitude': positions[city][0], 'latitude': positions[city][1],
+                  'label': '★' if city == host else str(group[city])} for city in dict.fromkeys([*group, host])]
+    projection_params = get_projection_params([{'lon': row['longitude'], 'lat': row['latitude']}
+                                               for row in stop_rows])
+
+    legs = []
+    for i, (city, people) in enumerate(travelling):
+        train_line, _ = origin_geometry(host, projection_params['scale'])[city]
+        legs.append({
+            'type': 'Feature',
+            # The host's line reversed so that it runs from the origin, a straight line without a train route
+            'geometry': {'type': 'LineString',
+                         'coordinates': train_line[::-1] if train_line is not None else [positions[city],
+                                                                                         positions[host]]},
+            'properties': {
+                'mode': 'Train',
+                'route_type': f"Train from {city} to {host} ({people} {'person' if people == 1 else 'people'})",
+                'CO2_kg': f"{train_co2[i] * people * factor:.1f} kg",
+                'Duration': train_durations[i],
+            },
+        })
+
+    route_map = fill_template(itinerary_map_template(), params={
+        'map_scale': projection_params['scale'],
+        'map_center': projection_params['center'],
+    }, datasets={
+        'basemap': clipped_basemap(projection_params['center'], projection_params['scale'], tuple(MAP_ROTATE)),
+        'legs': legs,
+        'stops': stop_rows,
+    })
+
+    # Durations in hours so that the table sorts by them
+    table = ranking[['Host']].assign(**{
+        'Train CO2 (kg)': ranking['Train_CO2_kg'],
+        'Plane CO2 (kg)': ranking['Plane_CO2_kg'],
+        'CO2 saved (kg)': ranking['CO2_saved_kg'],
+        'Total train (h)': ranking['Total_train_minutes'] / 60,
+        'Longest train (h)': ranking['Max_train_minutes'] / 60,
+    })
+    return MeetingResponse(ranking, table, route_map)
+
+
+SWAPS_CACHE_SIZE = 256
+
+
+# Table of the k routes where switching from plane to train saves the most CO2 per added hour (see
+# core.best_train_swaps), with durations in hours so that it sorts by them.
+@timed_stage('swaps')
+@lru_cached(maxsize=SWAPS_CACHE_SIZE, version=geometry_store_version)
+def swaps_response(k, from_city, max_train_minutes, num_people):
+    swaps = best_train_swaps(k, from_city, max_train_minutes, num_people)
+    return swaps[['From', 'To']].assign(**{
+        'Train (h)': swaps['Train_minutes'] / 60,
+        'Plane (h)': swaps['Plane_minutes'] / 60,
+        'Extra (h)': swaps['Extra_minutes'] / 60,
+        'CO2 saved (kg)': swaps['CO2_saved_kg'],
+        'kg saved per extra hour': swaps['Saved_per_hour_kg'],
+    })
@@ -0,0 +1,80 @@
+import streamlit as st
+
+from core import cities, EmissionFactors, TRAVELCO2_FACTORS, SEAT_CLASSES, emission_summary, emission_distances
+from engine import fanout_response
+
+# Set the app layout to "wide" mode
+st.set_page_config(layout="wide")
+
+# Per-route distances, computed once per process at startup so that factor changes only multiply them
+emission_distances()
+
+# Custom CSS to hide the sidebar
+st.markdown("""
+    <style>
+        [data-testid="stSidebar"] {
+            display: none;
+        }
+    </style>
+""", unsafe_allow_html=True)
+
+# Custom padding
+st.markdown("""
+    <style>
+    .block-container {padding-top: 0 !important;}
+    </style>
+    """, unsafe_allow_html=True)
+
+st.title('What If: Emission Factors')
+
+search, maps, charts = st.columns([0.28, 0.4, 0.32])
+
+with search:
+    train_g = st.slider('Train (g CO2e per passenger-km)', min_value=0, max_value=100,
+                        value=int(TRAVELCO2_FACTORS.train_g_per_pkm),
+                        help="Depends on the grid mix of electric trains, e.g. low for hydro or nuclear power")
+    plane_g = st.slider('Plane (g CO2e per passenger-km)', min_value=50, max_value=300,
+                        value=int(TRAVELCO2_FACTORS.plane_g_per_pkm))
+    radiative_forcing = st.slider('Radiative forcing multiplier', min_value=1.0, max_value=3.0,
+                                  value=TRAVELCO2_FACTORS.radiative_forcing, step=0.1,
+                                  help="Non-CO2 effects of flying at altitude, 1 counts CO2 only")
+    seat_class = st.selectbox('Seat class', list(SEAT_CLASSES))
+    factors = EmissionFactors(float(train_g), float(plane_g), radiative_forcing, SEAT_CLASSES[seat_class])
+
+    from_city = st.selectbox('From', cities(), index=None, placeholder="Departure city")
+    cl1, cl2 = st.columns([0.48, 0.52], gap='small', vertical_alignment="bottom")
+    with cl1:
+        num_people = st.number_input('People:', min_value=1, max_value=10, value=1)
+    with cl2:
+        round_trip = st.toggle('Round Trip')
+
+    # All routes, recomputed from the cached distances
+    summary = emission_summary(factors)
+    st.metric('Routes where the train emits less', f"{summary.train_cleaner} of {summary.routes}")
+    st.metric('CO2 saved by taking the train on all of them (kg per person)', f"{summary.co2_saved_kg:,.0f}")
+
+# Finished table, map and frontier of all destinations for the factors, cached across sessions
+fanout = fanout_response(from_city, num_people, round_trip, factors) if from_city else None
+
+with charts:
+    if fanout is not None:
+        st.dataframe(fanout.table, hide_index=True, height=400, column_config={
+            'Train (h)': st.column_config.NumberColumn(format='%.1f'),
+            'Plane (h)': st.column_config.NumberColumn(format='%.1f'),
+            'Train CO2 (kg)': st.column_config.NumberColumn(format='%.1f'),
+            'Plane CO2 (kg)': st.column_config.NumberColumn(format='%.1f'),
+            'CO2 saved (kg)': st.column_config.NumberColumn(format='%.1f'),
+            'Train (km)': st.column_config.NumberColumn(format='%.0f'),
+        })
+        st.vega_lite_chart(fanout.frontier_chart, use_container_width=True)
+
+with maps:
+    if fanout is not None:
+        st.vega_lite_chart(fanout.route_map, use_container_width=True)
+    else:
+        st.info('Select a "From" city to compare all its destinations with these factors.')
+
+st.markdown(f"<p style='font-family: monospace; font-size: small;'>CO2 is the distance of every trip times the "
+            f"factor. The distances are the ones of the TravelCO2 estimates ({TRAVELCO2_FACTORS.train_g_per_pkm:.0f} "
+            f"g per passenger-km by train, {TRAVELCO2_FACTORS.plane_g_per_pkm:.0f} g by plane in economy); the "
+            f"plane factor is multiplied by radiative forcing and the seat class.</p>", unsafe_allow_html=True)
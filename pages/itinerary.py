@@ -0,0 +1,78 @@
+import streamlit as st
+
+from core import cities, best_stop_order, DEFAULT_MAX_EXTRA_MINUTES
+from engine import itinerary_response
+
+# Set the app layout to "wide" mode
+st.set_page_config(layout="wide")
+
+# Custom CSS to hide the sidebar
+st.markdown("""
+    <style>
+        [data-testid="stSidebar"] {
+            display: none;
+        }
+    </style>
+""", unsafe_allow_html=True)
+
+# Custom padding
+st.markdown("""
+    <style>
+    .block-container {padding-top: 0 !important;}
+    </style>
+    """, unsafe_allow_html=True)
+
+st.title('Multi-City Itinerary')
+
+search, maps, charts = st.columns([0.28, 0.5, 0.33])
+
+with search:
+    # Stops in the order they were picked
+    stops = st.multiselect('Stops', cities(), placeholder="Cities in travel order")
+    cl1, cl2 = st.columns([0.48, 0.52], gap='small', vertical_alignment="bottom")
+    with cl1:
+        num_people = st.number_input('People:', min_value=1, max_value=10, value=1)
+    with cl2:
+        return_to_start = st.toggle('Return to start')
+    max_extra_hours = st.slider('Extra hours by train accepted per leg', min_value=0, max_value=24,
+                                value=DEFAULT_MAX_EXTRA_MINUTES // 60,
+                                help="Legs where the train takes longer than the plane by more than this are "
+                                     "suggested by plane")
+    best_order = st.toggle('Best order', help="Reorder the stops between the first and the last one (all but the "
+                                              "first on a round trip) for the least CO2")
+
+    # Button to trigger search
+    plan_clicked = st.button('Plan')
+
+    if plan_clicked and len(stops) >= 2:
+        # The return leg first, so that a round trip is reordered as a closed tour with every stop in between
+        if return_to_start:
+            stops = stops + stops[:1]
+        if best_order:
+            stops = best_stop_order(stops, num_people, max_extra_hours * 60)
+        # Finished table and map for the itinerary, cached across sessions
+        response = itinerary_response(tuple(stops), num_people, max_extra_hours * 60)
+
+        st.metric(label="Suggested mix:", value=f"{response.plan.mixed_total.co2:.0f} kg CO2",
+                  delta=f"{response.plan.mixed_total.co2 - response.plan.plane_total.co2:.0f} kg vs. plane",
+                  delta_color='inverse')
+        st.metric(label="All by train:", value=f"{response.plan.train_total.co2:.0f} kg CO2")
+        st.metric(label="By plane where possible:", value=f"{response.plan.plane_total.co2:.0f} kg CO2")
+    else:
+        response = None
+        if plan_clicked:
+            st.warning('Please select at least two stops.')
+
+with charts:
+    if response is not None:
+        st.markdown(f"**{' → '.join(response.plan.stops)}**")
+        st.dataframe(response.table, hide_index=True)
+        hours, minutes = divmod(int(response.plan.mixed_total.minutes), 60)
+        st.markdown(f"<p style='font-family: monospace; font-size: small;'>Suggested mix travel time: "
+                    f"{hours}:{minutes:02}. Plane durations include +3h per leg for getting to/from the airport, "
+                    f"security check and boarding</p>", unsafe_allow_html=True)
+
+with maps:
+    # All legs on one map, drawn with the suggested mode
+    if response is not None:
+        st.vega_lite_chart(response.route_map, use_container_width=True)
@@ -0,0 +1,75 @@
+import streamlit as st
+
+from core import cities
+from engine import meeting_response
+
+# Set the app layout to "wide" mode
+st.set_page_config(layout="wide")
+
+# Custom CSS to hide the sidebar
+st.markdown("""
+    <style>
+        [data-testid="stSidebar"] {
+            display: none;
+        }
+    </style>
+""", unsafe_allow_html=True)
+
+# Custom padding
+st.markdown("""
+    <style>
+    .block-container {padding-top: 0 !important;}
+    </style>
+    """, unsafe_allow_html=True)
+
+st.title('Where to Meet')
+
+# Ranking options: label -> core.RANKING_METRICS column
+RANK_BY = {
+    'Train CO2': 'Train_CO2_kg',
+    'Total travel time': 'Total_train_minutes',
+    'Longest trip': 'Max_train_minutes',
+    'CO2 saved vs. plane': 'CO2_saved_kg',
+}
+
+search, maps, charts = st.columns([0.28, 0.5, 0.33])
+
+with search:
+    origins = st.multiselect('Travelling from', cities(), placeholder="Cities of the participants")
+    # Number of people per origin city
+    people = {city: st.number_input(f'People from {city}:', min_value=1, max_value=100, value=1, key=f'people_{city}')
+              for city in origins}
+    round_trip = st.toggle('Round trip', value=True)
+    rank_by = st.selectbox('Rank by', list(RANK_BY))
+
+    # Button to trigger search
+    rank_clicked = st.button('Find host city')
+
+    if rank_clicked and origins:
+        # Finished ranking and map, cached across sessions
+        response = meeting_response(tuple(people.items()), round_trip, RANK_BY[rank_by])
+        best = response.ranking.iloc[0]
+        st.metric(label="Best host:", value=best['Host'])
+        st.metric(label="Train CO2:", value=f"{best['Train_CO2_kg']:.0f} kg",
+                  delta=f"{-best['CO2_saved_kg']:.0f} kg vs. plane", delta_color='inverse')
+        st.metric(label="Longest trip by train:", value=best['Max_train_duration'])
+    else:
+        response = None
+        if rank_clicked:
+            st.warning('Please select at least one city.')
+
+with charts:
+    # All host cities, sortable by every column
+    if response is not None:
+        st.dataframe(response.table, hide_index=True, height=500, column_config={
+            'Train CO2 (kg)': st.column_config.NumberColumn(format='%.1f'),
+            'Plane CO2 (kg)': st.column_config.NumberColumn(format='%.1f'),
+            'CO2 saved (kg)': st.column_config.NumberColumn(format='%.1f'),
+            'Total train (h)': st.column_config.NumberColumn(format='%.1f'),
+            'Longest train (h)': st.column_config.NumberColumn(format='%.1f'),
+        })
+
+with maps:
+    # Train trips of everyone to the best host
+    if response is not None:
+        st.vega_lite_chart(response.route_map, use_container_width=True)
@@ -0,0 +1,58 @@
+import streamlit as st
+
+from core import cities, MIN_EXTRA_HOURS
+from engine import swaps_response
+
+# Set the app layout to "wide" mode
+st.set_page_config(layout="wide")
+
+# Custom CSS to hide the sidebar
+st.markdown("""
+    <style>
+        [data-testid="stSidebar"] {
+            display: none;
+        }
+    </style>
+""", unsafe_allow_html=True)
+
+# Custom padding
+st.markdown("""
+    <style>
+    .block-container {padding-top: 0 !important;}
+    </style>
+    """, unsafe_allow_html=True)
+
+st.title('Best Train Swaps')
+
+search, charts = st.columns([0.28, 0.72])
+
+with search:
+    from_city = st.selectbox('From', cities(), index=None, placeholder="All cities")
+    max_train_hours = st.slider('Longest train trip (h)', min_value=1, max_value=48, value=48)
+    cl1, cl2 = st.columns([0.48, 0.52], gap='small')
+    with cl1:
+        num_people = st.number_input('People:', min_value=1, max_value=10, value=1)
+    with cl2:
+        k = st.number_input('Routes:', min_value=1, max_value=100, value=10)
+
+    # Button to trigger search
+    rank_clicked = st.button('Rank')
+
+with charts:
+    if rank_clicked:
+        # Finished table, cached across sessions
+        table = swaps_response(k, from_city, max_train_hours * 60, num_people)
+        if len(table):
+            st.dataframe(table, hide_index=True, column_config={
+                'Train (h)': st.column_config.NumberColumn(format='%.1f'),
+                'Plane (h)': st.column_config.NumberColumn(format='%.1f'),
+                'Extra (h)': st.column_config.NumberColumn(format='%.1f'),
+                'CO2 saved (kg)': st.column_config.NumberColumn(format='%.1f'),
+                'kg saved per extra hour': st.column_config.NumberColumn(format='%.1f'),
+            })
+        else:
+            st.warning('No route saves CO2 by train with these filters.')
+        st.markdown(f"<p style='font-family: monospace; font-size: small;'>Routes are ranked by the CO2 saved by "
+                    f"taking the train instead of the plane per hour the train takes longer, counting at least "
+                    f"{MIN_EXTRA_HOURS * 60:.0f} minutes. Plane durations include +3h for getting to/from the "
+                    f"airport, security check and boarding</p>", unsafe_allow_html=True)
@@ -1,10 +1,8 @@
 import streamlit as st
-import altair as alt
-import pandas as pd
 
-from utils import cities, trip_data, coordinates_data, normalize_city_pair, double_duration, \
-    create_base_map, duration_to_str, duration_to_minutes, calculate_tick_values, get_projection_params, load_geojson_lines, \
-    load_geojson_points, generate_curved_arc, calculate_transfers
+from core import cities
+from engine import search_response
+from utils import create_base_map
 
 # Set Streamlit page configuration to wide mode
 st.set_page_config(layout="wide")
@@ -42,10 +40,10 @@ Travel duration and carbon emissions here are estimates based on route averages
 search, maps, charts = st.columns([0.28, 0.5, 0.33])
 
 with search:
-    from_city = st.selectbox('From', cities, index=None, placeholder="Departure city")
+    from_city = st.selectbox('From', cities(), index=None, placeholder="Departure city")
 
     # Dynamically update the 'To' options based on the selected 'From' city
-    to_city_options = [city for city in cities if city != from_city]
+    to_city_options = [city for city in cities() if city != from_city]
     to_city = st.selectbox('To', to_city_options, index=None, placeholder="Destination city")
     cl1, cl2 = st.columns([0.48, 0.52], gap = 'small', vertical_alignment="bottom")
     with cl1:
@@ -56,93 +54,20 @@ with search:
     # Button to trigger search
     search_clicked = st.button('Search')
 
+    # Finished charts and map for the search, cached across sessions
+    response = search_response('horizontal_bars', from_city, to_city, num_people, round_trip) \
+        if search_clicked and from_city and to_city else None
+
 with charts:
     #Travel Data
     if search_clicked and from_city and to_city:
-        route = normalize_city_pair(from_city, to_city)
-        travel_details = trip_data[trip_data['route'] == route]
-        if not travel_details.empty:
-            travel_info = travel_details.iloc[0]
+        if response.duration_chart is not None:
 
-            # Check if plane duration is available
-            if pd.isna(travel_info['Duration_plane_total']) or pd.isna(travel_info['Plane_CO2_kg']):
+            if not response.has_flight:
                 # Show a warning message
                 st.write("Cities are too close, no flights available.")
-                # Set default values for the chart if plane data is not available
-                plane_duration = "N/A"
-                plane_co2 = 0
-            else:
-                plane_duration = travel_info['Duration_plane_total']
-                plane_co2 = round(travel_info['Plane_CO2_kg'], 1)
-
-            train_duration = travel_info['Duration_train']
-            train_co2 = round(travel_info['Train_CO2_kg'], 1)
-
-            # Adjust CO2 emissions based on the number of people
-            train_co2 *= num_people
-            plane_co2 *= num_people
-
-            # Double the values if round trip is selected
-            if round_trip:
-                train_duration = double_duration(train_duration)
-                train_co2 *= 2
-                if plane_duration != "N/A":
-                    plane_duration = double_duration(plane_duration)
-                plane_co2 *= 2
-
-            # Prepare the data for the duration bar chart
-            duration_data = pd.DataFrame({
-                'Mode': ['🚂', '✈️'],
-                'Duration': [
-                    duration_to_str(train_duration),
-                    plane_duration
-                ],
-                'Duration_minutes': [
-                    duration_to_minutes(train_duration),
-                    duration_to_minutes(plane_duration) if plane_duration != "N/A" else 0
-                ]
-            })
-
-            # Calculate dynamic tick values
-            max_duration = duration_data['Duration_minutes'].max()
-            tick_values = calculate_tick_values(0, max_duration)
-
-            #Label expression for the x-axis of duration chart
-            labelExpr = '''
-                (datum.value % 60 == 0) ?
-                    format(datum.value / 60, "d") : 
-                    format(floor(datum.value / 60), "d") + ".5"
-            '''
 
-            colors = ['indianred', 'forestgreen']
-
-            # Create the duration bar chart
-            duration_chart = alt.Chart(duration_data).mark_bar().encode(
-                y=alt.Y('Mode', title=None, axis=alt.Axis(labelFontSize=13)),
-                x=alt.X('Duration_minutes:Q', title=None,
-                        axis=alt.Axis(values=tick_values, labelExpr=labelExpr)),
-                tooltip=[alt.Tooltip('Duration', title='Duration'), alt.Tooltip('Mode', title='Mode')],
-                color=alt.Color('Mode', legend=None).scale(range=colors),
-            ).properties(
-                title='Travel Duration'
-            )
-
-            # Add data labels to the duration chart
-            duration_labels = alt.Chart(duration_data).mark_text(
-                align='right',
-                baseline='middle',
-                color='black',
-                dx= -5
-            ).encode(
-                y=alt.Y('Mode', title=None),
-                x=alt.X('Duration_minutes:Q'),
-                text=alt.Text('Duration'),
-                tooltip = alt.value('')
-            )
-
-            # Combine bar chart with labels
-            duration_combined_chart = duration_chart + duration_labels
-            st.altair_chart(duration_combined_chart, use_container_width=True)
+            st.vega_lite_chart(response.duration_chart, use_container_width=True)
 
             # Add note below chart
             note = "<p style='font-family: monospace; font-size: small;'>Plane duration includes +3h for getting to/from the airport, security check and boarding</p>"
@@ -152,41 +77,7 @@ with charts:
             else:
                 st.markdown(note, unsafe_allow_html=True)
 
-            # Create emissions bar chart
-            emissions_data = pd.DataFrame({
-                'Mode': ['🚂', '✈️'],
-                'CO2_kg': [train_co2, plane_co2]
-            })
-
-            emissions_chart = alt.Chart(emissions_data).mark_bar().encode(
-                x=alt.X('CO2_kg', title=None),
-                y=alt.Y('Mode', title=None, axis=alt.Axis(labelFontSize=13)),
-                color=alt.Color('Mode', legend=None).scale(
-                    range=colors
-                )
-            ).properties(
-                title='Carbon Emissions'
-            )
-
-            # Add data labels to the emissions chart
-            emissions_labels = alt.Chart(emissions_data).mark_text(
-                align='right',
-                baseline='middle',
-                color='black',
-                dx= -5
-            ).encode(
-                y=alt.Y('Mode', title=None),
-                x=alt.X('CO2_kg'),
-                tooltip = alt.value('')
-            ).transform_calculate(
-                label="round(datum.CO2_kg) + ' kg'" # Concatenate "kg" to the CO2 value
-            ).encode(
-                text=alt.Text('label:N')  # Use the calculated label field
-            )
-
-            # Combine bar chart with labels
-            emissions_combined_chart = emissions_chart + emissions_labels
-            st.altair_chart(emissions_combined_chart, use_container_width=True)
+            st.vega_lite_chart(response.emissions_chart, use_container_width=True)
         else:
             st.write(f"No travel data available for the route from {from_city} to {to_city}.")
     elif search_clicked:
@@ -196,169 +87,16 @@ with maps:
     # If search button is not clicked, display the base map with all cities
     if not search_clicked:
         map_with_all_cities = create_base_map(from_city, to_city)
-        st.altair_chart(map_with_all_cities, use_container_width=True)
+        st.vega_lite_chart(map_with_all_cities, use_container_width=True)
 
     # If search button is clicked and both cities are selected, highlight the "From" and "To" cities
     if search_clicked and from_city and to_city:
-        # Filter the DataFrame for the selected cities
-        filtered_points = coordinates_data[coordinates_data['city'].isin([from_city, to_city])]
-
-        from_city_data = filtered_points[filtered_points['city'] == from_city].iloc[0]
-        to_city_data = filtered_points[filtered_points['city'] == to_city].iloc[0]
-
-        # Add Plane_CO2_kg and Train_CO2_kg to to_city_data for the tooltip
-        to_city_data['Plane_CO2_kg'] = plane_co2
-        to_city_data['Train_CO2_kg'] = train_co2
-
-        # Convert to_city_data to a DataFrame for Altair
-        from_city_df = pd.DataFrame([from_city_data])
-        to_city_df = pd.DataFrame([to_city_data])
-
-        # Get dynamic projection parameters based on the selected cities
-        cities = [{'city': from_city, 'lon': from_city_data['longitude'], 'lat': from_city_data['latitude']},
-                  {'city': to_city, 'lon': to_city_data['longitude'], 'lat': to_city_data['latitude']}]
-
-        projection_params = get_projection_params(cities)
-
-        # create the route map with 2 cities
-        europe = alt.topo_feature('https://raw.githubusercontent.com/leakyMirror/map-of-europe/refs/heads/master/TopoJSON/europe.topojson', 'europe')
-        base = alt.Chart(europe).mark_geoshape(
-            fill='lightgray',
-            stroke='white',
-            strokeWidth=0.5
-        ).project(
-            'mercator',
-            scale=projection_params['scale'],
-            center=projection_params['center'],
-            rotate=[5, 0, 0]
-        ).properties(
-            height=500
-        ).encode(
-            tooltip=alt.value('')  # Suppress default tooltip by setting to an empty string
-        )
-
-        from_point = alt.Chart(from_city_df).mark_circle(
-            color='#FF6F61',
-            size=300,
-            opacity=0.9
-        ).project(
-            'mercator',
-            scale=projection_params['scale'],
-            center=projection_params['center'],
-            rotate=[5, 0, 0]
-        ).transform_calculate(
-            tooltip_text='"From: " + datum.city'
-        ).encode(
-            longitude='longitude:Q',
-            latitude='latitude:Q',
-            tooltip=alt.Tooltip('tooltip_text:N')
-        )
-
-        to_point = alt.Chart(to_city_df).mark_circle(
-            color='#FF6F61',
-            size=300,
-            opacity = 0.9
-        ).project(
-            'mercator',
-            scale=projection_params['scale'],
-            center=projection_params['center'],
-            rotate=[5, 0, 0]
-        ).transform_calculate(
-            tooltip_text='"To: " + datum.city'
-        ).encode(
-            longitude='longitude:Q',
-            latitude='latitude:Q',
-            tooltip=alt.Tooltip('tooltip_text:N')
-        )
-
-        # Load GeoJSON data for both lines and points
-        geojson_lines_data = load_geojson_lines(from_city, to_city)
-        geojson_points_data = load_geojson_points(from_city, to_city)
-
-        # Extract coordinates from GeoJSON for the train route
-        line_coordinates = geojson_lines_data['features'][0]['geometry']['coordinates']
-
-        # Prepare tooltip information directly in DataFrame for Altair
-        tooltip_data = pd.DataFrame({
-            'type': ['LineString'],
-            'coordinates': [line_coordinates],
-            'route_type': [f"Train from {from_city} to {to_city}"],
-            'Train_CO2_kg': [f"{train_co2} kg"],
-            'Duration_train': [train_duration]
-        })
-
-        # draw train route on the map
-        train_route = alt.Chart(alt.Data(values=[tooltip_data.to_dict(orient='records')[0]])).mark_geoshape(
-            fill=None,
-            stroke='forestgreen',
-            strokeWidth=train_co2 / 15,
-            opacity=0.7
-        ).project(
-            'mercator',
-            scale=projection_params['scale'],
-            center=projection_params['center'],
-            rotate=[5, 0, 0]
-        ).encode(
-            tooltip=[
-                alt.Tooltip('route_type:N', title='Route'),
-                alt.Tooltip('Train_CO2_kg:N', title='CO2'),
-                alt.Tooltip('Duration_train:N', title='Duration'),
-            ]
-        )
-
-        # train route transfer points
-        train_stops = alt.Chart(alt.Data(values=geojson_points_data['features'])).mark_circle(
-            color='#728370',
-            size=100,
-            opacity=0.8
-        ).project(
-            'mercator',
-            scale=projection_params['scale'],
-            center=projection_params['center'],
-            rotate=[5, 0, 0]
-        ).encode(
-            longitude='geometry.coordinates[0]:Q',
-            latitude='geometry.coordinates[1]:Q',
-            tooltip=alt.Tooltip('properties.stop_name:N')
-        )
-
-        # Generate the arc line for the plane route if plane data are available
-        if pd.isna(travel_info['Duration_plane_total']) or pd.isna(travel_info['Plane_CO2_kg']):
-            plane_route = alt.Chart(pd.DataFrame()).mark_geoshape()  # Empty placeholder if plane data is missing
-        else:
-            from_coords = [from_city_data['longitude'], from_city_data['latitude']]
-            to_coords = [to_city_data['longitude'], to_city_data['latitude']]
-            arc_points = generate_curved_arc(from_coords, to_coords)
-
-            # Add custom tooltip text to the data
-            arc_data = {
-                'type': 'LineString',
-                'coordinates': arc_points,
-                'route_type': f"Plane from {from_city} to {to_city}",
-                'Plane_CO2_kg': f"{plane_co2} kg",
-                'Duration_plane_total': plane_duration
-            }
-
-            plane_route = alt.Chart(alt.Data(values=[arc_data])).mark_geoshape(
-                fill=None,
-                stroke='indianred',
-                strokeWidth=plane_co2/15,
-            ).project(
-                'mercator',
-                scale=projection_params['scale'],
-                center=projection_params['center'],
-                rotate=[5, 0, 0]
-            ).encode(
-                tooltip=[alt.Tooltip('route_type:N', title='Route'),
-                         alt.Tooltip('Plane_CO2_kg:N', title='CO2'),
-                         alt.Tooltip('Duration_plane_total:N', title='Duration')]
-            )
-
-        # Combine the layers in the correct order
-        map_with_selected_cities = base + plane_route + train_route + train_stops + from_point + to_point
+        if response.transfers is None:
+            st.warning(f"No GeoJSON route found for {from_city} to {to_city}")
 
-        # Display the map
-        st.altair_chart(map_with_selected_cities, use_container_width=True)
+        # Route map with the train and plane routes
+        if response.route_map is not None:
+            st.vega_lite_chart(response.route_map, use_container_width=True)
 
 expander = st.expander("Calculation Methodology and Data Sources")
 expander.write('''
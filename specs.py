@@ -0,0 +1,461 @@
+import functools
+
+import altair as alt
+
+from basemap import BASEMAP_OBJECT
+
+# Compiled chart specs: every chart structure is built and validated through Altair once per process and
+# kept as a Vega-Lite dict template. Per request only the named datasets and param values change, so a rerun
+# fills in a template (fill_template) and hands it to st.vega_lite_chart, skipping Altair and its validation.
+#
+# Named datasets of the route map: basemap (TopoJSON topology), plane_route and train_route (lists of GeoJSON
+# Features, plane_route is empty without a flight), train_stops (GeoJSON Features), from_city and to_city
+# (one {city, longitude, latitude} row each). Params: map_scale, map_center, train_stroke_width, plane_stroke_width.
+# The duration charts read the duration dataset and the tick_values param, the emission charts the emissions dataset.
+# The fan-out map (one city to all destinations), the itinerary map and the Pareto frontier scatter are described
+# at their templates.
+
+MAP_ROTATE = [5, 0, 0]
+COLORS = ['indianred', 'forestgreen']
+
+# Label expression for the x-axis of duration chart
+DURATION_LABEL_EXPR = '''
+    (datum.value % 60 == 0) ?
+        format(datum.value / 60, "d") :
+        format(floor(datum.value / 60), "d") + ".5"
+'''
+
+# Copy of a template with the given param values and datasets filled in. Only the top-level dict, the params
+# list and the datasets mapping are copied; the rest is shared with the template, so treat the result as read-only
+# (st.vega_lite_chart only replaces top-level keys).
+def fill_template(template, params=None, datasets=None):
+    spec = dict(template)
+    if params:
+        spec['params'] = [
+            {**param, 'value': params[param['name']]} if param['name'] in params else param
+            for param in template['params']
+        ]
+    if datasets:
+        spec['datasets'] = {**template.get('datasets', {}), **datasets}
+    return spec
+
+# Route map between two cities: basemap, plane arc, train route, optional train stops and the two cities.
+# One projection for all layers, driven by the map_scale and map_center params.
+@functools.lru_cache(maxsize=None)
+def route_map_template(show_stops=True, stops_opacity=0.8):
+    map_scale = alt.param(name='map_scale', value=700)
+    map_center = alt.param(name='map_center', value=[11, 49])
+    train_stroke_width = alt.param(name='train_stroke_width', value=1)
+    plane_stroke_width = alt.param(name='plane_stroke_width', value=1)
+
+    base = alt.Chart(alt.NamedData(
+        'basemap', format=alt.DataFormat(type='topojson', feature=BASEMAP_OBJECT)
+    )).mark_geoshape(
+        fill='lightgray',
+        stroke='white',
+        strokeWidth=0.5
+    ).encode(
+        tooltip=alt.value('')  # Suppress default tooltip by setting to an empty string
+    )
+
+    plane_route = alt.Chart(alt.NamedData('plane_route')).mark_geoshape(
+        fill=None,
+        stroke='indianred',
+        strokeWidth=alt.ExprRef('plane_stroke_width'),
+    ).encode(
+        tooltip=[alt.Tooltip('properties.route_type:N', title='Route'),
+                 alt.Tooltip('properties.Plane_CO2_kg:N', title='CO2'),
+                 alt.Tooltip('properties.Duration_plane_total:N', title='Duration')]
+    )
+
+    train_route = alt.Chart(alt.NamedData('train_route')).mark_geoshape(
+        fill=None,
+        stroke='forestgreen',
+        strokeWidth=alt.ExprRef('train_stroke_width'),
+        opacity=0.7
+    ).encode(
+        tooltip=[alt.Tooltip('properties.route_type:N', title='Route'),
+                 alt.Tooltip('properties.Train_CO2_kg:N', title='CO2'),
+                 alt.Tooltip('properties.Duration_train:N', title='Duration')]
+    )
+
+    # train route transfer points
+    train_stops = alt.Chart(alt.NamedData('train_stops')).mark_circle(
+        color='#728370',
+        size=100,
+        opacity=stops_opacity
+    ).encode(
+        longitude='geometry.coordinates[0]:Q',
+        latitude='geometry.coordinates[1]:Q',
+        tooltip=alt.Tooltip('properties.stop_name:N')
+    )
+
+    def city_point(dataset, label):
+        return alt.Chart(alt.NamedData(dataset)).mark_circle(
+            color='#FF6F61',
+            size=300,
+            opacity=0.9
+        ).transform_calculate(
+            tooltip_text=f'"{label}: " + datum.city'
+        ).encode(
+            longitude='longitude:Q',
+            latitude='latitude:Q',
+            tooltip=alt.Tooltip('tooltip_text:N')
+        )
+
+    layers = [base, plane_route, train_route] + ([train_stops] if show_stops else []) + \
+        [city_point('from_city', 'From'), city_point('to_city', 'To')]
+    return alt.layer(*layers).project(
+        'mercator',
+        scale=alt.ExprRef('map_scale'),
+        center=alt.ExprRef('map_center'),
+        rotate=MAP_ROTATE
+    ).properties(
+        height=500
+    ).add_params(map_scale, map_center, train_stroke_width, plane_stroke_width).to_dict()
+
+# Routes from one city to all its destinations: basemap, plane arcs, train routes, destination points and the
+# origin, with one projection driven by the map_scale and map_center params. Named datasets: basemap,
+# plane_routes and train_routes (lists of GeoJSON Features with route_type, CO2, Duration and Distance properties
+# and the stroke_width in pixels),
+# destinations (rows: city, longitude, latitude, Train, Plane, Train_CO2_kg, Plane_CO2_kg) and from_city.
+@functools.lru_cache(maxsize=None)
+def fanout_map_template():
+    map_scale = alt.param(name='map_scale', value=700)
+    map_center = alt.param(name='map_center', value=[11, 49])
+
+    base = alt.Chart(alt.NamedData(
+        'basemap', format=alt.DataFormat(type='topojson', feature=BASEMAP_OBJECT)
+    )).mark_geoshape(
+        fill='lightgray',
+        stroke='white',
+        strokeWidth=0.5
+    ).encode(
+        tooltip=alt.value('')
+    )
+
+    def routes(dataset, color, opacity):
+        return alt.Chart(alt.NamedData(dataset)).mark_geoshape(
+            fill=None,
+            stroke=color,
+            opacity=opacity
+        ).encode(
+            strokeWidth=alt.StrokeWidth('properties.stroke_width:Q', scale=None, legend=None),
+            tooltip=[alt.Tooltip('properties.route_type:N', title='Route'),
+                     alt.Tooltip('properties.CO2_kg:N', title='CO2'),
+                     alt.Tooltip('properties.Duration:N', title='Duration'),
+                     alt.Tooltip('properties.Distance:N', title='Distance')]
+        )
+
+    destinations = alt.Chart(alt.NamedData('destinations')).mark_circle(
+        color='#FFA9A0',
+        size=150,
+        opacity=0.9
+    ).encode(
+        longitude='longitude:Q',
+        latitude='latitude:Q',
+        tooltip=[alt.Tooltip('city:N', title='To'),
+                 alt.Tooltip('Train:N', title='Train'),
+                 alt.Tooltip('Plane:N', title='Plane'),
+                 alt.Tooltip('Train_CO2_kg:Q', title='Train CO2 (kg)'),
+                 alt.Tooltip('Plane_CO2_kg:Q', title='Plane CO2 (kg)')]
+    )
+
+    origin = alt.Chart(alt.NamedData('from_city')).mark_circle(
+        color='#FF3421',
+        size=300,
+        opacity=0.9
+    ).transform_calculate(
+        tooltip_text='"From: " + datum.city'
+    ).encode(
+        longitude='longitude:Q',
+        latitude='latitude:Q',
+        tooltip=alt.Tooltip('tooltip_text:N')
+    )
+
+    return alt.layer(
+        base, routes('plane_routes', 'indianred', 0.6), routes('train_routes', 'forestgreen', 0.8),
+        destinations, origin
+    ).project(
+        'mercator',
+        scale=alt.ExprRef('map_scale'),
+        center=alt.ExprRef('map_center'),
+        rotate=MAP_ROTATE
+    ).properties(
+        height=500
+    ).add_params(map_scale, map_center).to_dict()
+
+# Multi-leg itinerary: basemap, every leg in one layer drawn with the geometry of its suggested mode (train route
+# or plane arc) and colored by mode, and the numbered stops. Named datasets: basemap, legs (GeoJSON Features with
+# mode, route_type, CO2 and Duration properties) and stops (rows: city, longitude, latitude, label).
+# Params: map_scale, map_center.
+@functools.lru_cache(maxsize=None)
+def itinerary_map_template():
+    map_scale = alt.param(name='map_scale', value=700)
+    map_center = alt.param(name='map_center', value=[11, 49])
+
+    base = alt.Chart(alt.NamedData(
+        'basemap', format=alt.DataFormat(type='topojson', feature=BASEMAP_OBJECT)
+    )).mark_geoshape(
+        fill='lightgray',
+        stroke='white',
+        strokeWidth=0.5
+    ).encode(
+        tooltip=alt.value('')
+    )
+
+    legs = alt.Chart(alt.NamedData('legs')).mark_geoshape(
+        fill=None,
+        strokeWidth=3,
+        opacity=0.8
+    ).encode(
+        stroke=alt.Stroke('properties.mode:N', legend=None).scale(domain=['Plane', 'Train'], range=COLORS),
+        tooltip=[alt.Tooltip('properties.route_type:N', title='Route'),
+                 alt.Tooltip('properties.CO2_kg:N', title='CO2'),
+                 alt.Tooltip('properties.Duration:N', title='Duration')]
+    )
+
+    stops = alt.Chart(alt.NamedData('stops')).mark_circle(
+        color='#FF6F61',
+        size=300,
+        opacity=0.9
+    ).encode(
+        longitude='longitude:Q',
+        latitude='latitude:Q',
+        tooltip=alt.Tooltip('city:N')
+    )
+
+    stop_labels = alt.Chart(alt.NamedData('stops')).mark_text(
+        color='white',
+        fontWeight='bold'
+    ).encode(
+        longitude='longitude:Q',
+        latitude='latitude:Q',
+        text='label:N',
+        tooltip=alt.value('')
+    )
+
+    return alt.layer(base, legs, stops, stop_labels).project(
+        'mercator',
+        scale=alt.ExprRef('map_scale'),
+        center=alt.ExprRef('map_center'),
+        rotate=MAP_ROTATE
+    ).properties(
+        height=500
+    ).add_params(map_scale, map_center).to_dict()
+
+# Time vs. CO2 scatter of every trip from one city, with its Pareto frontier as a step line through the
+# highlighted options that no other trip beats on both. Named dataset: options (rows: To, Mode, Hours, Duration,
+# CO2_kg, Pareto).
+@functools.lru_cache(maxsize=None)
+def frontier_scatter_template():
+    options = alt.Chart(alt.NamedData('options')).mark_circle(size=80).encode(
+        x=alt.X('Hours:Q', title='Duration (h)'),
+        y=alt.Y('CO2_kg:Q', title='CO2 (kg)'),
+        color=alt.Color('Mode:N', legend=None).scale(domain=['Plane', 'Train'], range=COLORS),
+        opacity=alt.condition('datum.Pareto', alt.value(1), alt.value(0.25)),
+        tooltip=[alt.Tooltip('To:N'), alt.Tooltip('Mode:N'), alt.Tooltip('Duration:N'),
+                 alt.Tooltip('CO2_kg:Q', title='CO2 (kg)', format='.1f')]
+    )
+
+    frontier = alt.Chart(alt.NamedData('options')).mark_line(
+        interpolate='step-after',
+        color='gray',
+        strokeDash=[4, 3]
+    ).encode(
+        x='Hours:Q',
+        y='CO2_kg:Q',
+        order='Hours:Q',
+        tooltip=alt.value('')
+    ).transform_filter(
+        'datum.Pareto'
+    )
+
+    return (frontier + options).properties(
+        title='Fastest vs. lowest CO2',
+        height=300
+    ).to_dict()
+
+# Horizontal duration bars with labels (duration rows: Mode, Duration, Duration_minutes)
+@functools.lru_cache(maxsize=None)
+def duration_bars_template():
+    duration_chart = alt.Chart(alt.NamedData('duration')).mark_bar().encode(
+        y=alt.Y('Mode:N', title=None, axis=alt.Axis(labelFontSize=13)),
+        x=alt.X('Duration_minutes:Q', title=None,
+                axis=alt.Axis(values=alt.ExprRef('tick_values'), labelExpr=DURATION_LABEL_EXPR)),
+        tooltip=[alt.Tooltip('Duration:N', title='Duration'), alt.Tooltip('Mode:N', title='Mode')],
+        color=alt.Color('Mode:N', legend=None).scale(range=COLORS),
+    ).properties(
+        title='Travel Duration'
+    )
+
+    duration_labels = alt.Chart(alt.NamedData('duration')).mark_text(
+        align='right',
+        baseline='middle',
+        color='black',
+        dx=-5
+    ).encode(
+        y=alt.Y('Mode:N', title=None),
+        x=alt.X('Duration_minutes:Q'),
+        text=alt.Text('Duration:N'),
+        tooltip=alt.value('')
+    )
+
+    return (duration_chart + duration_labels).add_params(alt.param(name='tick_values', value=[0])).to_dict()
+
+# Vertical duration bars with labels inside the bars
+@functools.lru_cache(maxsize=None)
+def duration_columns_template():
+    duration_chart = alt.Chart(alt.NamedData('duration')).mark_bar().encode(
+        x=alt.X('Mode:N', title=None, axis=alt.Axis(labelFontSize=15, labelAngle=0)),
+        y=alt.Y('Duration_minutes:Q', title=None,
+                axis=alt.Axis(values=alt.ExprRef('tick_values'), labelExpr=DURATION_LABEL_EXPR)),
+        tooltip=[alt.Tooltip('Duration:N', title='Duration'), alt.Tooltip('Mode:N', title='Mode')],
+        color=alt.Color('Mode:N', legend=None).scale(range=COLORS),
+    ).properties(
+        title='Travel Duration'
+    )
+
+    duration_labels = alt.Chart(alt.NamedData('duration')).mark_text(
+        align='center',
+        baseline='middle',
+        color='white',
+        size=14,
+        dy=15
+    ).encode(
+        x=alt.X('Mode:N', title=None),
+        y=alt.Y('Duration_minutes:Q'),
+        text=alt.Text('Duration:N'),
+        tooltip=alt.value('')
+    )
+
+    return (duration_chart + duration_labels).add_params(alt.param(name='tick_values', value=[0])).to_dict()
+
+# Bullet chart: train duration as a bar, plane duration as a thick tick (duration rows with Mode Train/Plane)
+@functools.lru_cache(maxsize=None)
+def duration_bullet_template():
+    train_bar = alt.Chart(alt.NamedData('duration')).transform_filter(
+        alt.datum.Mode == 'Train'
+    ).mark_bar().encode(
+        y=alt.Y('Mode:N', title=None, axis=None),
+        x=alt.X('Duration_minutes:Q', title=None,
+                axis=alt.Axis(values=alt.ExprRef('tick_values'), labelExpr=DURATION_LABEL_EXPR)),
+        tooltip=[alt.Tooltip('Duration:N', title='Train Duration')],
+        color=alt.value('forestgreen')  # Set the color for the train bar
+    ).properties(
+        title='Train & Plane Duration'
+    )
+
+    # Create a thick tick for plane travel time
+    plane_tick = alt.Chart(alt.NamedData('duration')).transform_filter(
+        alt.datum.Mode == 'Plane'
+    ).mark_tick(
+        thickness=7, #width
+        size=35, #height
+        opacity=1,
+        color='indianred'
+    ).encode(
+        x=alt.X('Duration_minutes:Q', title=None),
+        tooltip=[alt.Tooltip('Duration:N', title='Plane Duration')]
+    )
+
+    return alt.layer(train_bar, plane_tick).add_params(alt.param(name='tick_values', value=[0])).to_dict()
+
+# Horizontal emission bars with "<n> kg" labels (emissions rows: Mode, CO2_kg)
+@functools.lru_cache(maxsize=None)
+def emission_bars_template():
+    emissions_chart = alt.Chart(alt.NamedData('emissions')).mark_bar().encode(
+        x=alt.X('CO2_kg:Q', title=None),
+        y=alt.Y('Mode:N', title=None, axis=alt.Axis(labelFontSize=13)),
+        color=alt.Color('Mode:N', legend=None).scale(
+            range=COLORS
+        )
+    ).properties(
+        title='Carbon Emissions'
+    )
+
+    emissions_labels = alt.Chart(alt.NamedData('emissions')).mark_text(
+        align='right',
+        baseline='middle',
+        color='black',
+        dx=-5
+    ).encode(
+        y=alt.Y('Mode:N', title=None),
+        x=alt.X('CO2_kg:Q'),
+        tooltip=alt.value('')
+    ).transform_calculate(
+        label="round(datum.CO2_kg) + ' kg'" # Concatenate "kg" to the CO2 value
+    ).encode(
+        text=alt.Text('label:N')  # Use the calculated label field
+    )
+
+    return (emissions_chart + emissions_labels).to_dict()
+
+# Vertical emission bars with labels inside the bars and the axis on the right
+@functools.lru_cache(maxsize=None)
+def emission_columns_template():
+    emissions_chart = alt.Chart(alt.NamedData('emissions')).mark_bar().encode(
+        y=alt.Y('CO2_kg:Q', title=None, axis=alt.Axis(orient='right')),
+        x=alt.X('Mode:N', title=None, axis=alt.Axis(labelFontSize=15, labelAngle=0)),
+        color=alt.Color('Mode:N', legend=None).scale(
+            range=COLORS
+        )
+    ).properties(
+        title='Carbon Emissions'
+    )
+
+    emissions_labels = alt.Chart(alt.NamedData('emissions')).mark_text(
+        align='center',
+        baseline='middle',
+        color='white',
+        size=14,
+        dy=15
+    ).encode(
+        x=alt.X('Mode:N', title=None),
+        y=alt.Y('CO2_kg:Q'),
+        tooltip=alt.value('')
+    ).transform_calculate(
+        label="round(datum.CO2_kg) + ' kg'" # Concatenate "kg" to the CO2 value
+    ).encode(
+        text=alt.Text('label:N')  # Use the calculated label field
+    )
+
+    return (emissions_chart + emissions_labels).to_dict()
+
+# Emission circles sized by CO2 with "<n> kg" labels inside
+@functools.lru_cache(maxsize=None)
+def emission_circles_template():
+    circle_chart = alt.Chart(alt.NamedData('emissions')).mark_circle().encode(
+        x=alt.X('Mode:N', title=None, axis=alt.Axis(labelAngle=0, labelFontSize=15)),
+        y=alt.value(50),
+        size=alt.Size('CO2_kg:Q', scale=alt.Scale(range=[0, 10000]), legend=None),
+        tooltip=['Mode:N', 'CO2_kg:Q'],
+        color=alt.Color('Mode:N', legend=None).scale(
+            range=COLORS
+        )
+    ).properties(
+        height=200,
+        title='Carbon Emissions'
+    )
+
+    # Add data labels inside the circles
+    labels = alt.Chart(alt.NamedData('emissions')).mark_text(
+        align='center',
+        baseline='middle',
+        color='white',
+        fontSize=20
+    ).transform_calculate(
+        label="round(datum.CO2_kg) + ' kg'"
+    ).encode(
+        x=alt.X('Mode:N', title=None),  # Same x-axis as circles
+        y=alt.value(50),  # Keep labels aligned horizontally, matching circle position
+        text=alt.Text('label:N'),
+        tooltip=alt.value('')  # Disable tooltip on the text layer
+    )
+
+    return (circle_chart + labels).properties(
+        height=200
+    ).configure_axis(
+        grid=False,
+        title=None
+    ).to_dict()
@@ -1,10 +1,10 @@
-import streamlit as st
 import altair as alt
-import pandas as pd
-import numpy as np
-import json
-import os
-import math
+import functools
+
+from basemap import clipped_basemap, BASEMAP_OBJECT
+from core import coordinates_data, city_positions, minutes_to_str
+
+# Presentation helpers for the Streamlit pages; the data and route computations live in the core package
 
 # Custom CSS to hide the links to other pages in the sidebar
 hide_page_links_style = """
@@ -15,25 +15,28 @@ hide_page_links_style = """
     </style>
 """
 
-# Load the trip and coordinates data and clean up the column names
-trip_data = pd.read_csv('data/trips_data.csv')
-trip_data.columns = trip_data.columns.str.strip()
-coordinates_data = pd.read_csv('data/coordinates.csv')
-coordinates_data.columns = coordinates_data.columns.str.strip()
-
-# Normalize city pairs in trip data
-def normalize_city_pair(city1, city2):
-    return '-'.join(sorted([city1, city2]))
+# Vendored TopoJSON of Europe embedded in the chart spec, at the level of detail for the projection scale
+# and clipped to the map viewport around center
+def europe_basemap(scale, center, rotate=(0, 0, 0)):
+    return alt.InlineData(
+        values=clipped_basemap(center, scale, rotate),
+        format=alt.DataFormat(type='topojson', feature=BASEMAP_OBJECT)
+    )
 
-trip_data['route'] = trip_data.apply(lambda row: normalize_city_pair(row['City_1'], row['City_2']), axis=1)
+# Name of the dataset that carries the selected cities into the overview map
+SELECTED_CITIES_DATASET = 'selected_cities'
 
-# Get unique cities for the select boxes
-cities = coordinates_data['city'].unique()
+# Name of the dataset that carries the cities reachable by train (core.reachable_from) into the overview map
+REACHABLE_CITIES_DATASET = 'reachable_cities'
 
-#create the base map with all cities
-def create_base_map(from_city, to_city):
+# Overview map with all cities as a Vega-Lite spec, built and validated through Altair once per process.
+# The selected cities come in through the small SELECTED_CITIES_DATASET and the selected_cities param derived
+# from it, so a new selection changes only that dataset while the spec itself stays the same. Cities reachable
+# by train are an overlay filled the same way from REACHABLE_CITIES_DATASET (empty without a reachability query).
+@functools.lru_cache(maxsize=None)
+def base_map_spec():
     # Load TopoJSON of Europe
-    europe = alt.topo_feature('https://raw.githubusercontent.com/leakyMirror/map-of-europe/refs/heads/master/TopoJSON/europe.topojson', 'europe')
+    europe = europe_basemap(700, [11, 49])
     base = alt.Chart(europe).mark_geoshape(
         fill='lightgray',
         stroke='white',
@@ -48,9 +51,19 @@ def create_base_map(from_city, to_city):
     ).encode(
         tooltip=alt.value('')  # Suppress default tooltip by setting to an empty string
     )
+    # Names of the selected cities, read from the selection dataset
+    selected_cities = alt.param(
+        name='selected_cities',
+        expr=f"pluck(data('{SELECTED_CITIES_DATASET}'), 'city')"
+    )
+    # Names of the reachable cities, drawn by the overlay instead of the city points
+    reachable_cities = alt.param(
+        name='reachable_cities',
+        expr=f"pluck(data('{REACHABLE_CITIES_DATASET}'), 'city')"
+    )
     # Add cities
-    points = alt.Chart(coordinates_data).mark_circle(
-        # color='#FF6F61',
+    points = alt.Chart(coordinates_data()).mark_circle(
+        color='#FFA9A0',  # color for other cities
         size=150,
         opacity=0.9
     ).project(
@@ -61,183 +74,60 @@ def create_base_map(from_city, to_city):
     ).encode(
         longitude='longitude:Q',
         latitude='latitude:Q',
-        tooltip=['city:N'],
-        color=alt.condition(
-            (alt.datum.city == from_city) | (alt.datum.city == to_city),
-            alt.value('#FF3421'),  # brighter color for selected cities
-            alt.value('#FFA9A0') # color for other cities
-        )
+        tooltip=['city:N']
+    ).transform_filter(
+        'indexof(selected_cities, datum.city) < 0 && indexof(reachable_cities, datum.city) < 0'
     )
-    return base + points
-
-# calculate the map center (mean lat/lon) and scale based on point spread
-def get_projection_params(cities):
-    # Get longitude and latitude values
-    lons = [city['lon'] for city in cities]
-    lats = [city['lat'] for city in cities]
-
-    # Calculate the center as the mean of the coordinates
-    center_lon = (sum(lons) / len(lons)) + 2
-    center_lat = sum(lats) / len(lats)
-
-    # Calculate the spread of the points (difference between max and min coordinates)
-    lon_range = max(lons) - min(lons)
-    lat_range = max(lats) - min(lats)
-
-    # print(f"Longitude range: {lon_range}, Latitude range: {lat_range}")
-
-    # Factor in the latitude difference less because distances shrink closer to the poles
-    weighted_lat_range = lat_range * math.cos(math.radians(center_lat))
-
-    # Use the larger of the two ranges to determine the scale, adding a buffer to prevent extremes
-    max_range = max(lon_range, weighted_lat_range)
-
-    # Define a threshold for large latitude differences (when cities are far apart north-south)
-    lat_threshold = 7  # cities > 7 degrees apart in latitude
-    lon_threshold = 10 # cities < 10 degrees apart in longitude
-
-    if lat_range > lat_threshold and lon_range < lon_threshold:
-        # Case for cities aligned mostly by longitude (far north-south)
-        default_scale = 700
-        default_center = [11, 49]
-        return {
-            'center': default_center,
-            'scale': default_scale
-        }
-
-    # Adjust the scale based on the range; larger range -> smaller scale (zoom out)
-    scale_factor = 300 / (max_range ** 0.7)
-
-    # Set bounds for the scale to prevent extreme zoom-in/zoom-out
-    min_scale = 400  # Minimum zoom level (for large ranges)
-    max_scale = 2500  # Maximum zoom level (for small ranges)
-
-    final_scale = min(max(scale_factor * 25, min_scale), max_scale)
-
-    # Debugging: print calculated values
-    # print(f"Center: {[center_lon, center_lat]}, Scale: {final_scale}")
-
-    return {
-        'center': [center_lon, center_lat],
-        'scale': final_scale
+    # Highlight the cities reachable by train
+    reachable_points = alt.Chart(alt.NamedData(REACHABLE_CITIES_DATASET)).mark_circle(
+        color='forestgreen',  # train color of the route maps
+        size=150,
+        opacity=0.9
+    ).project(
+        'mercator',
+        scale=700,
+        center=[11, 49],
+        # rotate=[5, 0, 0]
+    ).encode(
+        longitude='longitude:Q',
+        latitude='latitude:Q',
+        tooltip=[alt.Tooltip('city:N'), alt.Tooltip('Duration:N', title='Train'),
+                 alt.Tooltip('CO2_kg:Q', title='CO2 (kg)')]
+    ).transform_filter(
+        'indexof(selected_cities, datum.city) < 0'
+    )
+    # Highlight the selected cities
+    selected_points = alt.Chart(alt.NamedData(SELECTED_CITIES_DATASET)).mark_circle(
+        color='#FF3421',  # brighter color for selected cities
+        size=150,
+        opacity=0.9
+    ).project(
+        'mercator',
+        scale=700,
+        center=[11, 49],
+        # rotate=[5, 0, 0]
+    ).encode(
+        longitude='longitude:Q',
+        latitude='latitude:Q',
+        tooltip=['city:N']
+    )
+    return (base + points + reachable_points + selected_points).add_params(selected_cities,
+                                                                           reachable_cities).to_dict()
+
+#create the base map with all cities, highlighting the selected ones and the cities reachable by train
+#(a list of core.Reachable); render it with st.vega_lite_chart
+def create_base_map(from_city, to_city, reachable=()):
+    coordinates = coordinates_data()
+    selected = coordinates[coordinates['city'].isin([from_city, to_city])]
+    positions = city_positions()
+    spec = dict(base_map_spec())
+    spec['datasets'] = {
+        **spec['datasets'],
+        SELECTED_CITIES_DATASET: selected[['city', 'latitude', 'longitude']].to_dict(orient='records'),
+        REACHABLE_CITIES_DATASET: [
+            {'city': city.city, 'longitude': positions[city.city][0], 'latitude': positions[city.city][1],
+             'Duration': minutes_to_str(city.minutes), 'CO2_kg': round(city.co2, 1)}
+            for city in reachable if city.city in positions
+        ],
     }
-
-# Load GeoJSON route (lines) between cities for train
-def load_geojson_lines(from_city, to_city):
-
-    # Replace spaces with underscores for city names
-    from_city = from_city.replace(" ", "_")
-    to_city = to_city.replace(" ", "_")
-
-    # Special case: always check if "Luxembourg_City" comes first
-    if "Luxembourg_City" in [from_city, to_city]:
-        luxembourg_first_file_name = f"Luxembourg_City_{from_city if from_city != 'Luxembourg_City' else to_city}.geojson"
-        luxembourg_first_file_path = os.path.join('geojson_files/lines', luxembourg_first_file_name)
-
-        if os.path.exists(luxembourg_first_file_path):
-            with open(luxembourg_first_file_path, 'r') as f:
-                geojson_data = json.load(f)
-            return geojson_data
-
-    sorted_cities = sorted([from_city, to_city])
-    file_name = f"{sorted_cities[0]}_{sorted_cities[1]}.geojson"
-    file_path = os.path.join('geojson_files/lines', file_name)
-
-    # Load GeoJSON file
-    if os.path.exists(file_path):
-        with open(file_path, 'r') as f:
-            geojson_data = json.load(f)
-        return geojson_data
-    else:
-        st.warning(f"No GeoJSON route found for {from_city} to {to_city}")
-        return None
-
-# Load GeoJSON route (points) between cities for train
-def load_geojson_points(from_city, to_city):
-    if not from_city or not to_city:
-        return None
-
-    # Replace spaces with underscores for city names
-    from_city = from_city.replace(" ", "_")
-    to_city = to_city.replace(" ", "_")
-
-    # Special case: always check if "Luxembourg_City" comes first
-    if "Luxembourg_City" in [from_city, to_city]:
-        luxembourg_first_file_name = f"Luxembourg_City_{from_city if from_city != 'Luxembourg_City' else to_city}.geojson"
-        luxembourg_first_file_path = os.path.join('geojson_files/points', luxembourg_first_file_name)
-
-        if os.path.exists(luxembourg_first_file_path):
-            with open(luxembourg_first_file_path, 'r') as f:
-                geojson_data = json.load(f)
-            return geojson_data
-
-    sorted_cities = sorted([from_city, to_city])
-    file_name = f"{sorted_cities[0]}_{sorted_cities[1]}.geojson"
-    file_path = os.path.join('geojson_files/points', file_name)
-
-    # Load GeoJSON file
-    if os.path.exists(file_path):
-        with open(file_path, 'r') as f:
-            geojson_data = json.load(f)
-        return geojson_data
-    else:
-        st.warning(f"No GeoJSON route found for {from_city} to {to_city}")
-        return None
-
-def calculate_transfers(geojson_data_points):
-    num_points = len(geojson_data_points['features'])
-    transfers = max(0, num_points - 2)  # Subtract 2 for start and end points, ensure it's not negative
-    return transfers
-
-# Generate points for a curved arc
-def generate_curved_arc(from_coords, to_coords, num_points=100, curvature=0.02):
-    # Unpack coordinates
-    lon1, lat1 = np.radians(from_coords)
-    lon2, lat2 = np.radians(to_coords)
-
-    # Create a sequence of t values from 0 to 1
-    t_vals = np.linspace(0, 1, num_points)
-
-    # Calculate intermediate points along the great circle route
-    latitudes = lat1 + (lat2 - lat1) * t_vals + curvature * np.sin(np.pi * t_vals) # Add curvature
-    longitudes = lon1 + (lon2 - lon1) * t_vals
-
-    # Convert back to degrees
-    latitudes_deg = np.degrees(latitudes)
-    longitudes_deg = np.degrees(longitudes)
-
-    # Combine into a list of coordinates
-    arc_points = [[lon, lat] for lon, lat in zip(longitudes_deg, latitudes_deg)]
-    return arc_points
-
-def double_duration(duration_str):
-    hours, minutes = map(int, duration_str.split(':'))
-    total_minutes = (hours * 60 + minutes) * 2
-    doubled_hours = total_minutes // 60
-    doubled_minutes = total_minutes % 60
-    return f"{doubled_hours}:{doubled_minutes:02d}"
-
-#convert duration to "hours:minutes" string
-def duration_to_str(duration_str):
-    hours, minutes = map(int, duration_str.split(':'))
-    return f"{hours:02}:{minutes:02}"
-
-#convert duration to minutes
-def duration_to_minutes(duration_str):
-    hours, minutes = map(int, duration_str.split(':'))
-    return hours * 60 + minutes
-
-# Custom tick intervals for duration bar charts based on travel time
-def calculate_tick_values(min_value, max_value):
-    range_span = max_value - min_value
-    if range_span <= 180:
-        step = 30  # 30-minute intervals for <3h journeys
-    elif range_span <= 360:
-          step = 60  # 1-hour intervals for 3-6h journeys
-    elif range_span <= 720:
-          step = 120  # 2-hour intervals for 6-12h journeys
-    elif range_span <= 1440:
-        step = 240  # 4-hour intervals for 12-24h journeys
-    else:
-        step = 480  # 8-hour intervals for >24h journeys
-    return [0] + np.arange(step, max_value + step, step).tolist()  # Include 0 as the starting point
+    return spec